@@ -0,0 +1,67 @@
+"""
+Fixtures shared by the benchmarks, built from the recorded cassettes.
+
+Everything is served from memory by a
+:class:`~deezer.transports.ReplayTransport`, no request leaves the machine.
+"""
+import os
+
+import pytest
+
+import deezer
+from deezer.transports import ReplayTransport
+
+CASSETTES = os.path.join(os.path.dirname(__file__), os.pardir, "tests", "cassettes")
+
+ALBUM_ID = 302127
+ALBUM_URL = "https://api.deezer.com/album/{}".format(ALBUM_ID)
+
+#: Number of pages served when iterating the tracks of the album
+PAGES = 20
+
+
+def cassette(name):
+    return os.path.join(CASSETTES, "{}.yaml".format(name))
+
+
+@pytest.fixture(scope="session")
+def recorded():
+    """All the responses recorded in the cassettes."""
+    return ReplayTransport.from_cassettes(cassette("*"))
+
+
+@pytest.fixture
+def client(recorded):
+    return deezer.Client(transport=recorded)
+
+
+@pytest.fixture(scope="session")
+def album_json(recorded):
+    """The raw json of an album with its 14 tracks."""
+    return recorded.get(ALBUM_URL).json()
+
+
+@pytest.fixture(scope="session")
+def chart_json(recorded):
+    """The raw json of the chart, with the 4 sections."""
+    return recorded.get("https://api.deezer.com/chart/0").json()
+
+
+@pytest.fixture
+def paginated_album(recorded):
+    """
+    A client and an album whose tracks relation has :data:`PAGES` pages,
+    all made of the recorded tracks of the album.
+    """
+    transport = ReplayTransport()
+    transport.add(ALBUM_URL, recorded.get(ALBUM_URL))
+    page = recorded.get(ALBUM_URL + "/tracks").json()
+    size = len(page["data"])
+    for number in range(PAGES):
+        url = "{}/tracks?index={}".format(ALBUM_URL, number * size)
+        transport.add(url, page)
+    transport.add(
+        "{}/tracks?index={}".format(ALBUM_URL, PAGES * size), {"data": [], "total": 0}
+    )
+    client = deezer.Client(transport=transport)
+    return client, client.get_album(ALBUM_ID)
@@ -0,0 +1,359 @@
+"""
+End-to-end load harness for the clients.
+
+Sends a mix of requests at a target rate to a local
+:class:`~deezer.mockserver.MockDeezerServer`, or to any host serving the
+same api, and reports for each client type the throughput, the latency
+percentiles, the error rate and the CPU time spent per request::
+
+    python -m benchmarks.loadtest --rate 500 --duration 10 \\
+        --clients requests urllib3 tornado --mix lookup=6 search=2 bulk=1
+
+The load is open-loop: requests are started on schedule whether or not
+the previous ones completed, and their latency is measured from the time
+they were scheduled at, so a client falling behind shows up in the
+percentiles instead of delaying the following requests out of the
+measure. A request scheduled while ``--concurrency`` requests are already
+in flight is dropped and counted, rather than waited for.
+"""
+import argparse
+import bisect
+import itertools
+import json
+import multiprocessing
+import random
+import threading
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+import deezer
+from deezer.mockserver import MockDeezerAPI, MockDeezerServer
+from deezer.transports import (
+    HttpxTransport,
+    ThreadSafeRequestsTransport,
+    Urllib3Transport,
+)
+
+# the synchronous clients are shared by the threads of the harness
+TRANSPORTS = {
+    "requests": ThreadSafeRequestsTransport,
+    "urllib3": Urllib3Transport,
+    "httpx": HttpxTransport,
+}
+CLIENT_TYPES = tuple(TRANSPORTS) + ("tornado",)
+DEFAULT_MIX = {"lookup": 6, "search": 2, "pagination": 2, "bulk": 1}
+#: Number of albums fetched by a bulk operation
+BULK_SIZE = 10
+
+
+class Workload:
+    """
+    Pick the operations to run, with the given weights, against the
+    synthetic catalogue of :meth:`MockDeezerAPI.synthetic`.
+
+    The operations are ``lookup`` of an artist, album or track,
+    ``search`` of artists, ``pagination`` of the tracks of an album and
+    ``bulk`` fetch of :data:`BULK_SIZE` albums, sent all at once by the
+    tornado client and one after the other by the synchronous ones.
+
+    :param mix: a dictionary of operation name to its weight.
+    :param artists: the number of artists in the catalogue.
+    :param seed: the seed of the random choices.
+    """
+
+    def __init__(self, mix=None, artists=50, seed=0):
+        self.mix = mix or DEFAULT_MIX
+        self.artists = artists
+        self._random = random.Random(seed)  # nosec
+        self._names = list(self.mix)
+        self._cumulative = list(itertools.accumulate(self.mix[n] for n in self._names))
+
+    def next_operation(self):
+        """
+        :returns: the name of the operation and a function running it
+                  with a client.
+        """
+        position = self._random.random() * self._cumulative[-1]
+        name = self._names[bisect.bisect(self._cumulative, position)]
+        artist_id = self._random.randint(1, self.artists)
+        album_id = artist_id * 1000 + 1
+        if name == "lookup":
+            kind = self._random.choice(["artist", "album", "track"])
+            object_id = {"artist": artist_id, "album": album_id}.get(
+                kind, album_id * 100 + 1
+            )
+            return name, lambda client: client.get_object(kind, object_id)
+        if name == "search":
+            query = "artist {}".format(artist_id)
+            return name, lambda client: client.search(query, relation="artist")
+        if name == "bulk":
+            album_ids = [
+                self._random.randint(1, self.artists) * 1000 + 1
+                for _ in range(BULK_SIZE)
+            ]
+            return name, lambda client: _get_albums(client, album_ids)
+        index = self._random.randint(0, 2) * 3
+        return name, lambda client: client.get_object(
+            "album", album_id, "tracks", index=index, limit=3
+        )
+
+
+def _get_albums(client, album_ids):
+    """Get several albums, as a list of futures with the tornado client."""
+    return [client.get_object("album", album_id) for album_id in album_ids]
+
+
+class Report:
+    """
+    The measures of one run of the harness.
+
+    :ivar duration: the wall time of the run, until the last response.
+    :ivar dropped: the number of requests not sent for lack of a free slot.
+    :ivar cpu: the CPU time used by the process during the run.
+    """
+
+    def __init__(self, client_type, duration):
+        self.client_type = client_type
+        self.duration = duration
+        self.latencies = []
+        self.errors = 0
+        self.dropped = 0
+        self.cpu = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, latency, error=False):
+        with self._lock:
+            self.latencies.append(latency)
+            if error:
+                self.errors += 1
+
+    def drop(self):
+        with self._lock:
+            self.dropped += 1
+
+    @property
+    def requests(self):
+        return len(self.latencies)
+
+    def percentile(self, percent):
+        """
+        :returns: the latency, in seconds, below which ``percent`` percents
+                  of the requests completed.
+        """
+        if not self.latencies:
+            return float("nan")
+        ordered = sorted(self.latencies)
+        rank = max(0, int(round(percent / 100 * len(ordered))) - 1)
+        return ordered[rank]
+
+    def asdict(self):
+        requests = max(self.requests, 1)
+        return {
+            "client": self.client_type,
+            "requests": self.requests,
+            "dropped": self.dropped,
+            "throughput": self.requests / self.duration,
+            "p50_ms": self.percentile(50) * 1000,
+            "p95_ms": self.percentile(95) * 1000,
+            "p99_ms": self.percentile(99) * 1000,
+            "error_rate": self.errors / requests,
+            "cpu_us_per_request": self.cpu / requests * 1e6,
+        }
+
+
+def make_client(client_type, host, concurrency):
+    """Create a client of the given type, talking to ``host`` over HTTP."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        if client_type == "tornado":
+            from deezer.contrib.tornado import AsyncClient
+
+            return AsyncClient(host=host, use_ssl=False, max_clients=concurrency)
+        transport = TRANSPORTS[client_type]()
+        return deezer.Client(host=host, use_ssl=False, transport=transport)
+
+
+def run_sync(client_type, client, workload, rate, duration, concurrency):
+    """Drive a synchronous client from a pool of threads."""
+    report = Report(client_type, duration)
+    slots = threading.BoundedSemaphore(concurrency)
+
+    def call(operation, scheduled):
+        try:
+            operation(client)
+        except Exception:
+            report.record(time.perf_counter() - scheduled, error=True)
+        else:
+            report.record(time.perf_counter() - scheduled)
+        finally:
+            slots.release()
+
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for scheduled in _schedule(rate, duration):
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            operation = workload.next_operation()[1]
+            if not slots.acquire(blocking=False):
+                report.drop()
+                continue
+            executor.submit(call, operation, scheduled)
+    report.cpu = time.process_time() - cpu_start
+    report.duration = time.perf_counter() - wall_start
+    return report
+
+
+def run_tornado(client_type, client, workload, rate, duration, concurrency):
+    """Drive the tornado client from its IO loop."""
+    from tornado import gen
+    from tornado.ioloop import IOLoop
+
+    report = Report(client_type, duration)
+    # only touched from the IO loop
+    in_flight = [0]
+
+    @gen.coroutine
+    def call(operation, scheduled):
+        try:
+            yield operation(client)
+        except Exception:
+            report.record(time.perf_counter() - scheduled, error=True)
+        else:
+            report.record(time.perf_counter() - scheduled)
+        finally:
+            in_flight[0] -= 1
+
+    @gen.coroutine
+    def main():
+        calls = []
+        for scheduled in _schedule(rate, duration):
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                yield gen.sleep(delay)
+            operation = workload.next_operation()[1]
+            if in_flight[0] >= concurrency:
+                report.drop()
+                continue
+            in_flight[0] += 1
+            calls.append(call(operation, scheduled))
+        yield calls
+
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    IOLoop.current().run_sync(main)
+    report.cpu = time.process_time() - cpu_start
+    report.duration = time.perf_counter() - wall_start
+    return report
+
+
+def _schedule(rate, duration):
+    """Yield the times at which to start the requests."""
+    start = time.perf_counter()
+    for number in range(int(rate * duration)):
+        yield start + number / rate
+
+
+def run(client_types, rate, duration, concurrency=64, mix=None, host=None, **api):
+    """
+    Run the harness for each client type.
+
+    :param client_types: names from :data:`CLIENT_TYPES`.
+    :param rate: the target number of requests per second.
+    :param duration: the duration of each run in seconds.
+    :param concurrency: the maximum number of requests in flight, the
+                        requests scheduled above it are dropped.
+    :param mix: the weights of the operations, see :class:`Workload`.
+    :param host: the ``host:port`` to load, a mock server is started in
+                 another process if ``None``.
+    :param api: the parameters of the :class:`MockDeezerAPI` started.
+    :returns: a list of :class:`Report`.
+    """
+    server = None
+    if host is None:
+        server, host = _start_server(api)
+    reports = []
+    try:
+        for client_type in client_types:
+            client = make_client(client_type, host, concurrency)
+            runner = run_tornado if client_type == "tornado" else run_sync
+            workload = Workload(mix, api.get("artists", 50))
+            reports.append(
+                runner(client_type, client, workload, rate, duration, concurrency)
+            )
+    finally:
+        if server is not None:
+            server.terminate()
+            server.join()
+    return reports
+
+
+def _serve(api, connection):
+    server = MockDeezerServer(MockDeezerAPI.synthetic(**api))
+    connection.send(server.host)
+    server.run()
+
+
+def _start_server(api):
+    """
+    Start a mock server in another process, so its CPU time isn't
+    accounted to the clients.
+
+    :returns: the process and the ``host:port`` of the server.
+    """
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(target=_serve, args=(api, sender))
+    process.daemon = True
+    process.start()
+    return process, receiver.recv()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--clients", nargs="+", default=["requests", "tornado"])
+    parser.add_argument("--rate", type=float, default=500)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument(
+        "--mix", nargs="+", default=[], help="weights of the operations, name=weight"
+    )
+    parser.add_argument("--host", help="host:port to load, a mock server otherwise")
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--json", action="store_true", help="output json lines")
+    args = parser.parse_args(argv)
+    mix = {}
+    for item in args.mix:
+        name, weight = item.split("=")
+        mix[name] = float(weight)
+    reports = run(
+        args.clients,
+        args.rate,
+        args.duration,
+        args.concurrency,
+        mix or None,
+        args.host,
+        latency=args.latency,
+    )
+    row = "{client:>10} {requests:>8} {dropped:>8} {throughput:>10.1f} {p50_ms:>8.2f} "
+    row += "{p95_ms:>8.2f} {p99_ms:>8.2f} {error_rate:>7.2%} {cpu_us_per_request:>9.1f}"
+    if not args.json:
+        print(
+            "{:>10} {:>8} {:>8} {:>10} {:>8} {:>8} {:>8} {:>7} {:>9}".format(
+                "client",
+                "requests",
+                "dropped",
+                "req/s",
+                "p50 ms",
+                "p95 ms",
+                "p99 ms",
+                "errors",
+                "cpu us/req",
+            )
+        )
+    for report in reports:
+        values = report.asdict()
+        print(json.dumps(values) if args.json else row.format(**values))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Helpers to measure the memory allocated by a piece of code with tracemalloc.
+"""
+import gc
+import tracemalloc
+
+
+class Measure:
+    """
+    The memory allocated while running a function.
+
+    :ivar retained: bytes still allocated after the function returned,
+                    including its result.
+    :ivar blocks: number of memory blocks still allocated.
+    :ivar peak: highest number of bytes allocated while it ran.
+    :ivar result: the value returned by the function.
+    """
+
+    def __init__(self, retained, blocks, peak, result):
+        self.retained = retained
+        self.blocks = blocks
+        self.peak = peak
+        self.result = result
+
+    def __repr__(self):
+        return "<Measure: retained={} blocks={} peak={}>".format(
+            self.retained, self.blocks, self.peak
+        )
+
+
+def measure(func, *args, **kwargs):
+    """
+    Run ``func`` under tracemalloc and measure its allocations.
+
+    It is run once beforehand, so the caches filled on first use, like
+    interned strings, aren't accounted to it.
+
+    :returns: a :class:`Measure`.
+    """
+    func(*args, **kwargs)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        baseline, _ = tracemalloc.get_traced_memory()
+        result = func(*args, **kwargs)
+        gc.collect()
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    stats = after.filter_traces(filters).compare_to(
+        before.filter_traces(filters), "filename"
+    )
+    retained = sum(stat.size_diff for stat in stats)
+    blocks = sum(stat.count_diff for stat in stats)
+    return Measure(retained, blocks, peak - baseline, result)
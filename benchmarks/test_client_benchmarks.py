@@ -0,0 +1,68 @@
+"""
+Micro-benchmarks of the hot paths of the client.
+
+Run them with::
+
+    pytest benchmarks --benchmark-autosave
+
+and compare with the previous run to catch regressions::
+
+    pytest benchmarks --benchmark-compare --benchmark-compare-fail=mean:10%
+"""
+import deezer
+
+from .conftest import ALBUM_ID, PAGES
+
+
+def test_object_url(benchmark, client):
+    result = benchmark(client.object_url, "album", ALBUM_ID, "tracks", index=25)
+    assert result.endswith("/album/302127/tracks?index=25")
+
+
+def test_object_url_access_token(benchmark, client):
+    client.access_token = "token"
+    result = benchmark(client.object_url, "user", "me", "tracks", limit=50)
+    assert "access_token=token" in result
+
+
+def test_process_json_album(benchmark, client, album_json):
+    album = benchmark(client._process_json, album_json)
+    assert isinstance(album, deezer.Album)
+
+
+def test_process_json_chart(benchmark, client, chart_json):
+    chart = benchmark(client._process_json, chart_json, parent="chart")
+    assert len(chart.tracks) == 10
+
+
+def test_resource_init(benchmark, client, album_json):
+    track_json = dict(album_json["tracks"]["data"][0])
+    track = benchmark(deezer.Track, client, track_json)
+    assert track.title == "One More Time"
+
+
+def test_resource_asdict(benchmark, client, album_json):
+    album = client._process_json(album_json)
+    result = benchmark(album.asdict)
+    assert result["title"] == "Discovery"
+
+
+def test_get_album_replay(benchmark, client):
+    album = benchmark(client.get_album, ALBUM_ID)
+    assert album.title == "Discovery"
+
+
+def test_get_album_replay_metrics(benchmark, client):
+    metrics = deezer.MetricsCollector().install(client)
+    album = benchmark(client.get_album, ALBUM_ID)
+    assert album.title == "Discovery"
+    assert metrics.value("requests_total", object_type="album", relation="") > 0
+
+
+def test_iter_relation(benchmark, paginated_album):
+    _, album = paginated_album
+
+    def iterate():
+        return sum(1 for _ in album.iter_tracks())
+
+    assert benchmark(iterate) == 14 * PAGES
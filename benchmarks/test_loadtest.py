@@ -0,0 +1,55 @@
+from .loadtest import BULK_SIZE, Report, Workload, run
+
+
+class FakeClient:
+    def get_object(self, object_t, object_id):
+        return object_t, object_id
+
+
+def test_report_percentiles():
+    report = Report("requests", duration=1)
+    for latency in range(1, 101):
+        report.record(latency / 1000, error=latency > 98)
+    values = report.asdict()
+    assert values["p50_ms"] == 50
+    assert values["p99_ms"] == 99
+    assert values["error_rate"] == 0.02
+
+
+def test_workload_mix():
+    workload = Workload({"search": 1})
+    assert {workload.next_operation()[0] for _ in range(10)} == {"search"}
+
+
+def test_run_smoke():
+    reports = run(["urllib3", "tornado"], rate=50, duration=0.5, artists=5)
+    for report in reports:
+        assert report.requests == 25
+        assert report.dropped == 0
+        assert report.errors == 0
+
+
+def test_workload_bulk():
+    workload = Workload({"bulk": 1}, artists=5)
+    name, operation = workload.next_operation()
+    albums = operation(FakeClient())
+    assert name == "bulk"
+    assert len(albums) == BULK_SIZE
+    assert all(object_t == "album" for object_t, _ in albums)
+
+
+def test_run_drops_above_concurrency():
+    reports = run(
+        ["urllib3", "tornado"],
+        rate=200,
+        duration=0.25,
+        concurrency=1,
+        mix={"lookup": 1},
+        artists=5,
+        latency=0.05,
+    )
+    for report in reports:
+        assert report.dropped > 0
+        assert report.requests + report.dropped == 50
+        # measured from the scheduled times: at least the latency of the server
+        assert report.percentile(50) >= 0.05
@@ -0,0 +1,86 @@
+"""
+Memory footprint of the resources and of the main code paths.
+
+Each test measures allocations with tracemalloc over the recorded
+payloads and fails when a budget from ``memory_budgets.json`` is
+exceeded. Run them with::
+
+    pytest benchmarks/test_memory.py -s
+
+The measures are printed, to update the budgets after an intended change.
+"""
+import json
+import os
+
+import pytest
+
+import deezer
+
+from .conftest import PAGES
+from .memory import measure
+
+INSTANCES = 1000
+
+with open(os.path.join(os.path.dirname(__file__), "memory_budgets.json")) as f:
+    BUDGETS = json.load(f)
+
+
+def check_budget(name, value):
+    print("{}: {}".format(name, value))
+    assert value <= BUDGETS[name], "{} is {}, over its budget of {}".format(
+        name, value, BUDGETS[name]
+    )
+
+
+def flat(json):
+    """Keep the fields of a json object which are not nested objects."""
+    return {key: value for key, value in json.items() if not isinstance(value, dict)}
+
+
+@pytest.mark.parametrize(
+    "name, resource_class, path",
+    [
+        ("track_instance_bytes", deezer.Track, ("tracks", "data", 0)),
+        ("album_instance_bytes", deezer.Album, ()),
+    ],
+)
+def test_bytes_per_instance(client, album_json, name, resource_class, path):
+    data = album_json
+    for key in path:
+        data = data[key]
+    data = flat(data)
+    result = measure(lambda: [resource_class(client, data) for _ in range(INSTANCES)])
+    check_budget(name, result.retained // INSTANCES)
+
+
+def test_process_json_album(client, album_json):
+    result = measure(client._process_json, album_json)
+    check_budget("process_json_album_peak_bytes", result.peak)
+
+
+def test_process_json_chart(client, chart_json):
+    result = measure(client._process_json, chart_json, parent="chart")
+    check_budget("process_json_chart_peak_bytes", result.peak)
+
+
+def test_get_album(client):
+    result = measure(client.get_album, 302127)
+    check_budget("get_album_peak_bytes", result.peak)
+
+
+def test_asdict(client, album_json):
+    album = client._process_json(album_json)
+    result = measure(album.asdict)
+    check_budget("asdict_album_peak_bytes", result.peak)
+
+
+def test_iter_relation(paginated_album):
+    _, album = paginated_album
+
+    def crawl():
+        return sum(1 for _ in album.iter_tracks())
+
+    result = measure(crawl)
+    assert result.result == 14 * PAGES
+    check_budget("iter_relation_peak_bytes", result.peak)
+    check_budget("iter_relation_retained_bytes", result.retained)
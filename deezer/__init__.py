@@ -1,15 +1,5 @@
-from deezer.client import Client
-from deezer.resources import (
-    Album,
-    Artist,
-    Comment,
-    Genre,
-    Playlist,
-    Radio,
-    Resource,
-    Track,
-    User,
-)
+import sys
+from importlib import import_module
 
 __version__ = "1.4.0"
 __all__ = [
@@ -23,6 +13,64 @@ __all__ = [
     "User",
     "Comment",
     "Radio",
+    "SearchCache",
+    "Cursor",
+    "HighWaterMark",
+    "RateLimiter",
+    "MetricsCollector",
 ]
 
 USER_AGENT = "Deezer Python API Wrapper v{}".format(__version__)
+
+# The names exported are imported from their module on first access, so
+# ``import deezer`` stays cheap for short-lived processes.
+_LAZY_ATTRIBUTES = {
+    "Client": "deezer.client",
+    "Resource": "deezer.resources",
+    "Album": "deezer.resources",
+    "Artist": "deezer.resources",
+    "Genre": "deezer.resources",
+    "Playlist": "deezer.resources",
+    "Track": "deezer.resources",
+    "User": "deezer.resources",
+    "Comment": "deezer.resources",
+    "Radio": "deezer.resources",
+    "SearchCache": "deezer.cache",
+    "Cursor": "deezer.pagination",
+    "HighWaterMark": "deezer.pagination",
+    "RateLimiter": "deezer.ratelimit",
+    "MetricsCollector": "deezer.metrics",
+}
+# Modules which used to be imported along with the package
+_LAZY_MODULES = {
+    "cache",
+    "client",
+    "metrics",
+    "pagination",
+    "profiling",
+    "ratelimit",
+    "resources",
+    "tracing",
+    "transports",
+    "utils",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_MODULES:
+        return import_module("deezer." + name)
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    value = getattr(import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
+
+
+if sys.version_info < (3, 7):  # pragma: no cover - no module __getattr__
+    for _name in _LAZY_ATTRIBUTES:
+        __getattr__(_name)
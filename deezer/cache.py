@@ -0,0 +1,398 @@
+"""
+Caches to avoid repeating requests to the Deezer API.
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+logger = logging.getLogger(__name__)
+
+SEARCHABLE_FIELDS = ("title", "name", "title_short")
+SEARCHABLE_RELATIONS = ("artist", "album")
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    A bounded mapping evicting the least recently used entries first.
+
+    Entries may also expire after ``ttl`` seconds. Operations are guarded
+    by a lock so the cache can be shared between threads.
+
+    :param maxsize: maximum number of entries kept.
+    :param ttl: time to live of each entry in seconds, ``None`` to never expire.
+    """
+
+    def __init__(self, maxsize=128, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """The number of entries not yet expired, dropping the expired ones."""
+        now = time.monotonic()
+        with self._lock:
+            expired = [
+                key
+                for key, (expires, _) in self._data.items()
+                if expires is not None and expires <= now
+            ]
+            for key in expired:
+                del self._data[key]
+            return len(self._data)
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def get(self, key, default=None):
+        """
+        Get the value stored under ``key``.
+
+        :returns: the value, or ``default`` if missing or expired.
+        """
+        with self._lock:
+            try:
+                expires, value = self._data[key]
+            except KeyError:
+                return default
+            if expires is not None and expires <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """Store ``value`` under ``key``, evicting old entries if needed."""
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def items(self):
+        """
+        :returns: a list of the ``(key, value)`` pairs not yet expired.
+        """
+        now = time.monotonic()
+        with self._lock:
+            return [
+                (key, value)
+                for key, (expires, value) in self._data.items()
+                if expires is None or expires > now
+            ]
+
+    def clear(self):
+        """Remove all the entries."""
+        with self._lock:
+            self._data.clear()
+
+
+CachedObject = namedtuple("CachedObject", ["value", "stale", "age"])
+CachedObject.__doc__ = """
+An entry of an :class:`ObjectCache`.
+
+:ivar value: the cached payload.
+:ivar stale: whether the entry is older than the ``ttl`` of the cache.
+:ivar age: the seconds since the payload was stored.
+"""
+
+
+class ObjectCache:
+    """
+    A cache of the payloads of :meth:`~deezer.client.Client.get_object`.
+
+    Payloads are stored by url, and used instead of requesting the API
+    for ``ttl`` seconds. They are then kept stale for ``max_stale`` more
+    seconds, to be served when the API fails or its circuit is open, see
+    :class:`~deezer.resilience.CircuitBreaker`.
+
+    With ``revalidate``, a payload expired for less than ``revalidate``
+    seconds is still served right away, while it is refreshed in the
+    background (stale-while-revalidate): popular objects are then never
+    waited for. The refreshes are sent from a pool of ``max_refreshes``
+    threads, so the transport of the client must be thread safe: otherwise
+    the client warns and waits for the refresh.
+
+        >>> import deezer
+        >>> client = deezer.Client(
+        ...     thread_safe=True, object_cache=ObjectCache(ttl=60, revalidate=600)
+        ... )
+
+    :param maxsize: maximum number of payloads kept.
+    :param ttl: seconds during which a payload is fresh.
+    :param max_stale: seconds during which an expired payload is kept,
+                      ``None`` to keep it until evicted.
+    :param revalidate: seconds after ``ttl`` during which a payload is
+                       served while refreshed, ``None`` to always wait for
+                       the refresh.
+    :param max_refreshes: maximum number of concurrent refreshes, the
+                          payloads expiring when all are busy are refreshed
+                          by the next call after the previous one ended.
+    """
+
+    def __init__(
+        self, maxsize=1024, ttl=300, max_stale=3600, revalidate=None, max_refreshes=4
+    ):
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.revalidate = revalidate
+        self.max_refreshes = max_refreshes
+        kept = None if max_stale is None else ttl + max_stale
+        self._entries = LRUCache(maxsize=maxsize, ttl=kept)
+        self._refreshing = set()
+        self._executor = None
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """
+        The number of payloads which can be served, fresh or stale, the
+        ones expired for more than ``max_stale`` are dropped.
+        """
+        return len(self._entries)
+
+    def lookup(self, key):
+        """
+        Get the payload stored under ``key``, fresh or stale.
+
+        :returns: a :class:`CachedObject`, or ``None`` if missing.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        age = time.monotonic() - stored_at
+        return CachedObject(value, age >= self.ttl, age)
+
+    def set(self, key, value):
+        """Store a payload under ``key``."""
+        self._entries.set(key, (time.monotonic(), value))
+
+    def clear(self):
+        """Remove all the payloads."""
+        self._entries.clear()
+
+    def can_revalidate(self, cached):
+        """
+        :returns: whether a stale entry can be served while it is refreshed.
+        """
+        return self.revalidate is not None and cached.age < self.ttl + self.revalidate
+
+    def refresh(self, key, fetch):
+        """
+        Refresh the payload stored under ``key`` in the background.
+
+        Nothing is done if the key is already being refreshed, or if
+        ``max_refreshes`` refreshes are running.
+
+        :param fetch: the function returning the new payload, or ``None``
+                      to keep the current one.
+        :returns: whether the refresh was started.
+        """
+        with self._lock:
+            if key in self._refreshing or len(self._refreshing) >= self.max_refreshes:
+                return False
+            if self._executor is None or self._pid != os.getpid():
+                from concurrent.futures import ThreadPoolExecutor
+
+                # the threads of the parent don't exist in a forked process
+                self._pid = os.getpid()
+                self._refreshing.clear()
+                self._executor = ThreadPoolExecutor(max_workers=self.max_refreshes)
+            self._refreshing.add(key)
+            self._executor.submit(self._refresh, key, fetch)
+        return True
+
+    def _refresh(self, key, fetch):
+        try:
+            value = fetch()
+        except Exception:
+            logger.warning("Failed to refresh %s", key, exc_info=True)
+        else:
+            if value is not None:
+                self.set(key, value)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def shutdown(self):
+        """Stop the threads refreshing the payloads."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+class SearchResult:
+    """
+    The results of a search query cached from its first index.
+
+    :param items: the resources returned so far, from index 0.
+    :param total: the total number of results reported by the API.
+    """
+
+    __slots__ = ("items", "total")
+
+    def __init__(self, items, total):
+        self.items = items
+        self.total = total
+
+    @property
+    def complete(self):
+        """Whether all the results of the query are cached."""
+        return len(self.items) >= self.total
+
+    def page(self, index, limit):
+        """
+        :returns: the cached results between ``index`` and ``index + limit``,
+                  or ``None`` if they are not all cached.
+        """
+        if not self.complete and index + limit > len(self.items):
+            return None
+        return self.items[index:][:limit]
+
+
+class SearchCache:
+    """
+    A cache for :meth:`~deezer.client.Client.search` results.
+
+    Queries are normalized before lookup: case, whitespace and term order
+    are ignored, so ``"Daft  Punk"`` and ``"punk daft"`` share an entry.
+
+    When all the results of a query are cached, they are reused for any
+    narrower query, where each term starts with one of the cached terms:
+    ``"daft p"`` is answered locally from a complete ``"daft"`` result set,
+    keeping the results whose title, name, artist or album contains all the
+    terms. This is typically what happens while a user is typing.
+
+    Only complete result sets are reused: all the ``total`` results of the
+    broader query must have been fetched, in its first page or by
+    iterating it with :meth:`~deezer.client.Client.iter_search`. A first
+    page alone isn't enough, as the results missing from it may match the
+    narrower query. The local filter is a plain, case insensitive substring
+    match of each term, which differs from the matching of Deezer: it
+    doesn't handle fuzzy spellings or other fields, and the results keep
+    the order of the broader query instead of being ranked again. Don't use
+    the cache where the exact results of the API matter.
+
+        >>> import deezer
+        >>> client = deezer.Client(search_cache=deezer.SearchCache())
+
+    :param maxsize: maximum number of queries kept.
+    :param ttl: time to live of each query in seconds.
+    """
+
+    def __init__(self, maxsize=256, ttl=300):
+        self._results = LRUCache(maxsize=maxsize, ttl=ttl)
+
+    def __len__(self):
+        return len(self._results)
+
+    @staticmethod
+    def normalize_query(query):
+        """
+        :returns: the terms of the query, lower cased and sorted.
+        """
+        return tuple(sorted(query.lower().split()))
+
+    @staticmethod
+    def normalize_terms(terms):
+        """
+        Normalize the terms of an advanced search.
+
+        :returns: the sorted ``(field, value)`` pairs, lower cased with
+                  whitespace collapsed.
+        """
+        return tuple(
+            sorted(
+                (str(key).lower(), " ".join(str(value).lower().split()))
+                for key, value in terms.items()
+            )
+        )
+
+    @staticmethod
+    def _key(normalized, relation, kwargs):
+        options = tuple(sorted((key, str(value)) for key, value in kwargs.items()))
+        return normalized, relation, options
+
+    def get(self, normalized, relation, index, limit, **kwargs):
+        """
+        Get a page of results from the cache.
+
+        :param normalized: the normalized query, as returned by
+                           :meth:`normalize_query` or :meth:`normalize_terms`.
+        :returns: a list of resources, or ``None`` on a cache miss.
+        """
+        key = self._key(normalized, relation, kwargs)
+        result = self._results.get(key)
+        if result is not None:
+            page = result.page(index, limit)
+            if page is not None:
+                return page
+        result = self._narrow(key)
+        if result is None:
+            return None
+        self._results.set(key, result)
+        return result.page(index, limit)
+
+    def set(self, normalized, relation, index, items, total, **kwargs):
+        """
+        Store a page of results in the cache.
+
+        Pages are only kept when they start at index 0 or directly follow
+        the results already cached for the query.
+        """
+        key = self._key(normalized, relation, kwargs)
+        result = self._results.get(key)
+        if index == 0:
+            result = SearchResult(list(items), total)
+        elif result is not None and index == len(result.items):
+            result = SearchResult(result.items + list(items), total)
+        else:
+            return
+        self._results.set(key, result)
+
+    def _narrow(self, key):
+        """
+        Build the results of a plain query from a broader complete query.
+
+        :returns: a :class:`SearchResult`, or ``None`` if none applies.
+        """
+        terms, relation, options = key
+        if not terms or any(isinstance(term, tuple) for term in terms):
+            return None
+        for cached_key, result in self._results.items():
+            cached_terms = cached_key[0]
+            if cached_key[1:] != (relation, options) or not result.complete:
+                continue
+            if not _is_broader(cached_terms, terms):
+                continue
+            items = [item for item in result.items if _matches(item, terms)]
+            return SearchResult(items, len(items))
+        return None
+
+
+def _is_broader(cached_terms, terms):
+    """Whether each of ``cached_terms`` is the start of one of ``terms``."""
+    if not cached_terms or any(isinstance(term, tuple) for term in cached_terms):
+        return False
+    if cached_terms == terms:
+        return False
+    return all(
+        any(term.startswith(cached) for term in terms) for cached in cached_terms
+    )
+
+
+def _matches(resource, terms):
+    """Whether the searchable text of ``resource`` contains all the ``terms``."""
+    texts = [getattr(resource, field, None) for field in SEARCHABLE_FIELDS]
+    for relation in SEARCHABLE_RELATIONS:
+        related = getattr(resource, relation, None)
+        texts.extend(getattr(related, field, None) for field in SEARCHABLE_FIELDS)
+    text = " ".join(str(value).lower() for value in texts if value)
+    return all(term in text for term in terms)
@@ -0,0 +1,182 @@
+"""
+Helpers to follow the changes of the Deezer charts over time.
+"""
+import hashlib
+
+CHART_SECTIONS = ("tracks", "albums", "artists", "playlists")
+
+
+def _item_id(item):
+    """Get the id of a chart item, either a resource or its raw json."""
+    if isinstance(item, dict):
+        return item["id"]
+    return item.id
+
+
+class ChartSnapshot:
+    """
+    The compact state of a chart: the ids of each section, in chart order.
+
+    Only the ids are kept, their position in the chart being their index
+    plus one, along with a digest of the content to compare snapshots
+    without looking at the individual items.
+
+    :param sections: a dictionary of section name to the list of ids.
+    """
+
+    __slots__ = ("sections", "digest")
+
+    def __init__(self, sections):
+        self.sections = {name: tuple(ids) for name, ids in sections.items()}
+        content = ";".join(
+            "{}:{}".format(name, ",".join(str(i) for i in self.sections[name]))
+            for name in sorted(self.sections)
+        )
+        self.digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def __repr__(self):
+        return "<ChartSnapshot: {}>".format(self.digest[:12])
+
+    def __eq__(self, other):
+        if not isinstance(other, ChartSnapshot):
+            return NotImplemented
+        return self.digest == other.digest
+
+    @classmethod
+    def from_items(cls, section, items):
+        """
+        Take a snapshot of a single chart section.
+
+        :param section: the name of the section, e.g. ``"tracks"``.
+        :param items: the resources, or their raw json, in chart order.
+        """
+        return cls({section: [_item_id(item) for item in items]})
+
+    @classmethod
+    def from_chart(cls, chart):
+        """
+        Take a snapshot of all the sections of a chart.
+
+        :param chart: a :class:`~deezer.resources.Chart` resource, or its
+                      raw json.
+        """
+        sections = {}
+        for section in CHART_SECTIONS:
+            if isinstance(chart, dict):
+                items = chart.get(section, {}).get("data")
+            else:
+                items = getattr(chart, section, None)
+            if items is not None:
+                sections[section] = [_item_id(item) for item in items]
+        return cls(sections)
+
+    def diff(self, previous):
+        """
+        Compare the snapshot with a previous one.
+
+        :param previous: the previous :class:`ChartSnapshot`, ``None`` if
+                         there is none, in which case all items are entries.
+        :returns: a :class:`ChartDiff`.
+        """
+        result = ChartDiff()
+        for section, ids in self.sections.items():
+            old_ids = previous.sections.get(section, ()) if previous else ()
+            old_positions = {item_id: pos for pos, item_id in enumerate(old_ids, 1)}
+            for position, item_id in enumerate(ids, 1):
+                old_position = old_positions.pop(item_id, None)
+                if old_position is None:
+                    result.entries.append((section, item_id, position))
+                elif old_position != position:
+                    result.moves.append((section, item_id, old_position, position))
+            for item_id, old_position in old_positions.items():
+                result.exits.append((section, item_id, old_position))
+        return result
+
+
+class ChartDiff:
+    """
+    The changes between two chart snapshots.
+
+    :ivar entries: ``(section, id, position)`` of the items entering the chart.
+    :ivar exits: ``(section, id, previous_position)`` of the items leaving it.
+    :ivar moves: ``(section, id, previous_position, position)`` of the items
+                 changing position.
+    :ivar chart: the new chart, when produced by :class:`ChartWatcher`.
+    """
+
+    def __init__(self):
+        self.entries = []
+        self.exits = []
+        self.moves = []
+        self.chart = None
+
+    def __bool__(self):
+        return bool(self.entries or self.exits or self.moves)
+
+    def __repr__(self):
+        return "<ChartDiff: {} entries, {} exits, {} moves>".format(
+            len(self.entries), len(self.exits), len(self.moves)
+        )
+
+    def asdict(self):
+        """
+        Convert the diff to a dictionary
+        """
+        return {
+            "entries": [
+                {"section": s, "id": i, "position": p} for s, i, p in self.entries
+            ],
+            "exits": [
+                {"section": s, "id": i, "previous_position": p}
+                for s, i, p in self.exits
+            ],
+            "moves": [
+                {"section": s, "id": i, "previous_position": old, "position": new}
+                for s, i, old, new in self.moves
+            ],
+        }
+
+
+class ChartWatcher:
+    """
+    Poll a chart and report only what changed since the previous poll.
+
+    The chart is fetched as raw json and the snapshot is taken before any
+    resource is built: when its digest didn't change, :meth:`poll` returns
+    ``None`` straight away and the downstream work can be skipped.
+
+        >>> watcher = ChartWatcher(client, "tracks")
+        >>> diff = watcher.poll()
+        >>> if diff is not None:
+        ...     publish(diff.asdict())
+
+    :param client: the :class:`~deezer.client.Client` to use.
+    :param relation: the chart section to poll, ``None`` for all of them.
+    :param snapshot: a previous :class:`ChartSnapshot` to start from.
+    """
+
+    def __init__(self, client, relation=None, snapshot=None, **kwargs):
+        self.client = client
+        self.relation = relation
+        self.snapshot = snapshot
+        self.kwargs = kwargs
+
+    def poll(self):
+        """
+        Fetch the chart and compare it with the last snapshot.
+
+        :returns: a :class:`ChartDiff`, or ``None`` if the chart didn't change.
+        """
+        json = self.client._get_json(
+            "chart", object_id="0", relation=self.relation, **self.kwargs
+        )
+        if self.relation is None:
+            snapshot = ChartSnapshot.from_chart(json)
+        else:
+            snapshot = ChartSnapshot.from_items(self.relation, json["data"])
+        if self.snapshot is not None and snapshot.digest == self.snapshot.digest:
+            return None
+        diff = snapshot.diff(self.snapshot)
+        diff.chart = self.client._process_json(json, parent="chart")
+        self.snapshot = snapshot
+        return diff
@@ -2,11 +2,21 @@
 Implements a client class to query the
 `Deezer API <http://developers.deezer.com/api>`_
 """
+import itertools
+import logging
+import os
+import re
+import time
 import warnings
-from urllib.parse import urlencode
-
-import requests
+import weakref
+from collections import deque
+from contextlib import contextmanager
+from functools import partial
+from urllib.parse import quote_plus, urlencode
 
+from deezer import tracing
+from deezer.concurrency import is_overloaded
+from deezer.profiling import Profile
 from deezer.resources import (
     Album,
     Artist,
@@ -18,13 +28,48 @@ from deezer.resources import (
     Track,
     User,
 )
-from deezer.utils import SortedDict
+from deezer.transports import RequestsTransport, ThreadSafeRequestsTransport
+
+logger = logging.getLogger(__name__)
 
 DEPRECATED_ARG_MESSAGE = (
     "The `{arg_name}` keyword argument is deprecated "
     "and will be removed in the next major release."
 )
 
+#: Number of urls memoized by :meth:`Client.object_url`
+URL_CACHE_SIZE = 1024
+
+#: Events a callback can be registered for with :meth:`Client.add_hook`
+HOOK_EVENTS = ("before_request", "after_response", "on_error", "on_cache_hit")
+
+DEPRECATED_OPTIONS = ("host", "use_ssl", "do_not_compress_reponse")
+
+# The access token parameter of an url, with the separator around it
+_TOKEN_PARAMETER = re.compile(r"([?&])access_token=[^&#\s'\"]*(&?)")
+
+#: Number of threads of a fan-out by default, over a thread safe transport
+DEFAULT_WORKERS = 4
+
+# The clients of the process by key, to reattach unpickled resources to
+_clients = weakref.WeakValueDictionary()
+_client_keys = itertools.count()
+
+
+def _reset_clients_after_fork():
+    for client in set(_clients.values()):
+        try:
+            client._after_fork()
+        except Exception:
+            logger.exception("Failed to reset the client %r after fork", client)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_clients_after_fork)
+    _CHECK_PID = False
+else:  # pragma: no cover - Python < 3.7, check the pid before requests
+    _CHECK_PID = True
+
 
 class Client:
     """
@@ -49,6 +94,28 @@ class Client:
     :param app_secret: application secret.
     :param access_token: user access token.
     :param headers: a dictionary of headers to be used.
+    :param search_cache: a :class:`~deezer.cache.SearchCache` to serve
+                         repeated :meth:`search` calls from.
+    :param rate_limiter: a :class:`~deezer.ratelimit.RateLimiter` to wait
+                         for before each request, or a lane of a
+                         :class:`~deezer.ratelimit.PriorityRateLimiter`
+                         shared with other clients.
+    :param transport: the :class:`~deezer.transports.Transport` sending the
+                      requests, a :class:`~deezer.transports.RequestsTransport`
+                      by default.
+    :param tracer: an OpenTelemetry tracer recording spans of the calls and
+                   of their requests, see :mod:`deezer.tracing`.
+    :param thread_safe: use a
+                        :class:`~deezer.transports.ThreadSafeRequestsTransport`
+                        by default, so the client can be shared between
+                        threads.
+    :param object_cache: an :class:`~deezer.cache.ObjectCache` to serve
+                         repeated :meth:`get_object` calls from, and stale
+                         payloads when the API fails.
+    :param circuit_breaker: a :class:`~deezer.resilience.CircuitBreaker`
+                            failing fast while the API keeps failing.
+    :param hedging: a :class:`~deezer.resilience.Hedging` sending duplicates
+                    of the slowest requests.
 
     .. deprecated:: 1.4.0
 
@@ -73,15 +140,47 @@ class Client:
         "chart": Chart,
     }
 
+    #: Whether the requests are sent from an IOLoop, where hooks must not block
+    asynchronous = False
+
+    #: Whether pickles of the client include its ``app_secret`` and
+    #: ``access_token``, see :meth:`__reduce__`
+    pickle_credentials = False
+
     def __init__(
-        self, app_id=None, app_secret=None, access_token=None, headers=None, **kwargs
+        self,
+        app_id=None,
+        app_secret=None,
+        access_token=None,
+        headers=None,
+        search_cache=None,
+        rate_limiter=None,
+        transport=None,
+        tracer=None,
+        thread_safe=False,
+        object_cache=None,
+        circuit_breaker=None,
+        hedging=None,
+        **kwargs
     ):
+        self._url_cache = None
         self.app_id = app_id
         self.app_secret = app_secret
         self.access_token = access_token
+        self.search_cache = search_cache
+        self.rate_limiter = rate_limiter
+        self.tracer = tracer
+        self.object_cache = object_cache
+        self.circuit_breaker = circuit_breaker
+        self.hedging = hedging
         self.host = "api.deezer.com"
         self.use_ssl = True
-        self.session = requests.Session()
+        if transport is None:
+            transport = (
+                ThreadSafeRequestsTransport() if thread_safe else RequestsTransport()
+            )
+        self.transport = transport
+        self.headers = {}
 
         # Deprecated arguments
         deprecated_kwargs = ["host", "use_ssl"]
@@ -95,14 +194,181 @@ class Client:
             warnings.warn(
                 DEPRECATED_ARG_MESSAGE.format(arg_name="do_not_compress_reponse")
             )
-            self.session.headers.update({"Accept-Encoding": "identity"})
+            self.headers["Accept-Encoding"] = "identity"
 
         # Headers
         if headers:
-            self.session.headers.update(headers)
+            self.headers.update(headers)
 
         self.options = kwargs
         self._authorize_url = None
+        self._hooks = {}
+        self._pid = os.getpid()
+        self._key = (self._pid, next(_client_keys))
+        _clients[self._key] = self
+
+    def _after_fork(self):
+        """Drop the connections inherited from the parent process."""
+        self._pid = os.getpid()
+        reset = getattr(self.transport, "reset", None)
+        if reset is not None:
+            reset()
+
+    def __reduce__(self):
+        """
+        Pickle the client by reference to the process it was created in.
+
+        Copies use :meth:`__copy__` and :meth:`__deepcopy__` instead, to get
+        a separate client.
+
+        A client unpickled in the same process, or in a process forked
+        from it, is the original client. Elsewhere, a new client is created
+        with the same ``app_id``, host and headers, the other parameters
+        like the transport or the rate limiter aren't kept.
+
+        The ``app_secret`` and the ``access_token`` aren't pickled, so they
+        don't leak into files or queues holding the pickles: a client
+        created elsewhere has none. Set :attr:`pickle_credentials` to
+        include them in cleartext, for instance to send the client to
+        processes started with ``spawn``.
+        """
+        options = {
+            name: value
+            for name, value in self.options.items()
+            if name not in DEPRECATED_OPTIONS
+        }
+        config = {
+            "app_id": self.app_id,
+            "headers": dict(self.headers),
+            "thread_safe": isinstance(self.transport, ThreadSafeRequestsTransport),
+            "host": self.host,
+            "use_ssl": self.use_ssl,
+            "options": options,
+        }
+        if self.pickle_credentials:
+            config.update(app_secret=self.app_secret, access_token=self.access_token)
+        return _restore_client, (type(self), self._key, config)
+
+    def __copy__(self):
+        """
+        Create a new client with the same parameters, credentials and hooks.
+
+        The copy shares the transport and the other components, like the
+        caches or the rate limiter, but its headers and hooks can be changed
+        apart from the original.
+        """
+        options = {
+            name: value
+            for name, value in self.options.items()
+            if name not in DEPRECATED_OPTIONS
+        }
+        client = type(self)(
+            app_id=self.app_id,
+            app_secret=self.app_secret,
+            access_token=self.access_token,
+            headers=self.headers,
+            search_cache=self.search_cache,
+            rate_limiter=self.rate_limiter,
+            transport=self.transport,
+            tracer=self.tracer,
+            object_cache=self.object_cache,
+            circuit_breaker=self.circuit_breaker,
+            hedging=self.hedging,
+            **options
+        )
+        client.host = self.host
+        client.use_ssl = self.use_ssl
+        client._hooks = {event: list(hooks) for event, hooks in self._hooks.items()}
+        return client
+
+    def __deepcopy__(self, memo):
+        """
+        Create a new client like :meth:`__copy__`: the components holding
+        connections and locks are shared, not copied.
+        """
+        client = self.__copy__()
+        memo[id(self)] = client
+        return client
+
+    def add_hook(self, event, callback):
+        """
+        Register a callback called on an event of the requests.
+
+        Callbacks receive a single dictionary describing the request, with
+        the ``object_t``, ``object_id``, ``relation``, ``index`` and ``url``
+        keys. The ``url`` is stripped of the ``access_token``, so it can be
+        logged or traced:
+
+        * ``before_request``: before the request is sent.
+        * ``after_response``: once the response is received, with its
+          ``status_code``, its ``size`` in bytes, the ``elapsed`` seconds to
+          receive it, the ``time_to_headers`` seconds if the transport
+          reports it and the ``parse_time`` seconds to decode its json.
+        * ``on_error``: when the request fails or the API returns an error,
+          with the ``error`` raised, and the ``api_error`` payload of the
+          API if any.
+        * ``on_cache_hit``: when a call is served from a cache, with the
+          ``cache`` name: ``"search"`` for the :attr:`search_cache`, which
+          has no ``url``, or ``"object"`` for the :attr:`object_cache`,
+          along with whether the payload is ``stale``.
+
+        The dictionary is shared by the callbacks of the same request. The
+        duplicates sent by the :attr:`hedging` get their own, with ``hedge``
+        set to ``True``.
+        Requests are not instrumented at all while no callback is registered.
+
+            >>> client.add_hook("after_response", lambda info: print(info["url"]))
+
+        :param event: one of :data:`HOOK_EVENTS`.
+        :param callback: a callable taking the dictionary.
+        :raises ValueError: if the event is unknown.
+        """
+        if event not in HOOK_EVENTS:
+            raise ValueError(
+                "Unknown event {}, expected one of {}".format(
+                    event, ", ".join(HOOK_EVENTS)
+                )
+            )
+        self._hooks.setdefault(event, []).append(callback)
+
+    def remove_hook(self, event, callback):
+        """
+        Unregister a callback registered with :meth:`add_hook`.
+
+        :raises ValueError: if the callback isn't registered for the event.
+        """
+        callbacks = self._hooks.get(event, [])
+        callbacks.remove(callback)
+        if not callbacks:
+            del self._hooks[event]
+
+    def _emit(self, event, info):
+        """Call the callbacks registered for an event."""
+        for callback in self._hooks.get(event, ()):
+            callback(info)
+
+    @contextmanager
+    def profile(self, stream=None):
+        """
+        Measure where the time of the calls made within a ``with`` block
+        goes: network, json decoding or building resources.
+
+            >>> with client.profile() as profile:
+            ...     client.get_album(302127)
+            >>> print(profile.report())
+
+        :param stream: a file to write the report to at exit, e.g.
+                       ``sys.stderr``.
+        :returns: a :class:`~deezer.profiling.Profile`, filled at exit.
+        """
+        profile = Profile()
+        profile.attach(self)
+        try:
+            yield profile
+        finally:
+            profile.detach(self)
+            if stream is not None:
+                stream.write(profile.report())
 
     def _process_json(self, item, parent=None):
         """
@@ -128,6 +394,109 @@ class Client:
             object_class = self.objects_types[parent]
         return object_class(self, result)
 
+    @property
+    def session(self):
+        """
+        The ``requests.Session`` of the :attr:`transport`, ``None`` if it
+        doesn't use requests.
+        """
+        return getattr(self.transport, "session", None)
+
+    @session.setter
+    def session(self, session):
+        self.transport.session = session
+
+    @property
+    def thread_safe(self):
+        """
+        Whether the :attr:`transport` may send requests from several threads
+        at once, see the ``thread_safe`` parameter.
+        """
+        return getattr(self.transport, "thread_safe", False)
+
+    def _fan_out_workers(self, workers):
+        """
+        The number of threads a fan-out may send requests from.
+
+        :param workers: the number of threads asked for, ``None`` for
+                        :data:`DEFAULT_WORKERS` if the transport is thread
+                        safe and 1 otherwise.
+        :returns: ``workers``, or 1 with a warning if the transport isn't
+                  thread safe.
+        """
+        if workers is None:
+            return DEFAULT_WORKERS if self.thread_safe else 1
+        if workers > 1 and not self.thread_safe:
+            self._warn_not_thread_safe(
+                "sending the requests one at a time", "send them in parallel", 3
+            )
+            return 1
+        return max(workers, 1)
+
+    def _warn_not_thread_safe(self, fallback, remedy, stacklevel):
+        """
+        Warn that a feature sending requests from other threads falls back
+        to the calling thread, as the transport isn't thread safe.
+
+        :param fallback: what is done instead, like "sending the requests
+                         one at a time".
+        :param remedy: what ``thread_safe=True`` allows, like "send them in
+                       parallel".
+        :param stacklevel: the stack level of the warning for the caller.
+        """
+        warnings.warn(
+            "The transport of the client is not thread safe, {}. Create the "
+            "client with thread_safe=True to {}.".format(fallback, remedy),
+            RuntimeWarning,
+            stacklevel=stacklevel + 1,
+        )
+
+    @property
+    def access_token(self):
+        """The user access token sent with each request, if any."""
+        return self._access_token
+
+    @access_token.setter
+    def access_token(self, value):
+        self._access_token = value
+        self._reset_urls()
+
+    @property
+    def host(self):
+        """The host name of the API."""
+        return self._host
+
+    @host.setter
+    def host(self, value):
+        self._host = value
+        self._reset_urls()
+
+    @property
+    def use_ssl(self):
+        """Whether to connect using HTTPS."""
+        return self._use_ssl
+
+    @use_ssl.setter
+    def use_ssl(self, value):
+        self._use_ssl = value
+        self._reset_urls()
+
+    def _reset_urls(self):
+        """
+        Forget the urls built, after a change of the parameters they use.
+
+        The urls are kept along with the parameters, replaced at once, so a
+        concurrent :meth:`object_url` never mixes old and new parameters.
+        """
+        token = getattr(self, "_access_token", None)
+        token_query = None
+        if token is not None:
+            token_query = urlencode({"access_token": str(token)})
+        prefix = None
+        if hasattr(self, "_host") and hasattr(self, "_use_ssl"):
+            prefix = self.url()
+        self._url_cache = _UrlCache(prefix, token_query)
+
     @property
     def scheme(self):
         """
@@ -146,27 +515,75 @@ class Client:
         Helper method to build the url to query to access the object
         passed as parameter
 
+        The last :data:`URL_CACHE_SIZE` urls built are memoized, as well
+        as their query strings.
+
+        :raises TypeError: if the object type is invalid
+        """
+        # read once: the parameters may be changed by another thread
+        cache = self._url_cache
+        try:
+            query_key = (tuple(kwargs.items()), tuple(map(type, kwargs.values())))
+            key = (object_t, object_id, type(object_id), relation, query_key)
+            url = cache.urls.get(key)
+        except TypeError:  # unhashable arguments, not memoized
+            query_key = key = url = None
+        if url is not None:
+            return url
+        template = cache.templates.get((object_t, object_id is None, relation))
+        if template is None:
+            template = self._template(cache, object_t, object_id is None, relation)
+        prefix, suffix = template
+        url = prefix if object_id is None else prefix + str(object_id) + suffix
+        query = cache.queries.get(query_key)
+        if query is None:
+            query = self._query(kwargs, cache.token_query)
+            if query_key is not None:
+                _memoize(cache.queries, query_key, query)
+        if query:
+            url = url + "?" + query
+        if key is not None:
+            _memoize(cache.urls, key, url)
+        return url
+
+    def _query(self, kwargs, token_query):
+        """
+        Encode the query string of a request, with the access token.
+
+        :param token_query: the encoded access token parameter, if any.
+        :returns: the query string, empty without parameters.
+        """
+        if not kwargs:
+            return token_query or ""
+        # parameters are sorted by name to always request the same url
+        parameters = [
+            (name, _query_pair(name, value))
+            for name, value in kwargs.items()
+            if token_query is None or name != "access_token"
+        ]
+        if token_query is not None:
+            parameters.append(("access_token", token_query))
+        parameters.sort()
+        return "&".join(pair for _, pair in parameters)
+
+    def _template(self, cache, object_t, without_id, relation):
+        """
+        Compile the template of the urls of an object type and relation: the
+        part before the object id and the part after it, stored in the
+        :class:`_UrlCache` it is built from.
+
         :raises TypeError: if the object type is invalid
         """
         if object_t not in self.objects_types:
             raise TypeError("{} is not a valid type".format(object_t))
-        request_items = (
-            str(item) for item in [object_t, object_id, relation] if item is not None
-        )
-        request = "/".join(request_items)
-        base_url = self.url(request)
-        if self.access_token is not None:
-            kwargs["access_token"] = str(self.access_token)
-        if kwargs:
-            for key, value in kwargs.items():
-                if not isinstance(value, str):
-                    kwargs[key] = str(value)
-            # kwargs are sorted (for consistent tests between Python < 3.7 and >= 3.7)
-            sorted_kwargs = SortedDict.from_dict(kwargs)
-            result = "{}?{}".format(base_url, urlencode(sorted_kwargs))
+        if without_id:
+            path = object_t if relation is None else "{}/{}".format(object_t, relation)
+            template = (cache.prefix + path, "")
         else:
-            result = base_url
-        return result
+            suffix = "" if relation is None else "/{}".format(relation)
+            template = (cache.prefix + object_t + "/", suffix)
+        cache.templates[(object_t, without_id, relation)] = template
+        return template
 
     def get_object(
         self, object_t, object_id=None, relation=None, parent=None, **kwargs
@@ -174,18 +591,275 @@ class Client:
         """
         Actually query the Deezer API to retrieve the object
 
+        :returns: json dictionary
+        """
+        if self.tracer is None:
+            json = self._get_json(object_t, object_id, relation, **kwargs)
+            return self._process_json(json, parent)
+        attributes = tracing.call_attributes(
+            {"object_t": object_t, "object_id": object_id, "relation": relation}
+        )
+        with self.tracer.start_as_current_span(
+            tracing.span_name(object_t), attributes=attributes
+        ) as span:
+            json = self._get_json(object_t, object_id, relation, **kwargs)
+            start = time.perf_counter()
+            result = self._process_json(json, parent)
+            span.set_attribute("deezer.build_time", time.perf_counter() - start)
+        return result
+
+    def _get_json(self, object_t, object_id=None, relation=None, **kwargs):
+        """
+        Query the Deezer API and return the raw json payload
+
+        :raises ValueError: if the API returns an error
         :returns: json dictionary
         """
         url = self.object_url(object_t, object_id, relation, **kwargs)
-        response = self.session.get(url)
-        json = response.json()
+        if _CHECK_PID and self._pid != os.getpid():
+            self._after_fork()
+        info = None
+        if self._hooks or self.tracer is not None:
+            info = {
+                "object_t": object_t,
+                "object_id": object_id,
+                "relation": relation,
+                "index": kwargs.get("index"),
+                "url": _redact_token(url),
+            }
+        if self.object_cache is None:
+            json = self._request_json(url, info)
+        else:
+            json = self._cached_json(url, info)
         if "error" in json:
-            raise ValueError(
+            error = ValueError(
                 "API request return error for object: {} id: {}".format(
                     object_t, object_id
                 )
             )
-        return self._process_json(json, parent)
+            if info is not None:
+                info["error"] = error
+                info["api_error"] = json["error"]
+                self._emit("on_error", info)
+            raise error
+        return json
+
+    def _cached_json(self, url, info):
+        """
+        Get a payload from the :attr:`object_cache`, requesting the API if
+        it is missing or stale. A stale payload is returned if the request
+        fails, or if the API is overloaded, and right away while it is
+        refreshed if the cache revalidates it and the transport is thread
+        safe.
+
+        :returns: json dictionary
+        """
+        cache = self.object_cache
+        cached = cache.lookup(url)
+        revalidate = (
+            cached is not None and cached.stale and cache.can_revalidate(cached)
+        )
+        if revalidate and not self.thread_safe:
+            self._warn_not_thread_safe(
+                "refreshing the stale objects before serving them",
+                "refresh them in the background",
+                3,
+            )
+            revalidate = False
+        if revalidate:
+            refresh_info = None if info is None else dict(info)
+            cache.refresh(url, lambda: self._refreshed_json(url, refresh_info))
+        elif cached is None or cached.stale:
+            return self._fetch_cached_json(url, info, cached)
+        if info is not None:
+            info["cache"] = "object"
+            info["stale"] = cached.stale
+            self._emit("on_cache_hit", info)
+        return cached.value
+
+    def _fetch_cached_json(self, url, info, cached):
+        """
+        Request a payload missing from the :attr:`object_cache`, or stale.
+
+        :returns: json dictionary
+        """
+        try:
+            json = self._request_json(url, info)
+        except Exception as error:
+            if cached is None:
+                raise
+            logger.warning(
+                "Serving stale %s after error: %s",
+                _redact_token(url),
+                _redact_token(repr(error)),
+            )
+            return cached.value
+        if "error" not in json:
+            self.object_cache.set(url, json)
+        elif cached is not None and is_overloaded(json):
+            logger.warning(
+                "Serving stale %s, the API is overloaded", _redact_token(url)
+            )
+            return cached.value
+        return json
+
+    def _refreshed_json(self, url, info):
+        """
+        Request a payload to refresh the :attr:`object_cache`.
+
+        :returns: json dictionary, or ``None`` if the request failed or the
+                  API returned an error.
+        """
+        try:
+            json = self._request_json(url, info)
+        except Exception as error:
+            # logged here, as the cache would log the url with the token
+            logger.warning(
+                "Failed to refresh %s: %s",
+                _redact_token(url),
+                _redact_token(repr(error)),
+            )
+            return None
+        if "error" in json:
+            logger.warning(
+                "Failed to refresh %s: %s", _redact_token(url), json["error"]
+            )
+            return None
+        return json
+
+    def _request_json(self, url, info):
+        """
+        Send a request through the :attr:`circuit_breaker` and the
+        :attr:`rate_limiter`, if any.
+
+        :returns: json dictionary
+        """
+        # the rate limiter comes first: if it raised after the breaker let a
+        # trial request through, the breaker would stay half open for good
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        breaker = self.circuit_breaker
+        if breaker is not None:
+            breaker.before_request()
+        try:
+            if info is not None:
+                json = self._observed_get(url, info)
+            else:
+                json = self._transport_get(url).json()
+        except Exception:
+            if breaker is not None:
+                breaker.record_failure()
+            raise
+        if breaker is not None:
+            if is_overloaded(json):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+        return json
+
+    def _transport_get(self, url, info=None):
+        """
+        Send a request with the :attr:`transport`, hedged if enabled and
+        the transport is thread safe.
+
+        :param info: the dictionary passed to the hooks, which are also
+                     called for the duplicate of a hedged request.
+        :returns: the response
+        """
+        headers = self.headers or None
+        if self.hedging is None:
+            return self.transport.get(url, headers=headers)
+        if not self.thread_safe:
+            self._warn_not_thread_safe(
+                "sending the requests without hedging", "hedge them", 2
+            )
+            return self.transport.get(url, headers=headers)
+        duplicate = None
+        if info is not None:
+            duplicate = partial(self._hedged_get, url, dict(info, hedge=True))
+        return self.hedging.send(
+            lambda: self.transport.get(url, headers=headers),
+            self.rate_limiter,
+            duplicate,
+        )
+
+    def _hedged_get(self, url, info):
+        """
+        Send the duplicate of a hedged request, calling the hooks along the
+        way. Its payload isn't parsed here, so ``parse_time`` is 0.
+
+        :returns: the response
+        """
+        self._emit("before_request", info)
+        start = time.perf_counter()
+        try:
+            response = self.transport.get(url, headers=self.headers or None)
+        except Exception as error:
+            info["elapsed"] = time.perf_counter() - start
+            info["error"] = error
+            self._emit("on_error", info)
+            raise
+        info["elapsed"] = time.perf_counter() - start
+        info["parse_time"] = 0.0
+        info["time_to_headers"] = response.elapsed
+        info["status_code"] = response.status_code
+        info["size"] = len(response.content)
+        self._emit("after_response", info)
+        return response
+
+    def _observed_get(self, url, info):
+        """
+        Send a request in a span of the :attr:`tracer`, if any.
+
+        :returns: json dictionary
+        """
+        if self.tracer is None:
+            return self._send(url, info)
+        with self.tracer.start_as_current_span(tracing.REQUEST_SPAN) as span:
+            try:
+                return self._send(url, info)
+            finally:
+                span.set_attributes(tracing.request_attributes(info))
+
+    def _send(self, url, info):
+        """
+        Send a request, calling the hooks along the way.
+
+        :returns: json dictionary
+        """
+        self._emit("before_request", info)
+        start = time.perf_counter()
+        try:
+            response = self._transport_get(url, info)
+            info["elapsed"] = time.perf_counter() - start
+            json = response.json()
+        except Exception as error:
+            info.setdefault("elapsed", time.perf_counter() - start)
+            info["error"] = error
+            self._emit("on_error", info)
+            raise
+        info["parse_time"] = time.perf_counter() - start - info["elapsed"]
+        info["time_to_headers"] = response.elapsed
+        info["status_code"] = response.status_code
+        info["size"] = len(response.content)
+        self._emit("after_response", info)
+        return json
+
+    def resume(self, cursor):
+        """
+        Resume iterating a relation from a saved cursor.
+
+        The resource owning the relation isn't fetched again, iteration
+        restarts with the page at the cursor's index.
+
+        :param cursor: a :class:`~deezer.pagination.Cursor`.
+        :returns: a generator of :class:`~deezer.resources.Resource` objects.
+        """
+        object_class = self.objects_types.get(cursor.object_t)
+        if object_class is None:
+            raise TypeError("{} is not a valid type".format(cursor.object_t))
+        parent = object_class(self, {"id": cursor.object_id, "type": cursor.object_t})
+        return parent.iter_relation(cursor.relation, cursor=cursor)
 
     def get_chart(self, relation=None, index=0, limit=10, **kwargs):
         """
@@ -289,6 +963,11 @@ class Client:
 
         :returns: a list of :class:`~deezer.resources.Resource` objects.
         """
+        if self.search_cache is not None:
+            normalized = self.search_cache.normalize_query(query)
+            return self._cached_search(
+                normalized, query, relation, index, limit, **kwargs
+            )
         return self.get_object(
             "search", relation=relation, q=query, index=index, limit=limit, **kwargs
         )
@@ -306,10 +985,285 @@ class Client:
         >>> client.advanced_search({"artist": "Daft Punk", "album": "Homework"},
         ...                        relation="track")
         """
+        query = self._advanced_query(terms)
+        if self.search_cache is not None:
+            normalized = self.search_cache.normalize_terms(terms)
+            return self._cached_search(
+                normalized, query, relation, index, limit, **kwargs
+            )
+        return self.get_object(
+            "search", relation=relation, q=query, index=index, limit=limit, **kwargs
+        )
+
+    def _cached_search(self, normalized, query, relation, index, limit, **kwargs):
+        """
+        Search through the :attr:`search_cache`, querying the API on a miss.
+
+        :returns: a list of :class:`~deezer.resources.Resource` objects.
+        """
+        index, limit = int(index), int(limit)
+        items = self.search_cache.get(normalized, relation, index, limit, **kwargs)
+        if items is not None:
+            if self._hooks:
+                info = {
+                    "object_t": "search",
+                    "object_id": None,
+                    "relation": relation,
+                    "cache": "search",
+                }
+                self._emit("on_cache_hit", info)
+            return items
+        json = self._get_json(
+            "search", relation=relation, q=query, index=index, limit=limit, **kwargs
+        )
+        items = self._process_json(json)
+        total = json.get("total", index + len(items))
+        self.search_cache.set(normalized, relation, index, items, total, **kwargs)
+        return items
+
+    def iter_search(
+        self, query, relation=None, limit=25, max_items=None, workers=None, **kwargs
+    ):
+        """
+        Iterate over all the results of a search.
+
+        Pages are fetched ahead concurrently, up to the ``total`` reported
+        by the API, and results repeated across page boundaries are only
+        yielded once.
+
+        :param query: the search query.
+        :param relation: the type of resource to search for.
+        :param limit: the number of results fetched per page.
+        :param max_items: stop once this many results have been yielded.
+        :param workers: the maximum number of pages fetched in parallel,
+                        :data:`DEFAULT_WORKERS` by default if the transport
+                        of the client is thread safe. Otherwise the pages
+                        are fetched one at a time, with a warning if more
+                        workers were asked for.
+        :returns: a generator of :class:`~deezer.resources.Resource` objects.
+        """
+        normalized = None
+        if self.search_cache is not None:
+            normalized = self.search_cache.normalize_query(query)
+        return self._iter_search(
+            normalized, relation, limit, max_items, workers, q=query, **kwargs
+        )
+
+    def _iter_search(self, normalized, relation, limit, max_items, workers, **kwargs):
+        """
+        Iterate the results of a search, in a span of the :attr:`tracer`.
+
+        :returns: a generator of :class:`~deezer.resources.Resource` objects.
+        """
+        items = self._iter_search_items(
+            normalized, relation, limit, max_items, workers, **kwargs
+        )
+        if self.tracer is None:
+            return items
+        attributes = tracing.call_attributes(
+            {"object_t": "search", "object_id": None, "relation": relation}
+        )
+        return tracing.traced_iter(self.tracer, "deezer.iter_search", items, attributes)
+
+    def iter_advanced_search(
+        self, terms, relation=None, limit=25, max_items=None, workers=None, **kwargs
+    ):
+        """
+        Iterate over all the results of an advanced search.
+
+        Takes the same search terms as :meth:`advanced_search` and iterates
+        the results like :meth:`iter_search`.
+
+        :returns: a generator of :class:`~deezer.resources.Resource` objects.
+
+        >>> for track in client.iter_advanced_search(
+        ...     {"artist": "Daft Punk"}, relation="track", max_items=100
+        ... ):
+        ...     print(track.title)
+        """
+        query = self._advanced_query(terms)
+        normalized = None
+        if self.search_cache is not None:
+            normalized = self.search_cache.normalize_terms(terms)
+        return self._iter_search(
+            normalized, relation, limit, max_items, workers, q=query, **kwargs
+        )
+
+    @staticmethod
+    def _advanced_query(terms):
+        """Build the query string of an advanced search from its terms."""
         if not isinstance(terms, dict):
             raise TypeError("terms must be a dict")
         # terms are sorted (for consistent tests between Python < 3.7 and >= 3.7)
-        query = " ".join(sorted(['{}:"{}"'.format(k, v) for (k, v) in terms.items()]))
-        return self.get_object(
-            "search", relation=relation, q=query, index=index, limit=limit, **kwargs
+        return " ".join(sorted(['{}:"{}"'.format(k, v) for (k, v) in terms.items()]))
+
+    def _iter_search_items(
+        self, normalized, relation, limit, max_items, workers, **kwargs
+    ):
+        """
+        Generator behind :meth:`iter_search` and :meth:`iter_advanced_search`.
+
+        Drops the results already seen, keyed by ``(type, id)``, and stops
+        once ``max_items`` results have been yielded.
+        """
+        if max_items is not None and max_items <= 0:
+            return
+        seen = set()
+        pages = self._iter_search_pages(normalized, relation, limit, workers, **kwargs)
+        try:
+            for page in pages:
+                for item in page:
+                    key = (getattr(item, "type", relation), getattr(item, "id", None))
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    yield item
+                    if max_items is not None and len(seen) >= max_items:
+                        return
+        finally:
+            pages.close()
+
+    def _iter_search_pages(self, normalized, relation, limit, workers, **kwargs):
+        """
+        Yield the pages of a search, in order, as lists of resources.
+
+        The first page is fetched on its own to learn the ``total``. With
+        several ``workers``, the following ones are fetched ahead in a pool
+        of threads, otherwise one after the other from the calling thread.
+        The pages are stored in the :attr:`search_cache` under the
+        ``normalized`` query, if any, so a complete iteration can answer
+        narrower queries.
+        """
+        workers = self._fan_out_workers(workers)
+        page = self._get_json(
+            "search", relation=relation, index=0, limit=limit, **kwargs
         )
+        indexes = range(limit, page.get("total", 0), limit)
+        fetch = partial(self._get_json, "search", relation=relation, limit=limit)
+        if workers == 1:
+            pages = (fetch(index=index, **kwargs) for index in indexes)
+        else:
+            if self.tracer is not None:
+                fetch = tracing.bind_context(fetch)
+            pages = _Prefetcher(partial(fetch, **kwargs), indexes, workers)
+        index = 0
+        try:
+            while True:
+                items = self._process_json(page)
+                if normalized is not None:
+                    self._store_search_page(
+                        normalized, relation, index, page, items, kwargs
+                    )
+                if not items:
+                    break
+                yield items
+                index += limit
+                page = next(pages, None)
+                if page is None:
+                    break
+        finally:
+            pages.close()
+
+    def _store_search_page(self, normalized, relation, index, page, items, kwargs):
+        """Store a page of an iterated search in the :attr:`search_cache`."""
+        options = {name: value for name, value in kwargs.items() if name != "q"}
+        total = page.get("total", index + len(items))
+        self.search_cache.set(normalized, relation, index, items, total, **options)
+
+
+class _Prefetcher:
+    """
+    Iterate over ``fetch(index=index)`` for each of ``indexes``, in order,
+    computed ahead with at most ``workers`` of them in flight.
+    """
+
+    def __init__(self, fetch, indexes, workers):
+        from concurrent.futures import ThreadPoolExecutor
+
+        self._fetch = fetch
+        self._indexes = iter(indexes)
+        self._workers = workers
+        self._pending = deque()
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._fill()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if not self._pending:
+            raise StopIteration
+        result = self._pending.popleft().result()
+        self._fill()
+        return result
+
+    def _fill(self):
+        for index in self._indexes:
+            self._pending.append(self._executor.submit(self._fetch, index=index))
+            if len(self._pending) >= self._workers:
+                break
+
+    def close(self):
+        """Cancel the pending fetches and stop the threads."""
+        for future in self._pending:
+            future.cancel()
+        self._executor.shutdown()
+
+
+class _UrlCache:
+    """
+    The urls built by a client, with the parameters they were built from:
+    the ``prefix`` of the urls, up to the host, and the encoded access token.
+    """
+
+    __slots__ = ("prefix", "token_query", "templates", "urls", "queries")
+
+    def __init__(self, prefix, token_query):
+        self.prefix = prefix
+        self.token_query = token_query
+        self.templates = {}
+        self.urls = {}
+        self.queries = {}
+
+
+def _restore_client(client_class, key, config):
+    """
+    Find the client pickled with ``key`` in the process, or create one from
+    its configuration, to be found by the following unpickled resources.
+    """
+    client = _clients.get(key)
+    if client is None:
+        config = dict(config)
+        host, use_ssl = config.pop("host"), config.pop("use_ssl")
+        options = config.pop("options")
+        client = client_class(**config, **options)
+        client.host = host
+        client.use_ssl = use_ssl
+        _clients[key] = client
+    return client
+
+
+def _redact_token(text):
+    """
+    Remove the ``access_token`` parameters of the urls in a text, before it
+    is logged, traced or passed to hooks.
+    """
+    if "access_token=" not in text:
+        return text
+    return _TOKEN_PARAMETER.sub(
+        lambda match: match.group(1) if match.group(2) else "", text
+    )
+
+
+def _query_pair(name, value):
+    """Encode a query parameter like :func:`urllib.parse.urlencode`."""
+    if not isinstance(value, str):
+        value = str(value)
+    return quote_plus(name) + "=" + quote_plus(value)
+
+
+def _memoize(cache, key, value):
+    """Store a value in a bounded cache, emptied once full."""
+    if len(cache) >= URL_CACHE_SIZE:
+        cache.clear()
+    cache[key] = value
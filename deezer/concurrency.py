@@ -0,0 +1,191 @@
+"""
+Adaptive limit of the number of concurrent requests.
+
+The right fan-out of bulk fetches depends on the load of the API: too
+few requests in flight waste time, too many trigger quota errors. An
+:class:`AdaptiveConcurrencyLimiter` registers itself as hooks of clients
+and adjusts the number of requests allowed in flight with the AIMD scheme
+of TCP congestion control: the limit grows by one every ``limit``
+successful responses while latency is stable, and is cut by a factor on
+quota errors, server errors or latency spikes.
+
+    >>> client = deezer.Client(thread_safe=True)
+    >>> limiter = AdaptiveConcurrencyLimiter(max_limit=32).install(client)
+    >>> results = list(client.iter_search("daft punk", workers=32))
+
+Fan-outs, like the ``workers`` of :meth:`~deezer.client.Client.iter_search`
+or of :class:`~deezer.crawl.ArtistGraphCrawler`, can then be set to
+``max_limit``: the requests above the current limit wait for a slot.
+"""
+import threading
+import time
+
+#: Codes of the API errors meaning the API is overloaded: quota exceeded and
+#: service busy
+BACKOFF_ERROR_CODES = (4, 700)
+
+
+def is_overloaded(payload):
+    """
+    :returns: whether a payload is an API error telling the API is
+              overloaded, like a quota error.
+    """
+    error = payload.get("error")
+    return isinstance(error, dict) and error.get("code") in BACKOFF_ERROR_CODES
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Limit the requests in flight, adapting the limit to the responses.
+
+    The latency is compared between a short and a long exponential moving
+    average: a spike is when the short one exceeds the long one by
+    ``latency_tolerance``. The limit is decreased at most once per average
+    latency, so a burst of errors from requests sent together only counts
+    once. It is safe to share between threads and between clients, which
+    then share the limit.
+
+    Waiting for a slot blocks the thread sending the request, so the
+    limiter is meant for the threaded :class:`~deezer.client.Client`. It
+    can't be installed on the
+    :class:`~deezer.contrib.tornado.AsyncClient`, whose IOLoop it would
+    block: the concurrency of the async client is bounded by its
+    ``max_clients`` option instead, which isn't adapted.
+
+    :param initial_limit: the limit to start with.
+    :param min_limit: the lowest limit.
+    :param max_limit: the highest limit.
+    :param backoff: the factor applied to the limit when backing off.
+    :param latency_tolerance: the ratio of the short and long latency
+                              averages considered a spike.
+    :param metrics: a :class:`~deezer.metrics.MetricsCollector` to expose
+                    the limit to, as the ``concurrency_limit`` gauge.
+    """
+
+    #: Weights of the new latencies in the short and long moving averages
+    SHORT_SMOOTHING = 0.3
+    LONG_SMOOTHING = 0.02
+
+    def __init__(
+        self,
+        initial_limit=4,
+        min_limit=1,
+        max_limit=32,
+        backoff=0.5,
+        latency_tolerance=2.0,
+        metrics=None,
+    ):
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("Limits must verify 1 <= min <= initial <= max")
+        if not 0 < backoff < 1:
+            raise ValueError("backoff must be between 0 and 1")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.metrics = metrics
+        #: Number of requests in flight
+        self.in_flight = 0
+        self._limit = float(initial_limit)
+        self._successes = 0
+        self._short_latency = None
+        self._long_latency = None
+        self._last_backoff = float("-inf")
+        self._condition = threading.Condition()
+        self._publish()
+
+    @property
+    def limit(self):
+        """The number of requests currently allowed in flight."""
+        return int(self._limit)
+
+    def install(self, client):
+        """
+        Register the limiter as hooks of a client.
+
+        :returns: the limiter itself.
+        :raises TypeError: if the client is asynchronous.
+        """
+        if client.asynchronous:
+            raise TypeError(
+                "The limiter would block the IOLoop of an asynchronous client"
+            )
+        for event, callback in self._hooks():
+            client.add_hook(event, callback)
+        return self
+
+    def uninstall(self, client):
+        """Unregister the hooks added by :meth:`install`."""
+        for event, callback in self._hooks():
+            client.remove_hook(event, callback)
+
+    def _hooks(self):
+        return (
+            ("before_request", self.before_request),
+            ("after_response", self.after_response),
+            ("on_error", self.on_error),
+        )
+
+    def before_request(self, info):
+        """Hook waiting for a slot before a request is sent."""
+        with self._condition:
+            while self.in_flight >= self.limit:
+                self._condition.wait()
+            self.in_flight += 1
+
+    def after_response(self, info):
+        """Hook releasing the slot and adapting the limit to the response."""
+        with self._condition:
+            self._release()
+            latency = info["elapsed"]
+            if self._short_latency is None:
+                self._short_latency = self._long_latency = latency
+            else:
+                self._short_latency += self.SHORT_SMOOTHING * (
+                    latency - self._short_latency
+                )
+                self._long_latency += self.LONG_SMOOTHING * (
+                    latency - self._long_latency
+                )
+            if info["status_code"] >= 500:
+                self._decrease()
+            elif self._short_latency > self.latency_tolerance * self._long_latency:
+                self._decrease()
+            else:
+                self._increase()
+
+    def on_error(self, info):
+        """Hook releasing the slot of a failed request, backing off if needed."""
+        with self._condition:
+            if "status_code" not in info:
+                # the request failed, ``after_response`` wasn't called
+                self._release()
+                self._decrease()
+            elif info.get("api_error", {}).get("code") in BACKOFF_ERROR_CODES:
+                self._decrease()
+
+    def _release(self):
+        self.in_flight -= 1
+        self._condition.notify()
+
+    def _increase(self):
+        self._successes += 1
+        if self._successes < self.limit or self.limit >= self.max_limit:
+            return
+        self._successes = 0
+        self._limit = int(self._limit) + 1
+        self._condition.notify()
+        self._publish()
+
+    def _decrease(self):
+        now = time.monotonic()
+        if now - self._last_backoff < (self._short_latency or 0):
+            return
+        self._last_backoff = now
+        self._limit = max(self._limit * self.backoff, self.min_limit)
+        self._successes = 0
+        self._publish()
+
+    def _publish(self):
+        if self.metrics is not None:
+            self.metrics.set_gauge("concurrency_limit", self.limit)
@@ -4,11 +4,13 @@ Implements an async tornado client class to query the
 """
 import json
 import logging
+import time
 
-from tornado.gen import Return, coroutine
+from tornado.gen import Return, coroutine, sleep
 from tornado.httpclient import AsyncHTTPClient
 
-from deezer.client import Client
+from deezer import tracing
+from deezer.client import Client, _redact_token
 
 
 class AsyncClient(Client):
@@ -23,10 +25,33 @@ class AsyncClient(Client):
 
     This client provides several method to retrieve the content of most
     sort of Deezer objects, based on their json structure.
+
+    The ``search_cache``, ``object_cache``, ``circuit_breaker`` and
+    ``hedging`` options of the :class:`~deezer.client.Client` aren't
+    supported: they send requests synchronously, which would block the
+    IOLoop. Neither are the rate limiters waiting for a server, like the
+    :class:`~deezer.quota.DistributedRateLimiter`. The lanes of a
+    :class:`~deezer.ratelimit.PriorityRateLimiter` share its budget, but
+    first come first served, without their weights.
     """
 
+    asynchronous = True
+
+    #: Options of the :class:`~deezer.client.Client` which would block the IOLoop
+    _unsupported_options = (
+        "search_cache",
+        "object_cache",
+        "circuit_breaker",
+        "hedging",
+    )
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        for name in self._unsupported_options:
+            if getattr(self, name) is not None:
+                raise TypeError("The AsyncClient doesn't support {}".format(name))
+        if getattr(self.rate_limiter, "blocking", False):
+            raise TypeError("The AsyncClient doesn't support blocking rate limiters")
         max_clients = kwargs.get("max_clients", 2)
         self._async_client = AsyncHTTPClient(max_clients=max_clients)
 
@@ -42,8 +67,84 @@ class AsyncClient(Client):
         """
         url = self.object_url(object_t, object_id, relation, **kwargs)
         logging.debug(url)
-        response = yield self._async_client.fetch(url)
-        resp_str = response.body.decode("utf-8")
-        jsn = json.loads(resp_str)
+        if self.rate_limiter is not None:
+            wait = self.rate_limiter.try_acquire()
+            while wait is not None:
+                yield sleep(wait)
+                wait = self.rate_limiter.try_acquire()
+        if self._hooks or self.tracer is not None:
+            info = {
+                "object_t": object_t,
+                "object_id": object_id,
+                "relation": relation,
+                "index": kwargs.get("index"),
+                "url": _redact_token(url),
+            }
+            result = yield self._observed_get_object(url, info, parent)
+            raise Return(result)
+        response = yield self._async_client.fetch(url, headers=self.headers or None)
+        jsn = json.loads(response.body.decode("utf-8"))
         result = self._process_json(jsn, parent)
         raise Return(result)
+
+    @coroutine
+    def _observed_get_object(self, url, info, parent):
+        """
+        Fetch and process an object in spans of the :attr:`tracer`, if any.
+
+        The spans are started with an explicit parent rather than made
+        current, as the current span isn't kept across ``yield``.
+
+        :returns: instance of :class:`~deezer.resources.Resource`
+        """
+        if self.tracer is None:
+            jsn = yield self._observed_fetch(url, info)
+            raise Return(self._process_json(jsn, parent))
+        span = self.tracer.start_span(
+            tracing.span_name(info["object_t"]),
+            attributes=tracing.call_attributes(info),
+        )
+        try:
+            request_span = self.tracer.start_span(
+                tracing.REQUEST_SPAN, context=tracing.span_context(span)
+            )
+            try:
+                jsn = yield self._observed_fetch(url, info)
+            finally:
+                request_span.set_attributes(tracing.request_attributes(info))
+                request_span.end()
+            start = time.perf_counter()
+            with tracing.use_span(span):
+                result = self._process_json(jsn, parent)
+            span.set_attribute("deezer.build_time", time.perf_counter() - start)
+        except Exception as error:
+            span.record_exception(error)
+            raise
+        finally:
+            span.end()
+        raise Return(result)
+
+    @coroutine
+    def _observed_fetch(self, url, info):
+        """
+        Fetch an url, calling the hooks along the way.
+
+        :returns: json dictionary
+        """
+        self._emit("before_request", info)
+        start = time.perf_counter()
+        try:
+            response = yield self._async_client.fetch(url, headers=self.headers or None)
+            info["elapsed"] = time.perf_counter() - start
+            jsn = json.loads(response.body.decode("utf-8"))
+        except Exception as error:
+            info.setdefault("elapsed", time.perf_counter() - start)
+            info["error"] = error
+            self._emit("on_error", info)
+            raise
+        info["parse_time"] = time.perf_counter() - start - info["elapsed"]
+        info["time_to_headers"] = None
+        info["status_code"] = response.code
+        info["size"] = len(response.body)
+        self._emit("after_response", info)
+        raise Return(jsn)
@@ -0,0 +1,355 @@
+"""
+Crawlers walking the Deezer catalogue through the relations of resources.
+"""
+import json
+import logging
+import multiprocessing
+import pickle
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import partial
+
+from deezer.client import _redact_token
+from deezer.ratelimit import SharedRateLimiter
+
+logger = logging.getLogger(__name__)
+
+Edge = namedtuple("Edge", ["source", "target", "relation", "depth"])
+Edge.__doc__ = """
+A link found by a crawler.
+
+:ivar source: the id of the artist the relation was requested for.
+:ivar target: the related :class:`~deezer.resources.Resource`.
+:ivar relation: the name of the relation, e.g. ``"related"``.
+:ivar depth: the distance of the target from the closest seed.
+"""
+
+Job = namedtuple("Job", ["object_t", "object_id", "relation", "kwargs", "iterate"])
+Job.__new__.__defaults__ = (None, None, False)
+Job.__doc__ = """
+A request run by a :class:`CrawlScheduler`.
+
+:ivar object_t: the type of the resource, e.g. ``"album"``.
+:ivar object_id: the id of the resource.
+:ivar relation: the relation to get, ``None`` for the resource itself.
+:ivar kwargs: the parameters of the request, as a ``dict``.
+:ivar iterate: get all the pages of the relation with
+               :meth:`~deezer.resources.Resource.iter_relation`, instead
+               of the first one.
+"""
+
+JobResult = namedtuple("JobResult", ["job", "result", "error"])
+JobResult.__doc__ = """
+The outcome of a :class:`Job`.
+
+:ivar job: the :class:`Job`.
+:ivar result: the resource, or the list of resources of a relation, passed
+              through the ``transform`` of the scheduler. ``None`` if the
+              request failed.
+:ivar error: the exception raised by the request or the ``transform``, if
+             it failed: a ``ValueError`` for an error of the API, or the
+             error of the transport, like a ``ConnectionError``.
+"""
+
+
+class ArtistGraphCrawler:
+    """
+    Breadth-first crawler of the artists similarity graph.
+
+    Starting from seed artists, it requests the related artists of each
+    artist found, along with any other relation asked for, and yields the
+    edges as soon as their page is received. Several artists are requested
+    concurrently and each artist is only expanded once.
+
+    The requests go through the client, so a
+    :class:`~deezer.ratelimit.RateLimiter` set on it paces the crawl.
+    They are sent from several threads, which requires a client with a
+    thread safe transport, see the ``thread_safe`` parameter of the
+    :class:`~deezer.client.Client`; otherwise they are sent one at a time
+    from the calling thread. A failed request is skipped and recorded in
+    :attr:`failures`, the crawl goes on with the other artists.
+    Only ids are kept in the frontier and in the visited set, which may be
+    replaced by one of the compact sets of :mod:`deezer.idset` for very
+    large crawls.
+
+        >>> crawler = ArtistGraphCrawler(client, max_depth=2, max_nodes=10000)
+        >>> for edge in crawler.crawl([27]):
+        ...     graph.add_edge(edge.source, edge.target.id)
+
+    :param client: the :class:`~deezer.client.Client` to use.
+    :param relations: the relations requested for each artist. Only the
+                      artists from ``"related"`` are expanded further, others
+                      like ``"albums"`` or ``"top"`` are only reported.
+    :param max_depth: maximum distance from the seeds of expanded artists.
+    :param max_nodes: maximum number of artists to visit.
+    :param workers: maximum number of concurrent requests,
+                    :data:`~deezer.client.DEFAULT_WORKERS` by default. The
+                    requests are sent one at a time if the transport of the
+                    client isn't thread safe, with a warning if more workers
+                    were asked for.
+    :param visited: the set of visited artist ids, a new ``set`` by default.
+    """
+
+    def __init__(
+        self,
+        client,
+        relations=("related",),
+        max_depth=1,
+        max_nodes=None,
+        workers=None,
+        visited=None,
+    ):
+        self.client = client
+        self.relations = tuple(relations)
+        self.max_depth = max_depth
+        self.max_nodes = max_nodes
+        self.workers = workers
+        self.visited = set() if visited is None else visited
+        #: Number of requests which failed and were skipped
+        self.errors = 0
+        #: The ``(artist_id, relation, exception)`` of the failed requests
+        self.failures = []
+
+    def crawl(self, seeds):
+        """
+        Crawl the graph from the given seeds.
+
+        :param seeds: ids of the artists to start from.
+        :returns: a generator of :class:`Edge`.
+        """
+        frontier = deque()
+        for artist_id in seeds:
+            self._visit(frontier, artist_id, 0)
+        workers = self.client._fan_out_workers(self.workers)
+        if workers == 1:
+            while frontier:
+                request = frontier.popleft()
+                get = partial(self._get_relation, request)
+                yield from self._edges(frontier, request, get)
+            return
+        pending = {}
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            try:
+                while frontier or pending:
+                    while frontier and len(pending) < workers:
+                        request = frontier.popleft()
+                        future = executor.submit(self._get_relation, request)
+                        pending[future] = request
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        request = pending.pop(future)
+                        yield from self._edges(frontier, request, future.result)
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def _visit(self, frontier, artist_id, depth):
+        """Add an artist to the frontier, unless already visited."""
+        if artist_id in self.visited:
+            return
+        if self.max_nodes is not None and len(self.visited) >= self.max_nodes:
+            return
+        self.visited.add(artist_id)
+        for relation in self.relations:
+            frontier.append((artist_id, relation, depth))
+
+    def _get_relation(self, request):
+        artist_id, relation, _ = request
+        return self.client.get_object("artist", artist_id, relation)
+
+    def _edges(self, frontier, request, get):
+        """
+        Yield the edges of a request and expand its targets.
+
+        :param get: a function returning the targets of the request.
+        """
+        source, relation, depth = request
+        try:
+            targets = get()
+        except Exception as error:
+            # API errors as well as errors of the transport, like timeouts
+            logger.warning(
+                "Failed to get %s of artist %s: %s",
+                relation,
+                source,
+                _redact_token(str(error)),
+            )
+            self.errors += 1
+            self.failures.append((source, relation, error))
+            return
+        for target in targets:
+            yield Edge(source, target, relation, depth + 1)
+            if relation == "related" and depth < self.max_depth:
+                self._visit(frontier, target.id, depth + 1)
+
+
+class CrawlScheduler:
+    """
+    Run requests in a pool of processes, under one global rate limit.
+
+    Decoding the responses and building the resources takes most of the
+    time of a large crawl, so a single process can't keep up with the
+    quota of the API. The scheduler sends each :class:`Job` to a pool of
+    worker processes, each one using a copy of the client, and streams back
+    their results as they complete, in any order.
+
+    All the workers draw from a single
+    :class:`~deezer.ratelimit.SharedRateLimiter`, which keeps the whole
+    pool under the quota. The resources are sent back to the parent process
+    and attached to the original client, see
+    :meth:`deezer.client.Client.__reduce__`. When only some data is needed,
+    a ``transform`` run in the workers saves the cost of sending the
+    resources.
+
+        >>> scheduler = CrawlScheduler(client, processes=4)
+        >>> jobs = (Job("album", i, "tracks", iterate=True) for i in album_ids)
+        >>> with open("tracks.jsonl", "w") as stream:
+        ...     scheduler.drain(jobs, JsonLinesSink(stream))
+
+    :param client: the :class:`~deezer.client.Client` copied to the workers,
+                   its own rate limiter is replaced by the shared one. Workers
+                   started with ``spawn`` or ``forkserver`` get a copy without
+                   credentials, unless
+                   :attr:`~deezer.client.Client.pickle_credentials` is set.
+    :param processes: number of worker processes, the number of CPUs by
+                      default.
+    :param rate_limiter: the :class:`~deezer.ratelimit.SharedRateLimiter` of
+                         the workers, a new one with the default quota if not
+                         given.
+    :param transform: a function called in the workers with the result of
+                      each job, which returns what is sent back. It must be
+                      importable, like any function run by
+                      :mod:`multiprocessing`.
+    :param chunksize: number of jobs sent to a worker at once.
+    :param context: the :mod:`multiprocessing` context to start the workers
+                    with, the default one if not given.
+    """
+
+    def __init__(
+        self,
+        client,
+        processes=None,
+        rate_limiter=None,
+        transform=None,
+        chunksize=1,
+        context=None,
+    ):
+        self.client = client
+        self.processes = processes
+        self.context = context or multiprocessing.get_context()
+        if rate_limiter is None:
+            rate_limiter = SharedRateLimiter(context=self.context)
+        self.rate_limiter = rate_limiter
+        self.transform = transform
+        self.chunksize = chunksize
+        #: Number of jobs which failed
+        self.errors = 0
+
+    def run(self, jobs):
+        """
+        Run the jobs and yield their results as they complete.
+
+        Jobs may be a lazy iterable, they're read as the workers need them.
+        Failed requests are reported in the results, any other exception
+        raised in a worker is raised here.
+
+        :param jobs: an iterable of :class:`Job`.
+        :returns: a generator of :class:`JobResult`.
+        """
+        initargs = (self.client, self.rate_limiter, self.transform)
+        with self.context.Pool(self.processes, _init_worker, initargs) as pool:
+            for result in pool.imap_unordered(_run_job, jobs, self.chunksize):
+                if result.error is not None:
+                    job = result.job
+                    logger.warning("Failed to get %s %s", job.object_t, job.object_id)
+                    self.errors += 1
+                yield result
+
+    def drain(self, jobs, sink):
+        """
+        Run the jobs and pass their results to a sink as they complete.
+
+        :param jobs: an iterable of :class:`Job`.
+        :param sink: a callable called with each :class:`JobResult`, like
+                     :class:`JsonLinesSink`.
+        :returns: the number of jobs run.
+        """
+        count = 0
+        for result in self.run(jobs):
+            sink(result)
+            count += 1
+        return count
+
+
+class JsonLinesSink:
+    """
+    Write the results of a :class:`CrawlScheduler` as JSON lines.
+
+    Each result is written on its own line, as an object with the
+    ``type``, ``id`` and ``relation`` of the job, and either the ``data``
+    returned or the ``error``. Resources are converted with
+    :meth:`~deezer.resources.Resource.asdict`.
+
+    :param stream: the text file to write to.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def __call__(self, result):
+        job = result.job
+        line = {"type": job.object_t, "id": job.object_id, "relation": job.relation}
+        if result.error is not None:
+            line["error"] = str(result.error)
+        else:
+            line["data"] = _asdict(result.result)
+        self.stream.write(json.dumps(line) + "\n")
+
+
+def _asdict(value):
+    if isinstance(value, list):
+        return [_asdict(item) for item in value]
+    if hasattr(value, "asdict"):
+        return value.asdict()
+    return value
+
+
+# State of the worker processes of a CrawlScheduler
+_worker = {}
+
+
+def _init_worker(client, rate_limiter, transform):
+    client.rate_limiter = rate_limiter
+    _worker.update(client=client, transform=transform)
+
+
+def _run_job(job):
+    client = _worker["client"]
+    kwargs = job.kwargs or {}
+    try:
+        if job.iterate:
+            object_class = client.objects_types[job.object_t]
+            parent = object_class(client, {"id": job.object_id, "type": job.object_t})
+            result = list(parent.iter_relation(job.relation, **kwargs))
+        else:
+            result = client.get_object(
+                job.object_t, job.object_id, job.relation, **kwargs
+            )
+        transform = _worker["transform"]
+        if transform is not None:
+            result = transform(result)
+    except Exception as error:
+        return JobResult(job, None, _picklable_error(error))
+    return JobResult(job, result, None)
+
+
+def _picklable_error(error):
+    """
+    Return the error, or a ``RuntimeError`` describing it if it can't be
+    sent back from the worker process.
+    """
+    try:
+        pickle.loads(pickle.dumps(error))
+    except Exception:
+        return RuntimeError(_redact_token(repr(error)))
+    return error
@@ -0,0 +1,223 @@
+"""
+Compact sets of ids, to deduplicate resources during large crawls.
+
+A Python ``set`` of ints costs around 60 bytes per id, which adds up to
+gigabytes for tens of millions of tracks. The sets below only store bits:
+
+* :class:`BitmapIdSet` is exact and uses one bit per possible id, up to the
+  largest id added.
+* :class:`BloomFilter` uses a fixed number of bits per id, whatever their
+  value, at the cost of a configurable rate of false positives.
+
+Both can be backed by a file mapped in memory, so the state of a crawl is
+kept on disk and survives restarts.
+"""
+import math
+import mmap
+import os
+import struct
+
+_HEADER = struct.Struct("<8sQQQ")
+_OFFSET = _HEADER.size
+_MASK64 = (1 << 64) - 1
+
+
+class _Bits:
+    """
+    An array of bits, in memory or mapped from a file.
+
+    The file starts with a header made of a magic string and three
+    integers: two parameters of the set and the number of ids added.
+    """
+
+    magic = b""
+
+    def __init__(self, nbits, path=None, params=(0, 0)):
+        self.path = path
+        self._file = None
+        self._count = 0
+        nbytes = (nbits + 7) // 8
+        if path is None:
+            self._bits = bytearray(nbytes)
+            self._params = params
+            return
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        self._file = open(path, "r+b" if exists else "w+b")
+        if exists:
+            header = self._file.read(_OFFSET)
+            magic, first, second, self._count = _HEADER.unpack(header)
+            if magic != self.magic:
+                self._file.close()
+                raise ValueError(
+                    "{} is not a {} file".format(path, type(self).__name__)
+                )
+            self._params = (first, second)
+        else:
+            self._params = params
+            self._file.truncate(_OFFSET + nbytes)
+        self._map()
+
+    def _map(self):
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+        self._bits = memoryview(self._mmap)[_OFFSET:]
+
+    def _unmap(self):
+        self._write_header()
+        self._mmap.flush()
+        self._bits.release()
+        self._mmap.close()
+
+    def _write_header(self):
+        first, second = self._params
+        self._mmap[:_OFFSET] = _HEADER.pack(self.magic, first, second, self._count)
+
+    def _nbits(self):
+        return len(self._bits) * 8
+
+    def _grow(self, nbits):
+        """Extend the array to hold at least ``nbits`` bits."""
+        nbytes = max((nbits + 7) // 8, len(self._bits) * 2)
+        if self._file is None:
+            self._bits.extend(bytes(nbytes - len(self._bits)))
+            return
+        self._unmap()
+        self._file.truncate(_OFFSET + nbytes)
+        self._map()
+
+    def _test_and_set(self, position):
+        """Set a bit, returning whether it was already set."""
+        byte, mask = position >> 3, 1 << (position & 7)
+        value = self._bits[byte]
+        if value & mask:
+            return True
+        self._bits[byte] = value | mask
+        return False
+
+    def _test(self, position):
+        return bool(self._bits[position >> 3] & (1 << (position & 7)))
+
+    def __len__(self):
+        return self._count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def nbytes(self):
+        """Size of the bit array in bytes."""
+        return len(self._bits)
+
+    def flush(self):
+        """Write the changes to the backing file, if any."""
+        if self._file is not None:
+            self._write_header()
+            self._mmap.flush()
+
+    def close(self):
+        """Flush and release the backing file, if any."""
+        if self._file is not None and not self._file.closed:
+            self._unmap()
+            self._file.close()
+
+
+class BitmapIdSet(_Bits):
+    """
+    An exact set of non-negative integer ids, using one bit per possible id.
+
+    The bitmap grows as larger ids are added: 10 millions ids below
+    100 millions take 12.5 MB, where a ``set`` would take hundreds.
+
+        >>> visited = BitmapIdSet("visited.bin")
+        >>> visited.add(27)
+        >>> 27 in visited
+        True
+        >>> visited.close()
+
+    :param path: the file to persist the set to, kept in memory if ``None``.
+    :param capacity: the number of ids to allocate space for up front.
+    """
+
+    magic = b"DZBITMAP"
+
+    def __init__(self, path=None, capacity=1 << 16):
+        super().__init__(capacity, path)
+
+    def __contains__(self, item_id):
+        item_id = int(item_id)
+        return 0 <= item_id < self._nbits() and self._test(item_id)
+
+    def __iter__(self):
+        for byte_index, value in enumerate(self._bits):
+            if value:
+                for bit in range(8):
+                    if value & (1 << bit):
+                        yield byte_index * 8 + bit
+
+    def add(self, item_id):
+        """
+        Add an id to the set.
+
+        :raises ValueError: if the id is negative.
+        """
+        item_id = int(item_id)
+        if item_id < 0:
+            raise ValueError("Ids must not be negative, got {}".format(item_id))
+        if item_id >= self._nbits():
+            self._grow(item_id + 1)
+        if not self._test_and_set(item_id):
+            self._count += 1
+
+
+def _mix(value):
+    """Scramble the bits of a 64 bits integer (splitmix64 finalizer)."""
+    value = (value ^ (value >> 30)) * 0xBF58476D1CE4E5B9 & _MASK64
+    value = (value ^ (value >> 27)) * 0x94D049BB133111EB & _MASK64
+    return value ^ (value >> 31)
+
+
+class BloomFilter(_Bits):
+    """
+    A probabilistic set of integer ids with a bounded false positive rate.
+
+    An id added is always reported as present, an id never added may be
+    reported as present with a probability ``error_rate`` as long as no
+    more than ``capacity`` ids are added. It takes about 1.2 bytes per id
+    for a 1% error rate.
+
+    :param capacity: the expected number of ids.
+    :param error_rate: the accepted rate of false positives.
+    :param path: the file to persist the filter to, kept in memory if ``None``.
+                 When the file exists, its parameters take precedence.
+    """
+
+    magic = b"DZBLOOM1"
+
+    def __init__(self, capacity, error_rate=0.01, path=None):
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        nbits = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        nhashes = max(1, round(nbits / max(capacity, 1) * math.log(2)))
+        super().__init__(nbits, path, params=(nbits, nhashes))
+        self.capacity = capacity
+        self.error_rate = error_rate
+
+    def _positions(self, item_id):
+        nbits, nhashes = self._params
+        first = _mix(int(item_id) & _MASK64)
+        second = _mix(first ^ 0x9E3779B97F4A7C15) | 1
+        return ((first + i * second) % nbits for i in range(nhashes))
+
+    def __contains__(self, item_id):
+        return all(self._test(position) for position in self._positions(item_id))
+
+    def add(self, item_id):
+        """Add an id to the filter."""
+        present = True
+        for position in self._positions(item_id):
+            if not self._test_and_set(position):
+                present = False
+        if not present:
+            self._count += 1
@@ -0,0 +1,52 @@
+"""
+The base of the local servers, like :class:`~deezer.mockserver.MockDeezerServer`
+and :class:`~deezer.quotaserver.QuotaServer`, which run in a background
+thread of the tests or in the foreground from the command line.
+"""
+import threading
+
+
+class LocalServer:
+    """
+    A :mod:`socketserver` server run in a background thread, between
+    :meth:`start` and :meth:`stop` or within a ``with`` block.
+
+    :param server: the :class:`socketserver.BaseServer` to run.
+    """
+
+    def __init__(self, server):
+        self._server = server
+        self._thread = None
+
+    @property
+    def server_address(self):
+        """The ``(host, port)`` the server listens to."""
+        return tuple(self._server.server_address[:2])
+
+    def start(self):
+        """Start serving in a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and close the socket."""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def run(self):
+        """Serve until interrupted with Ctrl+C, for the command line."""
+        self.start()
+        try:
+            self._thread.join()
+        except KeyboardInterrupt:
+            self.stop()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
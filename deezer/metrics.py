@@ -0,0 +1,212 @@
+"""
+Metrics of the requests sent by a :class:`~deezer.client.Client`.
+
+A :class:`MetricsCollector` registers itself as hooks of clients and
+counts the requests, responses, errors and cache hits per object type and
+relation, along with histograms of the latencies. The values can be read
+back or exported in the
+`Prometheus text format <https://prometheus.io/docs/instrumenting/exposition_formats/>`_:
+
+    >>> metrics = MetricsCollector().install(client)
+    >>> client.get_album(302127)
+    >>> print(metrics.to_prometheus())
+"""
+import threading
+from bisect import bisect_left
+
+#: Upper bounds in seconds of the buckets of the latency histograms
+DEFAULT_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+COUNTER = "counter"
+GAUGE = "gauge"
+HISTOGRAM = "histogram"
+
+METRICS = {
+    "requests_total": (COUNTER, "Requests sent to the API."),
+    "responses_total": (COUNTER, "Responses received from the API."),
+    "errors_total": (COUNTER, "Requests which failed or returned an API error."),
+    "cache_hits_total": (COUNTER, "Calls served from a cache without request."),
+    "response_bytes_total": (COUNTER, "Size of the response bodies in bytes."),
+    "requests_in_flight": (GAUGE, "Requests sent and not answered yet."),
+    "request_duration_seconds": (HISTOGRAM, "Time to receive the responses."),
+    "concurrency_limit": (GAUGE, "Requests allowed in flight by the limiter."),
+}
+
+
+class _Histogram:
+    """Counts of observations in buckets, with their sum."""
+
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+
+class MetricsCollector:
+    """
+    Collect counters, gauges and latency histograms of the requests.
+
+    All the built-in metrics are labelled with the ``object_type`` and the
+    ``relation`` of the request. Other metrics can be recorded with
+    :meth:`increment`, :meth:`set_gauge` and :meth:`observe`. It is safe to
+    share between threads and between clients.
+
+    :param prefix: the prefix of the names of the exported metrics.
+    :param buckets: the upper bounds in seconds of the latency buckets.
+    """
+
+    def __init__(self, prefix="deezer", buckets=DEFAULT_BUCKETS):
+        self.prefix = prefix
+        self.buckets = tuple(sorted(buckets))
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def install(self, client):
+        """
+        Register the collector as hooks of a client.
+
+        :returns: the collector itself.
+        """
+        for event, callback in self._hooks():
+            client.add_hook(event, callback)
+        return self
+
+    def uninstall(self, client):
+        """Unregister the hooks added by :meth:`install`."""
+        for event, callback in self._hooks():
+            client.remove_hook(event, callback)
+
+    def _hooks(self):
+        return (
+            ("before_request", self.before_request),
+            ("after_response", self.after_response),
+            ("on_error", self.on_error),
+            ("on_cache_hit", self.on_cache_hit),
+        )
+
+    @staticmethod
+    def _labels(info):
+        return {"object_type": info["object_t"], "relation": info["relation"] or ""}
+
+    def before_request(self, info):
+        """Hook counting a request sent."""
+        labels = self._labels(info)
+        self.increment("requests_total", **labels)
+        self.increment("requests_in_flight", **labels)
+
+    def after_response(self, info):
+        """Hook recording a response: its status, size and latency."""
+        labels = self._labels(info)
+        self.increment("requests_in_flight", -1, **labels)
+        self.increment("responses_total", status=info["status_code"], **labels)
+        self.increment("response_bytes_total", info["size"], **labels)
+        self.observe("request_duration_seconds", info["elapsed"], **labels)
+
+    def on_error(self, info):
+        """Hook counting an error, by exception type."""
+        labels = self._labels(info)
+        if "status_code" not in info:
+            # the request failed, ``after_response`` wasn't called
+            self.increment("requests_in_flight", -1, **labels)
+        self.increment("errors_total", error=type(info["error"]).__name__, **labels)
+
+    def on_cache_hit(self, info):
+        """Hook counting a call served from a cache."""
+        self.increment("cache_hits_total", cache=info["cache"], **self._labels(info))
+
+    def _series(self, name, kind):
+        metric = self._metrics.get(name)
+        if metric is None:
+            default_kind, help_text = METRICS.get(name, (kind, ""))
+            metric = self._metrics[name] = (default_kind, help_text, {})
+        return metric[2]
+
+    @staticmethod
+    def _key(labels):
+        return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+    def increment(self, name, value=1, **labels):
+        """Add a value to a counter, or to a gauge."""
+        key = self._key(labels)
+        with self._lock:
+            series = self._series(name, COUNTER)
+            series[key] = series.get(key, 0) + value
+
+    def set_gauge(self, name, value, **labels):
+        """Set the value of a gauge."""
+        key = self._key(labels)
+        with self._lock:
+            self._series(name, GAUGE)[key] = value
+
+    def observe(self, name, value, **labels):
+        """Record an observation in a histogram."""
+        key = self._key(labels)
+        with self._lock:
+            series = self._series(name, HISTOGRAM)
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(self.buckets)
+            bucket = bisect_left(self.buckets, value)
+            if bucket < len(self.buckets):
+                histogram.counts[bucket] += 1
+            histogram.sum += value
+            histogram.count += 1
+
+    def value(self, name, **labels):
+        """
+        :returns: the value of a counter or a gauge, or the number of
+                  observations of a histogram, 0 if never recorded.
+        """
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                return 0
+            value = metric[2].get(self._key(labels), 0)
+        return value.count if isinstance(value, _Histogram) else value
+
+    def reset(self):
+        """Forget all the recorded values."""
+        with self._lock:
+            self._metrics.clear()
+
+    def to_prometheus(self):
+        """
+        :returns: the metrics in the Prometheus text exposition format.
+        """
+        lines = []
+        with self._lock:
+            for name, (kind, help_text, series) in sorted(self._metrics.items()):
+                full_name = "{}_{}".format(self.prefix, name)
+                if help_text:
+                    lines.append("# HELP {} {}".format(full_name, help_text))
+                lines.append("# TYPE {} {}".format(full_name, kind))
+                for key, value in sorted(series.items()):
+                    if kind == HISTOGRAM:
+                        lines.extend(self._histogram_lines(full_name, key, value))
+                    else:
+                        lines.append(_sample(full_name, key, value))
+        return "\n".join(lines) + "\n"
+
+    def _histogram_lines(self, name, key, histogram):
+        cumulative = 0
+        bounds = ["{:g}".format(bound) for bound in self.buckets] + ["+Inf"]
+        counts = histogram.counts + [histogram.count - sum(histogram.counts)]
+        for bound, count in zip(bounds, counts):
+            cumulative += count
+            yield _sample(name + "_bucket", key + (("le", bound),), cumulative)
+        yield _sample(name + "_sum", key, histogram.sum)
+        yield _sample(name + "_count", key, histogram.count)
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _sample(name, key, value):
+    """Format a sample line of the text exposition format."""
+    if key:
+        labels = ",".join('{}="{}"'.format(label, _escape(v)) for label, v in key)
+        name = "{}{{{}}}".format(name, labels)
+    return "{} {}".format(name, value)
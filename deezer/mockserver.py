@@ -0,0 +1,349 @@
+"""
+A local stand-in for the Deezer API, to run load tests without quota.
+
+The server answers the same urls as ``api.deezer.com`` from fixtures,
+recorded in ``vcr.py`` cassettes or generated, and paginates list
+payloads with the ``index`` and ``limit`` parameters. It can also slow
+down responses and enforce a quota like the real API.
+
+    >>> from deezer.mockserver import MockDeezerAPI, MockDeezerServer
+    >>> with MockDeezerServer(MockDeezerAPI.synthetic(latency=0.05)) as server:
+    ...     client = deezer.Client(host=server.host, use_ssl=False)
+    ...     client.get_artist(1)
+    <Artist: Artist 1>
+
+It can also be started from the command line::
+
+    python -m deezer.mockserver --port 8000 --synthetic --latency 0.05
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import parse_qs, urlencode, urlparse
+
+from deezer.localserver import LocalServer
+from deezer.transports import ReplayTransport
+
+DEFAULT_LIMIT = 25
+
+NO_DATA_ERROR = {"type": "DataException", "message": "no data", "code": 800}
+QUOTA_ERROR = {"type": "Exception", "message": "Quota limit exceeded", "code": 4}
+BUSY_ERROR = {"type": "Exception", "message": "Service busy", "code": 700}
+
+
+class MockDeezerAPI:
+    """
+    The fixtures and the behaviour of the mock server.
+
+    Fixtures are json payloads registered for a path, like
+    ``/album/302127`` or ``/artist/27/albums``. Search fixtures are
+    registered for the path and the query, e.g. ``/search/album?q=Daft``.
+
+    :param latency: seconds to wait before each response, or a
+                    ``(minimum, maximum)`` tuple to wait a random duration.
+    :param quota: maximum number of requests in ``period``, the following
+                  ones get a quota error. ``None`` to disable it.
+    :param period: duration of the quota window in seconds.
+    :param error_rate: probability to answer any request with an error.
+    """
+
+    def __init__(self, latency=0, quota=None, period=5.0, error_rate=0):
+        self.latency = latency
+        self.quota = quota
+        self.period = period
+        self.error_rate = error_rate
+        self.fixtures = {}
+        self.errors = {}
+        #: Number of requests received
+        self.requests = 0
+        self._searchable = {}
+        self._timestamps = deque()
+        self._lock = threading.Lock()
+
+    def add(self, path, payload, query=None):
+        """
+        Register the payload served for a path.
+
+        :param query: the search query, for ``/search`` paths.
+        """
+        self.fixtures[self._key(path, query)] = payload
+
+    def add_error(self, path, error=NO_DATA_ERROR):
+        """
+        Register an error payload served for a path.
+        """
+        self.errors[path.rstrip("/")] = error
+
+    def add_searchable(self, relation, item):
+        """
+        Make an item found by searches of the ``relation`` type, by its
+        title or name and those of its artist or album.
+        """
+        self._searchable.setdefault(relation, []).append(item)
+
+    @staticmethod
+    def _key(path, query=None):
+        path = path.rstrip("/")
+        if query is None:
+            return path
+        return "{}?q={}".format(path, query)
+
+    @classmethod
+    def from_cassettes(cls, *patterns, **kwargs):
+        """
+        Create fixtures from the requests recorded in ``vcr.py`` cassettes.
+
+        :param patterns: paths or glob patterns of the cassette files.
+        :param kwargs: the parameters of :class:`MockDeezerAPI`.
+        """
+        api = cls(**kwargs)
+        transport = ReplayTransport.from_cassettes(*patterns)
+        for url, responses in transport.responses.items():
+            parsed = urlparse(url)
+            params = parse_qs(parsed.query)
+            if int(params.get("index", ["0"])[0]) != 0:
+                continue
+            query = params.get("q", [None])[0]
+            key = cls._key(parsed.path, query)
+            if key not in api.fixtures:
+                api.fixtures[key] = responses[0].json()
+        return api
+
+    @classmethod
+    def synthetic(cls, artists=50, albums=4, tracks=10, **kwargs):
+        """
+        Create a generated catalogue of artists, albums and tracks.
+
+        Artists have ids from 1 to ``artists``, each related to the next
+        few ones. Albums and tracks ids derive from their artist's id.
+
+        :param artists: number of artists.
+        :param albums: number of albums per artist.
+        :param tracks: number of tracks per album.
+        :param kwargs: the parameters of :class:`MockDeezerAPI`.
+        """
+        api = cls(**kwargs)
+        catalogue = [
+            {"id": artist_id, "name": "Artist {}".format(artist_id), "type": "artist"}
+            for artist_id in range(1, artists + 1)
+        ]
+        chart = {"tracks": [], "albums": [], "artists": [], "playlists": []}
+        for artist in catalogue:
+            related = [catalogue[(artist["id"] + i) % artists] for i in range(3)]
+            api.add(
+                "/artist/{}/related".format(artist["id"]),
+                {"data": [other for other in related if other is not artist]},
+            )
+            artist_albums = api._add_discography(artist, albums, tracks)
+            if len(chart["artists"]) < 10:
+                chart["artists"].append(artist)
+                chart["albums"].append(artist_albums[0])
+        for artist in chart["artists"]:
+            chart["tracks"].append(
+                api.fixtures["/artist/{}/top".format(artist["id"])]["data"][0]
+            )
+        for relation, items in chart.items():
+            api.add("/chart/0/{}".format(relation), {"data": items})
+        api.add(
+            "/chart/0",
+            {
+                relation: {"data": items, "total": len(items)}
+                for relation, items in chart.items()
+            },
+        )
+        return api
+
+    def _add_discography(self, artist, albums, tracks):
+        """Add an artist with generated albums and tracks to the fixtures."""
+        self.add("/artist/{}".format(artist["id"]), artist)
+        self.add_searchable("artist", artist)
+        artist_albums, artist_tracks = [], []
+        for album_number in range(1, albums + 1):
+            album_id = artist["id"] * 1000 + album_number
+            album = {
+                "id": album_id,
+                "title": "Album {}".format(album_id),
+                "artist": artist,
+                "type": "album",
+            }
+            album_tracks = []
+            for track_id in range(album_id * 100 + 1, album_id * 100 + tracks + 1):
+                track = {
+                    "id": track_id,
+                    "title": "Track {}".format(track_id),
+                    "duration": 180 + track_id % 100,
+                    "rank": track_id % 1000000,
+                    "artist": artist,
+                    "album": album,
+                    "type": "track",
+                }
+                self.add("/track/{}".format(track_id), track)
+                self.add_searchable("track", track)
+                album_tracks.append(track)
+            self.add("/album/{}".format(album_id), album)
+            self.add("/album/{}/tracks".format(album_id), {"data": album_tracks})
+            self.add_searchable("album", album)
+            artist_albums.append(album)
+            artist_tracks.extend(album_tracks)
+        self.add("/artist/{}/albums".format(artist["id"]), {"data": artist_albums})
+        self.add("/artist/{}/top".format(artist["id"]), {"data": artist_tracks[:5]})
+        return artist_albums
+
+    def handle(self, path, params):
+        """
+        Compute the response to a request.
+
+        :param path: the path of the request.
+        :param params: the query parameters, as parsed by
+                       :func:`urllib.parse.parse_qs`.
+        :returns: the json payload to answer.
+        """
+        with self._lock:
+            self.requests += 1
+            over_quota = self.quota is not None and not self._take_quota()
+        self._wait()
+        if over_quota:
+            return {"error": QUOTA_ERROR}
+        if self.error_rate and random.random() < self.error_rate:  # nosec
+            return {"error": BUSY_ERROR}
+        path = path.rstrip("/")
+        if path in self.errors:
+            return {"error": self.errors[path]}
+        query = params.get("q", [None])[0]
+        payload = self.fixtures.get(self._key(path, query))
+        if payload is None and path.split("/")[1:2] == ["search"]:
+            payload = self._search(path, query)
+        if payload is None:
+            return {"error": NO_DATA_ERROR}
+        if "data" in payload:
+            return self._paginate(path, params, payload["data"])
+        return payload
+
+    def _take_quota(self):
+        now = time.monotonic()
+        while self._timestamps and self._timestamps[0] <= now - self.period:
+            self._timestamps.popleft()
+        if len(self._timestamps) >= self.quota:
+            return False
+        self._timestamps.append(now)
+        return True
+
+    def _wait(self):
+        latency = self.latency
+        if isinstance(latency, (tuple, list)):
+            latency = random.uniform(*latency)  # nosec
+        if latency:
+            time.sleep(latency)
+
+    def _search(self, path, query):
+        parts = path.split("/")
+        relation = parts[2] if len(parts) > 2 else "track"
+        terms = (query or "").lower().split()
+        items = [
+            item
+            for item in self._searchable.get(relation, [])
+            if all(term in _searchable_text(item) for term in terms)
+        ]
+        return {"data": items}
+
+    @staticmethod
+    def _paginate(path, params, items):
+        index = int(params.get("index", ["0"])[0])
+        limit = int(params.get("limit", [str(DEFAULT_LIMIT)])[0])
+        page = {"data": items[index:][:limit], "total": len(items)}
+        if index + limit < len(items):
+            next_params = {key: values[0] for key, values in params.items()}
+            next_params["index"] = index + limit
+            page["next"] = "{}?{}".format(path, urlencode(sorted(next_params.items())))
+        return page
+
+
+def _searchable_text(item):
+    texts = [item.get("title"), item.get("name")]
+    for relation in ("artist", "album"):
+        related = item.get(relation) or {}
+        texts.extend([related.get("title"), related.get("name")])
+    return " ".join(text.lower() for text in texts if text)
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # headers and body are written separately, don't delay the body
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        payload = self.server.api.handle(parsed.path, parse_qs(parsed.query))
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class MockDeezerServer(LocalServer):
+    """
+    An HTTP server answering requests from a :class:`MockDeezerAPI`.
+
+    The server runs in a background thread, between :meth:`start` and
+    :meth:`stop` or within a ``with`` block.
+
+    :param api: the :class:`MockDeezerAPI` to serve.
+    :param host: the interface to listen to.
+    :param port: the port to listen to, a free one is picked if 0.
+    """
+
+    def __init__(self, api=None, host="127.0.0.1", port=0):
+        self.api = api if api is not None else MockDeezerAPI.synthetic()
+        super().__init__(_ThreadingHTTPServer((host, port), _RequestHandler))
+        self._server.api = self.api
+
+    @property
+    def host(self):
+        """
+        The ``host:port`` the server listens to, to pass as the ``host`` of a
+        :class:`~deezer.client.Client` along with ``use_ssl=False``.
+        """
+        return "{}:{}".format(*self.server_address)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a mock Deezer API server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--cassettes", nargs="*", default=[])
+    parser.add_argument("--synthetic", action="store_true")
+    parser.add_argument("--latency", type=float, default=0)
+    parser.add_argument("--quota", type=int, default=None)
+    parser.add_argument("--error-rate", type=float, default=0)
+    args = parser.parse_args(argv)
+    options = {
+        "latency": args.latency,
+        "quota": args.quota,
+        "error_rate": args.error_rate,
+    }
+    api = MockDeezerAPI.from_cassettes(*args.cassettes, **options)
+    if args.synthetic or not args.cassettes:
+        recorded = api.fixtures
+        api = MockDeezerAPI.synthetic(**options)
+        api.fixtures.update(recorded)
+    server = MockDeezerServer(api, args.host, args.port)
+    print("Serving mock Deezer API on http://{}".format(server.host))
+    server.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Helpers to paginate through the relations of resources.
+"""
+import json
+
+
+class Cursor:
+    """
+    The position reached while iterating the relation of a resource.
+
+    Pass a cursor to :meth:`~deezer.resources.Resource.iter_relation`, or
+    to any ``iter_*`` method of a resource, and it is moved forward each
+    time an item is yielded. It can be saved along the way and later
+    given to :meth:`~deezer.client.Client.resume` to carry on from the
+    same position, at the cost of a single page request.
+
+        >>> cursor = Cursor.from_resource(user, "tracks")
+        >>> for track in user.iter_tracks(cursor=cursor):
+        ...     process(track)
+        ...     save(cursor.to_json())
+        >>> # later, possibly in another process
+        >>> for track in client.resume(Cursor.from_json(load())):
+        ...     process(track)
+
+    :param object_t: the type of the resource, e.g. ``"user"``.
+    :param object_id: the id of the resource.
+    :param relation: the relation iterated, e.g. ``"tracks"``.
+    :param index: the index of the next item to yield.
+    :param kwargs: the extra query parameters of the iteration.
+    :param exhausted: whether the iteration reached the end of the relation.
+    """
+
+    __slots__ = ("object_t", "object_id", "relation", "index", "kwargs", "exhausted")
+
+    def __init__(
+        self, object_t, object_id, relation, index=0, kwargs=None, exhausted=False
+    ):
+        self.object_t = object_t
+        self.object_id = object_id
+        self.relation = relation
+        self.index = index
+        self.kwargs = dict(kwargs or {})
+        self.exhausted = exhausted
+
+    def __repr__(self):
+        return "<Cursor: {}/{}/{} at {}>".format(
+            self.object_t, self.object_id, self.relation, self.index
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, Cursor):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    @classmethod
+    def from_resource(cls, resource, relation, **kwargs):
+        """
+        Create a cursor at the start of the ``relation`` of ``resource``.
+        """
+        # pylint: disable=E1101
+        return cls(resource.type, resource.id, relation, kwargs=kwargs)
+
+    def to_dict(self):
+        """
+        :returns: the cursor as a dictionary of plain values.
+        """
+        return {
+            "object_t": self.object_t,
+            "object_id": self.object_id,
+            "relation": self.relation,
+            "index": self.index,
+            "kwargs": dict(self.kwargs),
+            "exhausted": self.exhausted,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Create a cursor from the output of :meth:`to_dict`.
+        """
+        return cls(**data)
+
+    def to_json(self):
+        """
+        :returns: the cursor serialized as a json string.
+        """
+        return json.dumps(self.to_dict(), sort_keys=True)
+
+    @classmethod
+    def from_json(cls, data):
+        """
+        Create a cursor from the output of :meth:`to_json`.
+        """
+        return cls.from_dict(json.loads(data))
+
+
+class HighWaterMark:
+    """
+    The most recent items seen in a relation, to only fetch what came after.
+
+    Relations like the favorites of a :class:`~deezer.resources.User` list
+    the most recently added items first. Iteration of such a relation can
+    stop at the first item already known: added before the last seen
+    ``time_add``, or with an id already seen when ``time_add`` isn't
+    available or is the same. An item seen before and added again, with a
+    newer ``time_add``, is new. Several ids are kept so removing the latest
+    known item doesn't trigger a full refresh when ``time_add`` is not
+    available.
+
+    :param ids: the ids of the most recent items seen, most recent first.
+    :param time_add: the most recent ``time_add`` seen.
+    """
+
+    __slots__ = ("ids", "time_add", "_id_set")
+
+    #: Number of ids kept by :meth:`advance`
+    size = 20
+
+    def __init__(self, ids=(), time_add=None):
+        self.ids = tuple(ids)
+        self.time_add = time_add
+        self._id_set = frozenset(self.ids)
+
+    def __repr__(self):
+        return "<HighWaterMark: {} ids, time_add {}>".format(
+            len(self.ids), self.time_add
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, HighWaterMark):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def reached(self, item):
+        """
+        Whether ``item`` was already seen when the mark was taken.
+        """
+        time_add = getattr(item, "time_add", None)
+        if time_add is not None and self.time_add is not None:
+            if time_add != self.time_add:
+                # an item seen before but added again is new
+                return time_add < self.time_add
+        return getattr(item, "id", None) in self._id_set
+
+    def advance(self, items):
+        """
+        Move the mark forward past ``items``, given most recent first.
+
+        :returns: a new :class:`HighWaterMark`.
+        """
+        ids = [getattr(item, "id", None) for item in items]
+        ids = [item_id for item_id in ids if item_id is not None]
+        times = [getattr(item, "time_add", None) for item in items]
+        times = [time_add for time_add in times if time_add is not None]
+        if self.time_add is not None:
+            times.append(self.time_add)
+        return HighWaterMark(
+            (ids + list(self.ids))[: self.size], max(times) if times else None
+        )
+
+    def to_dict(self):
+        """
+        :returns: the mark as a dictionary of plain values.
+        """
+        return {"ids": list(self.ids), "time_add": self.time_add}
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Create a mark from the output of :meth:`to_dict`.
+        """
+        return cls(**data)
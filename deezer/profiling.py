@@ -0,0 +1,163 @@
+"""
+Breakdown of the time spent by a :class:`~deezer.client.Client`.
+
+Within :meth:`Client.profile() <deezer.client.Client.profile>`, the time of
+each call is split into phases:
+
+* ``connect``: until the response headers are received, including the name
+  resolution, the connection and the server processing. It's the whole
+  request when the transport doesn't report the time to headers.
+* ``transfer``: receiving the body of the response, along with the work
+  of the HTTP library once the headers are received.
+* ``decode``: decoding the json body.
+* ``process``: walking the json in
+  :meth:`~deezer.client.Client._process_json`, not counting building
+  the resources.
+* ``build``: constructing the :class:`~deezer.resources.Resource` objects.
+
+    >>> with client.profile() as profile:
+    ...     tracks = list(album.iter_tracks())
+    >>> print(profile.report())
+"""
+import threading
+import time
+
+PHASES = ("connect", "transfer", "decode", "process", "build")
+
+
+class _TimedFactory:
+    """Build resources of a class, adding the time spent to a profile."""
+
+    __slots__ = ("object_class", "profile")
+
+    def __init__(self, object_class, profile):
+        self.object_class = object_class
+        self.profile = profile
+
+    def __call__(self, client, json):
+        start = time.perf_counter()
+        resource = self.object_class(client, json)
+        self.profile.add("build", time.perf_counter() - start, resources=1)
+        return resource
+
+
+class Profile:
+    """
+    The time spent in each phase of the calls of a client, aggregated.
+
+    :ivar times: a dictionary of phase name to the seconds spent in it.
+    :ivar requests: the number of requests sent.
+    :ivar bytes: the size of the responses received.
+    :ivar resources: the number of resources built.
+    :ivar wall_time: the duration of the profiling.
+    """
+
+    def __init__(self):
+        self.times = dict.fromkeys(PHASES, 0.0)
+        self.requests = 0
+        self.bytes = 0
+        self.resources = 0
+        self.wall_time = 0.0
+        self._start = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def add(self, phase, seconds, requests=0, size=0, resources=0):
+        """Add time spent in a phase, along with the items handled."""
+        with self._lock:
+            self.times[phase] += seconds
+            self.requests += requests
+            self.bytes += size
+            self.resources += resources
+
+    def attach(self, client):
+        """
+        Start profiling the calls of a client.
+
+        :raises ValueError: if the client is already being profiled.
+        """
+        if "_process_json" in vars(client):
+            raise ValueError("The client is already being profiled")
+        process_json = client._process_json
+
+        def profiled_process_json(item, parent=None):
+            if getattr(self._local, "depth", 0):
+                return process_json(item, parent)
+            self._local.depth = 1
+            start = time.perf_counter()
+            try:
+                return process_json(item, parent)
+            finally:
+                self._local.depth = 0
+                self.add("process", time.perf_counter() - start)
+
+        client._process_json = profiled_process_json
+        client.objects_types = {
+            object_t: object_class and _TimedFactory(object_class, self)
+            for object_t, object_class in client.objects_types.items()
+        }
+        client.add_hook("after_response", self._after_response)
+        self._start = time.perf_counter()
+
+    def detach(self, client):
+        """Stop profiling the calls of a client."""
+        client.remove_hook("after_response", self._after_response)
+        del client._process_json
+        del client.objects_types
+        self.wall_time += time.perf_counter() - self._start
+
+    def _after_response(self, info):
+        elapsed = info["elapsed"]
+        connect = info.get("time_to_headers")
+        if connect is None or connect > elapsed:
+            connect = elapsed
+        self.add("connect", connect, requests=1, size=info["size"])
+        self.add("transfer", elapsed - connect)
+        self.add("decode", info["parse_time"])
+
+    def asdict(self):
+        """
+        :returns: the measures in a dictionary, ``process`` excluding the
+                  time spent building resources.
+        """
+        with self._lock:
+            times = dict(self.times)
+            times["process"] = max(times["process"] - times["build"], 0.0)
+            return {
+                "times": times,
+                "requests": self.requests,
+                "bytes": self.bytes,
+                "resources": self.resources,
+                "wall_time": self.wall_time,
+            }
+
+    def report(self):
+        """
+        :returns: a table of the time spent per phase, in total, in share
+                  of the profiled time and per request.
+        """
+        values = self.asdict()
+        total = sum(values["times"].values())
+        requests = max(values["requests"], 1)
+        lines = [
+            "{} requests, {} bytes, {} resources in {:.3f} s".format(
+                values["requests"],
+                values["bytes"],
+                values["resources"],
+                values["wall_time"],
+            ),
+            "{:>10} {:>10} {:>7} {:>12}".format(
+                "phase", "total ms", "share", "ms/request"
+            ),
+        ]
+        for phase in PHASES:
+            seconds = values["times"][phase]
+            lines.append(
+                "{:>10} {:>10.2f} {:>7.1%} {:>12.3f}".format(
+                    phase,
+                    seconds * 1000,
+                    seconds / total if total else 0,
+                    seconds * 1000 / requests,
+                )
+            )
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,215 @@
+"""
+A quota shared by clients running on several machines.
+
+The limit of the API applies to the application, so clients on different
+nodes using the same app must pace their requests together. A
+:class:`DistributedRateLimiter` keeps the sliding window of the requests
+in a :class:`QuotaBackend` they all connect to, like a Redis server with
+:class:`RedisQuotaBackend`.
+
+    >>> backend = RedisQuotaBackend("redis.internal", 6379)
+    >>> client = deezer.Client(rate_limiter=DistributedRateLimiter(backend))
+
+The timestamps of the requests are taken on each node, whose clocks are
+expected to be synchronised, e.g. with NTP. :mod:`deezer.quotaserver`
+provides a local stand-in for the Redis server, to run tests.
+"""
+import itertools
+import math
+import os
+import socket
+import threading
+import time
+import uuid
+
+from deezer.ratelimit import DEFAULT_MAX_REQUESTS, DEFAULT_PERIOD, RateLimiter
+from deezer.resp import encode_command, raise_errors, read_reply
+
+DEFAULT_KEY = "deezer:quota"
+
+
+class QuotaBackend:
+    """
+    Base class of the stores of sliding windows shared between nodes.
+    """
+
+    def take(self, key, max_requests, period):
+        """
+        Take a slot in the window stored at key if one is free.
+
+        :param key: the name of the window, one per application.
+        :param max_requests: maximum number of requests in the window.
+        :param period: duration of the window in seconds.
+        :returns: ``None`` if a slot was taken, otherwise the number of
+                  seconds until one frees up.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """
+        Close the connection to the store.
+        """
+
+
+class RedisQuotaBackend(QuotaBackend):
+    """
+    A quota backend storing windows in sorted sets of a Redis server.
+
+    Each request adds its timestamp to the sorted set of the window,
+    removes the expired ones and counts the others in a single
+    ``MULTI``/``EXEC`` transaction. A request going over the limit removes
+    its timestamp, so the nodes never exceed the limit together.
+
+    It speaks the Redis protocol over a plain socket, without any
+    dependency. The connection is shared by the threads of a process and
+    opened again in forked processes.
+
+    :param host: the host of the Redis server.
+    :param port: the port of the Redis server.
+    :param db: the database number to use.
+    :param password: the password to authenticate with, if any.
+    :param timeout: timeout of the socket operations, in seconds.
+    :param clock: the function returning the current time, in seconds.
+    """
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=6379,
+        db=0,
+        password=None,
+        timeout=5.0,
+        clock=time.time,
+    ):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.timeout = timeout
+        self.clock = clock
+        self._node = uuid.uuid4().hex[:12]
+        self._counter = itertools.count()
+        self._reset()
+
+    def _reset(self):
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._socket = None
+        self._stream = None
+
+    def take(self, key, max_requests, period):
+        now = self.clock()
+        member = "{!r}:{}:{}:{}".format(
+            now, self._node, os.getpid(), next(self._counter)
+        )
+        results = self.execute(
+            ("MULTI",),
+            ("ZREMRANGEBYSCORE", key, "-inf", repr(now - period)),
+            ("ZADD", key, repr(now), member),
+            ("ZCARD", key),
+            ("ZRANGE", key, 0, 0, "WITHSCORES"),
+            ("PEXPIRE", key, math.ceil(period * 1000)),
+            ("EXEC",),
+        )[-1]
+        count, oldest = results[2], results[3]
+        if count <= max_requests:
+            return None
+        self.execute(("ZREM", key, member))
+        return max(float(oldest[1]) + period - now, 0.0)
+
+    def execute(self, *commands):
+        """
+        Send commands in a pipeline and read their replies.
+
+        :param commands: the commands, as tuples of their arguments.
+        :returns: the list of the replies.
+        :raises ValueError: if the server replied with an error.
+        """
+        if self._pid != os.getpid():
+            # forked: the connection and the lock belong to the parent
+            self._reset()
+        with self._lock:
+            if self._socket is None:
+                self._connect()
+            replies = self._send(commands)
+        raise_errors(replies)
+        return replies
+
+    def _send(self, commands):
+        """
+        Send commands and read their replies, closing the connection if any
+        of them can't be read: the following replies would be out of sync.
+        """
+        try:
+            self._socket.sendall(b"".join(map(encode_command, commands)))
+            return [read_reply(self._stream) for _ in commands]
+        except BaseException:
+            self._close()
+            raise
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+    def _connect(self):
+        self._socket = socket.create_connection((self.host, self.port), self.timeout)
+        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._stream = self._socket.makefile("rb")
+        commands = []
+        if self.password is not None:
+            commands.append(("AUTH", self.password))
+        if self.db:
+            commands.append(("SELECT", self.db))
+        if commands:
+            replies = self._send(commands)
+            try:
+                raise_errors(replies)
+            except ValueError:
+                self._close()
+                raise
+
+    def _close(self):
+        if self._socket is not None:
+            self._stream.close()
+            self._socket.close()
+        self._socket = None
+        self._stream = None
+
+
+class DistributedRateLimiter(RateLimiter):
+    """
+    A :class:`~deezer.ratelimit.RateLimiter` whose window is shared by
+    all the clients connected to a :class:`QuotaBackend`.
+
+        >>> limiter = DistributedRateLimiter(RedisQuotaBackend("redis.internal"))
+        >>> client = deezer.Client(rate_limiter=limiter)
+
+    :param backend: the :class:`QuotaBackend` storing the window.
+    :param key: the name of the window, to share between the clients
+                of the same application.
+    :param max_requests: maximum number of requests in the window.
+    :param period: duration of the window in seconds.
+    """
+
+    blocking = True
+
+    def __init__(
+        self,
+        backend,
+        key=DEFAULT_KEY,
+        max_requests=DEFAULT_MAX_REQUESTS,
+        period=DEFAULT_PERIOD,
+    ):
+        self.backend = backend
+        self.key = key
+        self.max_requests = max_requests
+        self.period = period
+
+    def try_acquire(self):
+        """
+        Take a slot in the window if one is free, without waiting.
+
+        :returns: ``None`` if a slot was taken, otherwise the number of
+                  seconds until one frees up.
+        """
+        return self.backend.take(self.key, self.max_requests, self.period)
@@ -0,0 +1,239 @@
+"""
+A local stand-in for a Redis server, to test distributed rate limiting.
+
+The server speaks the Redis protocol and implements, in memory, the few
+commands used by :class:`~deezer.quota.RedisQuotaBackend`: sorted sets,
+expiration and ``MULTI``/``EXEC`` transactions.
+
+    >>> from deezer.quota import DistributedRateLimiter, RedisQuotaBackend
+    >>> from deezer.quotaserver import QuotaServer
+    >>> with QuotaServer() as server:
+    ...     backend = RedisQuotaBackend(*server.address)
+    ...     client = deezer.Client(rate_limiter=DistributedRateLimiter(backend))
+
+It can also be started from the command line::
+
+    python -m deezer.quotaserver --port 6379
+"""
+import argparse
+import threading
+import time
+from socketserver import StreamRequestHandler, TCPServer, ThreadingMixIn
+
+from deezer.localserver import LocalServer
+from deezer.resp import SimpleString, encode_reply, read_reply
+
+OK = SimpleString("OK")
+QUEUED = SimpleString("QUEUED")
+
+
+class QuotaStore:
+    """
+    The data of the server, sorted sets stored by key.
+
+    Commands are run with :meth:`execute`, the commands of a transaction
+    together without any other command in between.
+    """
+
+    def __init__(self):
+        self.sorted_sets = {}
+        self.expires = {}
+        self._lock = threading.Lock()
+
+    def execute(self, commands):
+        """
+        Run commands atomically.
+
+        :param commands: the commands, as lists of their arguments.
+        :returns: the list of the replies, with ``ValueError`` instances for
+                  the commands which failed.
+        """
+        with self._lock:
+            return [self._execute(command) for command in commands]
+
+    def _execute(self, command):
+        name = command[0].lower()
+        method = getattr(self, "_command_" + name, None)
+        if method is None:
+            return ValueError("ERR unknown command '{}'".format(command[0]))
+        try:
+            return method(*command[1:])
+        except (TypeError, ValueError, IndexError):
+            return ValueError("ERR wrong arguments for '{}' command".format(name))
+
+    def _get(self, key, create=False):
+        deadline = self.expires.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            self._delete(key)
+        if create:
+            return self.sorted_sets.setdefault(key, {})
+        return self.sorted_sets.get(key, {})
+
+    def _delete(self, key):
+        self.expires.pop(key, None)
+        return self.sorted_sets.pop(key, None) is not None
+
+    def _cleanup(self, key):
+        if not self.sorted_sets.get(key, True):
+            self._delete(key)
+
+    def _command_ping(self):
+        return SimpleString("PONG")
+
+    def _command_auth(self, *args):
+        return OK
+
+    def _command_select(self, db):
+        int(db)
+        return OK
+
+    def _command_flushall(self):
+        self.sorted_sets.clear()
+        self.expires.clear()
+        return OK
+
+    def _command_del(self, *keys):
+        return sum(self._delete(key) for key in keys)
+
+    def _command_pexpire(self, key, milliseconds):
+        if key not in self.sorted_sets:
+            return 0
+        self.expires[key] = time.monotonic() + int(milliseconds) / 1000
+        return 1
+
+    def _command_zadd(self, key, *args):
+        if not args or len(args) % 2:
+            raise ValueError(args)
+        members = self._get(key, create=True)
+        added = 0
+        for score, member in zip(args[::2], args[1::2]):
+            added += member not in members
+            members[member] = float(score)
+        return added
+
+    def _command_zrem(self, key, *members):
+        sorted_set = self._get(key)
+        removed = sum(sorted_set.pop(member, None) is not None for member in members)
+        self._cleanup(key)
+        return removed
+
+    def _command_zcard(self, key):
+        return len(self._get(key))
+
+    def _command_zrange(self, key, start, stop, *options):
+        if [option.upper() for option in options] not in ([], ["WITHSCORES"]):
+            raise ValueError(options)
+        items = sorted(self._get(key).items(), key=lambda item: (item[1], item[0]))
+        start, stop = int(start), int(stop)
+        if start < 0:
+            start = max(start + len(items), 0)
+        if stop < 0:
+            stop += len(items)
+        end = stop + 1
+        items = items[start:end]
+        if options:
+            # scores are formatted like Redis does: "1", not "1.0"
+            return [
+                value for member, score in items for value in (member, "%.17g" % score)
+            ]
+        return [member for member, _ in items]
+
+    def _command_zremrangebyscore(self, key, minimum, maximum):
+        minimum, maximum = _score_bound(minimum), _score_bound(maximum)
+        sorted_set = self._get(key)
+        removed = [
+            member
+            for member, score in sorted_set.items()
+            if minimum(score, lower=True) and maximum(score, lower=False)
+        ]
+        for member in removed:
+            del sorted_set[member]
+        self._cleanup(key)
+        return len(removed)
+
+
+def _score_bound(value):
+    """Parse a score interval bound like ``-inf`` or ``(1.5``."""
+    exclusive = value.startswith("(")
+    bound = float(value.lstrip("("))
+
+    def check(score, lower):
+        if lower:
+            return score > bound if exclusive else score >= bound
+        return score < bound if exclusive else score <= bound
+
+    return check
+
+
+class _RequestHandler(StreamRequestHandler):
+    def handle(self):
+        store = self.server.store
+        queued = None
+        while True:
+            try:
+                command = read_reply(self.rfile)
+            except (OSError, ValueError):
+                return
+            if not isinstance(command, list) or not command:
+                return
+            name = command[0].upper()
+            if name == "MULTI":
+                reply = ValueError("ERR MULTI calls can not be nested")
+                if queued is None:
+                    queued, reply = [], OK
+            elif name in ("EXEC", "DISCARD"):
+                reply = ValueError("ERR {} without MULTI".format(name))
+                if queued is not None:
+                    reply = store.execute(queued) if name == "EXEC" else OK
+                    queued = None
+            elif queued is not None:
+                queued.append(command)
+                reply = QUEUED
+            else:
+                reply = store.execute([command])[0]
+            self.wfile.write(encode_reply(reply))
+
+
+class _ThreadingTCPServer(ThreadingMixIn, TCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class QuotaServer(LocalServer):
+    """
+    A TCP server answering the Redis protocol from a :class:`QuotaStore`.
+
+    The server runs in a background thread, between :meth:`start` and
+    :meth:`stop` or within a ``with`` block.
+
+    :param store: the :class:`QuotaStore` to serve, a new one by default.
+    :param host: the interface to listen to.
+    :param port: the port to listen to, a free one is picked if 0.
+    """
+
+    def __init__(self, store=None, host="127.0.0.1", port=0):
+        self.store = store if store is not None else QuotaStore()
+        super().__init__(_ThreadingTCPServer((host, port), _RequestHandler))
+        self._server.store = self.store
+
+    @property
+    def address(self):
+        """
+        The ``(host, port)`` the server listens to, to pass to a
+        :class:`~deezer.quota.RedisQuotaBackend`.
+        """
+        return self.server_address
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a local quota server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6379)
+    args = parser.parse_args(argv)
+    server = QuotaServer(host=args.host, port=args.port)
+    print("Serving quota store on {}:{}".format(*server.address))
+    server.run()
+
+
+if __name__ == "__main__":
+    main()
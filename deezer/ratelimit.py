@@ -0,0 +1,278 @@
+"""
+Pacing of the requests sent to the Deezer API.
+
+The API allows 50 requests every 5 seconds for each application,
+going over it returns quota errors.
+"""
+import heapq
+import itertools
+import multiprocessing
+import threading
+import time
+from collections import deque
+
+DEFAULT_MAX_REQUESTS = 50
+DEFAULT_PERIOD = 5.0
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+DEFAULT_WEIGHTS = {INTERACTIVE: 9, BACKGROUND: 1}
+
+
+class RateLimiter:
+    """
+    Limit the number of requests in a sliding window of time.
+
+    Can be passed to a :class:`~deezer.client.Client`, which then waits
+    for the limiter before each request. It is safe to share between
+    threads and between clients.
+
+        >>> import deezer
+        >>> client = deezer.Client(rate_limiter=deezer.RateLimiter())
+
+    :param max_requests: maximum number of requests in the window.
+    :param period: duration of the window in seconds.
+    """
+
+    #: Whether :meth:`try_acquire` waits for I/O, like a round trip to a
+    #: server, so it can't be called from an event loop
+    blocking = False
+
+    def __init__(self, max_requests=DEFAULT_MAX_REQUESTS, period=DEFAULT_PERIOD):
+        self.max_requests = max_requests
+        self.period = period
+        self._timestamps = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Wait until a request can be sent without exceeding the rate.
+        """
+        while True:
+            wait = self.try_acquire()
+            if wait is None:
+                return
+            time.sleep(wait)
+
+    def try_acquire(self):
+        """
+        Take a slot in the window if one is free, without waiting.
+
+        :returns: ``None`` if a slot was taken, otherwise the number of
+                  seconds until one frees up.
+        """
+        with self._lock:
+            now = time.monotonic()
+            timestamps = self._timestamps
+            while timestamps and timestamps[0] <= now - self.period:
+                timestamps.popleft()
+            if len(timestamps) < self.max_requests:
+                timestamps.append(now)
+                return None
+            return timestamps[0] + self.period - now
+
+
+class SharedRateLimiter(RateLimiter):
+    """
+    A :class:`RateLimiter` shared by several processes.
+
+    The window is kept in shared memory, as a ring of the timestamps of the
+    last ``max_requests`` requests, so clients in different processes draw
+    from the same budget. Like other synchronized objects of
+    :mod:`multiprocessing`, it must be handed to the processes when they are
+    created, for instance through the ``initargs`` of a pool, or inherited.
+
+        >>> limiter = SharedRateLimiter()
+        >>> pool = multiprocessing.Pool(4, initializer=init, initargs=(limiter,))
+
+    :param max_requests: maximum number of requests in the window.
+    :param period: duration of the window in seconds.
+    :param context: the :mod:`multiprocessing` context of the processes,
+                    the default one if not given.
+    """
+
+    def __init__(
+        self, max_requests=DEFAULT_MAX_REQUESTS, period=DEFAULT_PERIOD, context=None
+    ):
+        context = context or multiprocessing.get_context()
+        self.max_requests = max_requests
+        self.period = period
+        self._timestamps = context.Array(
+            "d", [float("-inf")] * max_requests, lock=False
+        )
+        self._index = context.Value("l", 0, lock=False)
+        self._lock = context.Lock()
+
+    def try_acquire(self):
+        """
+        Take a slot in the window if one is free, without waiting.
+
+        :returns: ``None`` if a slot was taken, otherwise the number of
+                  seconds until one frees up.
+        """
+        with self._lock:
+            now = time.monotonic()
+            index = self._index.value
+            # the oldest of the last max_requests requests
+            oldest = self._timestamps[index]
+            if oldest <= now - self.period:
+                self._timestamps[index] = now
+                self._index.value = (index + 1) % self.max_requests
+                return None
+            return oldest + self.period - now
+
+
+class PriorityRateLimiter:
+    """
+    Share the budget of a rate limiter between lanes of requests.
+
+    Each lane has a weight: when requests of several lanes are waiting, the
+    slots are granted by weighted fair queuing, so a lane with a weight 9
+    gets 9 slots for each slot of a lane with a weight 1. A lane without
+    waiting requests leaves the whole budget to the others.
+
+    The weights only apply to the requests waiting in :meth:`acquire`.
+    :meth:`try_acquire`, used by the
+    :class:`~deezer.contrib.tornado.AsyncClient`, doesn't wait: it takes
+    the free slots first come first served, whatever the lane, and leaves
+    them to the requests waiting in :meth:`acquire`.
+
+    With the default weights, interactive requests, like the ones answering
+    users, go before the background requests of a crawl, which take what is
+    left. Clients use a lane as their rate limiter, or the limiter itself for
+    the ``"interactive"`` lane:
+
+        >>> limiter = PriorityRateLimiter(RateLimiter())
+        >>> api_client = deezer.Client(rate_limiter=limiter)
+        >>> crawl_client = deezer.Client(rate_limiter=limiter.lane(BACKGROUND))
+
+    :param rate_limiter: the limiter of the budget shared by the lanes, like a
+                         :class:`RateLimiter` or a
+                         :class:`~deezer.quota.DistributedRateLimiter`. A new
+                         :class:`RateLimiter` with the default quota if not
+                         given.
+    :param weights: the weight of each lane, by name.
+    """
+
+    def __init__(self, rate_limiter=None, weights=None):
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter()
+        self.weights = dict(DEFAULT_WEIGHTS if weights is None else weights)
+        for name, weight in self.weights.items():
+            if weight <= 0:
+                raise ValueError(
+                    "The weight of lane {!r} must be positive".format(name)
+                )
+        self._condition = threading.Condition()
+        # the queue of the waiting requests, by finish tag
+        self._waiting = []
+        self._sequence = itertools.count()
+        self._virtual_time = 0.0
+        self._finish_tags = {name: 0.0 for name in self.weights}
+
+    @property
+    def blocking(self):
+        """Whether the limiter of the budget waits for I/O."""
+        return getattr(self.rate_limiter, "blocking", False)
+
+    def lane(self, name):
+        """
+        Get the rate limiter of a lane, to pass to a client.
+
+        :param name: the name of the lane.
+        :returns: a :class:`Lane`.
+        """
+        self._check_lane(name)
+        return Lane(self, name)
+
+    def acquire(self, lane=INTERACTIVE):
+        """
+        Wait until a request of the lane can be sent.
+
+        :param lane: the name of the lane of the request.
+        """
+        self._check_lane(lane)
+        with self._condition:
+            entry = (self._tag(lane), next(self._sequence))
+            heapq.heappush(self._waiting, entry)
+            self._condition.notify_all()
+            try:
+                while True:
+                    if self._waiting[0] is not entry:
+                        self._condition.wait()
+                        continue
+                    wait = self.rate_limiter.try_acquire()
+                    if wait is None:
+                        heapq.heappop(self._waiting)
+                        self._virtual_time = entry[0]
+                        return
+                    self._condition.wait(wait)
+            finally:
+                if entry in self._waiting:
+                    self._waiting.remove(entry)
+                    heapq.heapify(self._waiting)
+                self._condition.notify_all()
+
+    def try_acquire(self, lane=INTERACTIVE):
+        """
+        Take a slot for a request of the lane if one is free, without waiting.
+
+        A slot is only taken when no request is waiting in :meth:`acquire`.
+        The weights of the lanes don't apply: the callers retrying after the
+        wait returned are served in the order they come back.
+
+        :param lane: the name of the lane of the request.
+        :returns: ``None`` if a slot was taken, otherwise the number of
+                  seconds until one may free up.
+        """
+        self._check_lane(lane)
+        with self._condition:
+            if self._waiting:
+                limiter = self.rate_limiter
+                return limiter.period / limiter.max_requests
+            wait = self.rate_limiter.try_acquire()
+            if wait is None:
+                self._virtual_time = self._tag(lane)
+            return wait
+
+    def _tag(self, lane):
+        """Compute the finish tag of a new request of the lane."""
+        start = max(self._virtual_time, self._finish_tags[lane])
+        self._finish_tags[lane] = start + 1 / self.weights[lane]
+        return self._finish_tags[lane]
+
+    def _check_lane(self, name):
+        if name not in self.weights:
+            raise ValueError("Unknown lane {!r}".format(name))
+
+
+class Lane:
+    """
+    The rate limiter of a lane of a :class:`PriorityRateLimiter`.
+
+    :ivar name: the name of the lane.
+    """
+
+    def __init__(self, limiter, name):
+        self.limiter = limiter
+        self.name = name
+
+    @property
+    def blocking(self):
+        """Whether the limiter of the budget waits for I/O."""
+        return self.limiter.blocking
+
+    def acquire(self):
+        """
+        Wait until a request of the lane can be sent.
+        """
+        self.limiter.acquire(self.name)
+
+    def try_acquire(self):
+        """
+        Take a slot for a request of the lane if one is free, without waiting,
+        first come first served, see :meth:`PriorityRateLimiter.try_acquire`.
+
+        :returns: ``None`` if a slot was taken, otherwise the number of
+                  seconds until one may free up.
+        """
+        return self.limiter.try_acquire(self.name)
@@ -0,0 +1,226 @@
+"""
+Protections of the calls against a slow or degraded API.
+
+* :class:`Hedging` sends a second request when the first one takes longer
+  than most requests, and keeps whichever response arrives first.
+* :class:`CircuitBreaker` fails fast after consecutive failures of the
+  API, until it recovers. Along with an
+  :class:`~deezer.cache.ObjectCache`, the client then serves stale
+  objects instead of failing.
+
+    >>> client = deezer.Client(
+    ...     thread_safe=True,
+    ...     object_cache=ObjectCache(ttl=300, max_stale=3600),
+    ...     circuit_breaker=CircuitBreaker(),
+    ...     hedging=Hedging(),
+    ... )
+"""
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitOpenError(ConnectionError):
+    """
+    Raised instead of sending a request while the circuit is open.
+    """
+
+
+class CircuitBreaker:
+    """
+    Stop sending requests to an API which keeps failing.
+
+    The circuit opens after ``failure_threshold`` consecutive failures:
+    requests failing, or answered with a quota or busy error. While open,
+    calls raise :class:`CircuitOpenError` right away. After
+    ``recovery_time`` seconds, a single trial request is let through: the
+    circuit closes if it succeeds and opens again if it fails. It is safe
+    to share between threads and between clients.
+
+    :param failure_threshold: number of consecutive failures opening the
+                              circuit.
+    :param recovery_time: seconds to wait before a trial request.
+    """
+
+    def __init__(self, failure_threshold=5, recovery_time=30.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_time = recovery_time
+        #: One of ``"closed"``, ``"open"`` or ``"half-open"``
+        self.state = CLOSED
+        self.failures = 0
+        self._opened_at = None
+        self._lock = threading.Lock()
+
+    def before_request(self):
+        """
+        Check that a request may be sent.
+
+        :raises CircuitOpenError: if the circuit is open, or half open with
+                                  its trial request in flight.
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            if self.state == OPEN:
+                if time.monotonic() - self._opened_at >= self.recovery_time:
+                    self.state = HALF_OPEN
+                    return
+            raise CircuitOpenError("The Deezer API is unavailable, circuit open")
+
+    def record_success(self):
+        """Close the circuit after a successful request."""
+        with self._lock:
+            self.failures = 0
+            self.state = CLOSED
+
+    def record_failure(self):
+        """Count a failed request, opening the circuit if needed."""
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+
+
+class Hedging:
+    """
+    Send a duplicate request when a response is slower than usual.
+
+    If the response to a request hasn't arrived after ``delay``, the same
+    request is sent again and the first response received is used. By
+    default, the delay is the ``quantile`` of the latencies of the last
+    ``window`` requests, so about 5% of the requests are hedged. The
+    duplicate is only sent if the rate limiter of the client has a free
+    slot. It goes through the hooks of the client like any request, with
+    ``hedge`` set in the dictionary they receive.
+
+    The requests are sent from a pool of threads, so the transport must be
+    thread safe, see the ``thread_safe`` parameter of the
+    :class:`~deezer.client.Client`: otherwise the client warns and sends
+    the requests without hedging. A request is only handed to the pool
+    if a thread is free to send it right away, and the delay counts from
+    the moment it is sent: a request is never hedged for waiting in a
+    queue. When all the threads are busy, requests are sent from the
+    calling thread and aren't hedged.
+
+    :param delay: a fixed delay in seconds, instead of the quantile.
+    :param quantile: the quantile of the latencies used as delay.
+    :param window: number of latencies kept to compute the quantile.
+    :param min_samples: number of latencies needed before hedging.
+    :param max_workers: maximum number of requests sent from the pool at
+                        once, duplicates included.
+    """
+
+    def __init__(
+        self, delay=None, quantile=0.95, window=200, min_samples=20, max_workers=16
+    ):
+        self.delay = delay
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.max_workers = max_workers
+        #: Number of duplicate requests sent
+        self.hedged = 0
+        self._latencies = deque(maxlen=window)
+        self._executor = None
+        self._slots = None
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def current_delay(self):
+        """
+        :returns: the delay before hedging, ``None`` if there aren't enough
+                  latencies recorded yet.
+        """
+        if self.delay is not None:
+            return self.delay
+        latencies = sorted(self._latencies)
+        if len(latencies) < self.min_samples:
+            return None
+        return latencies[min(int(len(latencies) * self.quantile), len(latencies) - 1)]
+
+    def send(self, request, rate_limiter=None, duplicate=None):
+        """
+        Call ``request``, and call it again if it is too slow.
+
+        :param request: a function sending the request, returning the
+                        response.
+        :param rate_limiter: the rate limiter the duplicate takes a slot of.
+        :param duplicate: a function sending the duplicate, ``request`` by
+                          default.
+        :returns: the first response received.
+        """
+        delay = self.current_delay()
+        if delay is None:
+            return self._timed(request)
+        first = self._submit(request)
+        if first is None:
+            # all the threads are busy
+            return self._timed(request)
+        first.started.wait()
+        if wait([first], timeout=delay).done:
+            return first.result()
+        second = self._submit(duplicate or request, rate_limiter)
+        if second is None:
+            return first.result()
+        with self._lock:
+            self.hedged += 1
+        pending = {first, second}
+        while True:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+            if not pending:
+                # both failed
+                return first.result()
+
+    def shutdown(self):
+        """Stop the threads sending the requests."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _submit(self, request, rate_limiter=None):
+        """
+        Send a request from a free thread of the pool.
+
+        :returns: the future of the response, with a ``started`` event set
+                  once the request is sent, or ``None`` if no thread is
+                  free or the rate limiter has no free slot.
+        """
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                # the threads of the parent don't exist in a forked process
+                self._pid = os.getpid()
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+                self._slots = threading.BoundedSemaphore(self.max_workers)
+            executor, slots = self._executor, self._slots
+        if not slots.acquire(blocking=False):
+            return None
+        if rate_limiter is not None and rate_limiter.try_acquire() is not None:
+            slots.release()
+            return None
+        started = threading.Event()
+        future = executor.submit(self._run, request, started, slots)
+        future.started = started
+        return future
+
+    def _run(self, request, started, slots):
+        started.set()
+        try:
+            return self._timed(request)
+        finally:
+            slots.release()
+
+    def _timed(self, request):
+        start = time.perf_counter()
+        response = request()
+        self._latencies.append(time.perf_counter() - start)
+        return response
@@ -2,6 +2,8 @@
 Module to implement the various types of resources that
 can be found in the API.
 """
+from deezer import tracing
+from deezer.pagination import HighWaterMark
 
 
 class Resource:
@@ -11,6 +13,10 @@ class Resource:
     It is mainly responsible of passing a reference to the client
     to this class when instantiated, and transmit the json data into
     attributes
+
+    Resources can be pickled, to send them to other processes: only their
+    fields are stored along with a reference to the client, which gets
+    reattached on load, see :meth:`deezer.client.Client.__reduce__`.
     """
 
     def __init__(self, client, json):
@@ -25,6 +31,15 @@ class Resource:
             return "<{}: {}>".format(self.__class__.__name__, str(name))
         return super().__repr__()
 
+    def __reduce__(self):
+        state = {key: getattr(self, key) for key in self._fields}
+        return _new_resource, (type(self), self.client), state
+
+    def __setstate__(self, state):
+        self._fields = tuple(state)
+        for key, value in state.items():
+            setattr(self, key, value)
+
     def asdict(self):
         """
         Convert resource to dictionary
@@ -51,7 +66,7 @@ class Resource:
         # pylint: disable=E1101
         return self.client.get_object(self.type, self.id, relation, self, **kwargs)
 
-    def iter_relation(self, relation, **kwargs):
+    def iter_relation(self, relation, cursor=None, **kwargs):
         """
         Generic method to iterate relation from any resource.
 
@@ -59,17 +74,72 @@ class Resource:
         and try to retrieve the provided relation type. This
         is not meant to be used directly by a client, it's more
         a helper method for the child objects.
+
+        :param cursor: a :class:`~deezer.pagination.Cursor` to start from,
+                       moved forward as items are yielded.
         """
         # pylint: disable=E1101
+        items = self._iter_pages(relation, cursor, **kwargs)
+        tracer = getattr(self.client, "tracer", None)
+        if tracer is None:
+            return items
+        attributes = tracing.call_attributes(
+            {"object_t": self.type, "object_id": self.id, "relation": relation}
+        )
+        return tracing.traced_iter(
+            tracer, "deezer.iter_{}".format(relation), items, attributes
+        )
+
+    def _iter_pages(self, relation, cursor=None, **kwargs):
+        """Generator behind :meth:`iter_relation`."""
+        # pylint: disable=E1101
         index = 0
+        if cursor is not None:
+            if cursor.relation != relation:
+                raise ValueError(
+                    "Cursor is for relation {}, not {}".format(
+                        cursor.relation, relation
+                    )
+                )
+            kwargs = dict(cursor.kwargs, **kwargs)
+            cursor.kwargs = kwargs
+            index = cursor.index
         while 1:
             items = self.get_relation(relation, index=index, **kwargs)
-            yield from items
+            for item in items:
+                if cursor is not None:
+                    cursor.index += 1
+                yield item
 
             if len(items) == 0:
+                if cursor is not None:
+                    cursor.exhausted = True
                 break
             index += len(items)
 
+    def sync_relation(self, relation, mark=None, **kwargs):
+        """
+        Generic method to get the items added to a relation since a mark.
+
+        Iterate the relation, most recent items first, and stop at the
+        first item reached by the mark, without requesting further pages.
+        This is not meant to be used directly by a client, it's more
+        a helper method for the child objects.
+
+        :param mark: a :class:`~deezer.pagination.HighWaterMark` returned by
+                     a previous sync, ``None`` to get all the items.
+        :returns: a tuple of the list of new items and the new mark to
+                  store for the next sync.
+        """
+        if mark is None:
+            mark = HighWaterMark()
+        items = []
+        for item in self.iter_relation(relation, **kwargs):
+            if mark.reached(item):
+                break
+            items.append(item)
+        return items, mark.advance(items)
+
     def get_artist(self):
         """
         :returns: the :mod:`Artist <deezer.resources.Artist>` of the resource
@@ -236,6 +306,17 @@ class User(Resource):
         """
         return self.iter_relation("albums", **kwargs)
 
+    def sync_albums(self, mark=None, **kwargs):
+        """
+        Get user's favorite albums added since the last sync.
+
+        :param mark: the :class:`~deezer.pagination.HighWaterMark` returned
+                     by the previous sync.
+        :returns: a tuple of the list of new :mod:`Album <deezer.resources.Album>`
+                  instances and the new mark
+        """
+        return self.sync_relation("albums", mark, **kwargs)
+
     def get_tracks(self, **kwargs):
         """
         Get user's favorite tracks.
@@ -252,6 +333,17 @@ class User(Resource):
         """
         return self.iter_relation("tracks", **kwargs)
 
+    def sync_tracks(self, mark=None, **kwargs):
+        """
+        Get user's favorite tracks added since the last sync.
+
+        :param mark: the :class:`~deezer.pagination.HighWaterMark` returned
+                     by the previous sync.
+        :returns: a tuple of the list of new :mod:`Track <deezer.resources.Track>`
+                  instances and the new mark
+        """
+        return self.sync_relation("tracks", mark, **kwargs)
+
     def get_artists(self, **kwargs):
         """
         Get user's favorite artists.
@@ -268,6 +360,17 @@ class User(Resource):
         """
         return self.iter_relation("artists", **kwargs)
 
+    def sync_artists(self, mark=None, **kwargs):
+        """
+        Get user's favorite artists added since the last sync.
+
+        :param mark: the :class:`~deezer.pagination.HighWaterMark` returned
+                     by the previous sync.
+        :returns: a tuple of the list of new :mod:`Artist <deezer.resources.Artist>`
+                  instances and the new mark
+        """
+        return self.sync_relation("artists", mark, **kwargs)
+
     def get_playlists(self, **kwargs):
         """
         Get user's public playlists.
@@ -391,3 +494,10 @@ class Chart(Resource):
         :returns: list of :mod:`Playlist <deezer.resources.Playlist>` instances
         """
         return self.iter_relation("playlists", **kwargs)
+
+
+def _new_resource(resource_class, client):
+    """Create an empty resource, filled by ``__setstate__`` when unpickled."""
+    resource = resource_class.__new__(resource_class)
+    resource.client = client
+    return resource
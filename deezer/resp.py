@@ -0,0 +1,94 @@
+"""
+The Redis serialization protocol, spoken by
+:class:`~deezer.quota.RedisQuotaBackend` and
+:class:`~deezer.quotaserver.QuotaServer`.
+
+Commands are arrays of bulk strings, replies map to Python values:
+
+    >>> encode_command(("ZCARD", "deezer:quota"))
+    b'*2\r\n$5\r\nZCARD\r\n$12\r\ndeezer:quota\r\n'
+    >>> read_reply(io.BytesIO(encode_reply([1, "a", None])))
+    [1, 'a', None]
+"""
+
+
+class SimpleString(str):
+    """A status reply of the Redis protocol, like ``OK``."""
+
+
+def encode_command(command):
+    """
+    Encode a command sent to the server.
+
+    :param command: the arguments of the command, encoded in UTF-8 unless
+                    they are bytes.
+    """
+    parts = [b"*%d\r\n" % len(command)]
+    for argument in command:
+        if not isinstance(argument, bytes):
+            argument = str(argument).encode("utf-8")
+        parts.append(b"$%d\r\n%s\r\n" % (len(argument), argument))
+    return b"".join(parts)
+
+
+def encode_reply(reply):
+    """
+    Encode a reply sent by the server.
+
+    :param reply: an exception for an error, a :class:`SimpleString` for a
+                  status, an int, a string, ``None`` or a list of replies.
+    """
+    if isinstance(reply, Exception):
+        return "-{}\r\n".format(reply).encode("utf-8")
+    if isinstance(reply, SimpleString):
+        return "+{}\r\n".format(reply).encode("utf-8")
+    if isinstance(reply, int):
+        return b":%d\r\n" % reply
+    if reply is None:
+        return b"$-1\r\n"
+    if isinstance(reply, (list, tuple)):
+        parts = [b"*%d\r\n" % len(reply)]
+        parts.extend(encode_reply(item) for item in reply)
+        return b"".join(parts)
+    data = str(reply).encode("utf-8")
+    return b"$%d\r\n%s\r\n" % (len(data), data)
+
+
+def read_reply(stream):
+    """
+    Read a reply, or a command sent to a server, from a binary stream.
+
+    :returns: the reply, with the errors as ``ValueError`` instances.
+    :raises ConnectionError: if the stream is closed in the middle.
+    :raises ValueError: if the reply is invalid.
+    """
+    line = stream.readline()
+    if not line.endswith(b"\r\n"):
+        raise ConnectionError("Connection closed by the server")
+    kind, value = line[:1], line[1:-2].decode("utf-8")
+    if kind == b"+":
+        return SimpleString(value)
+    if kind == b"-":
+        return ValueError(value)
+    if kind == b":":
+        return int(value)
+    if kind == b"$":
+        length = int(value)
+        if length < 0:
+            return None
+        return stream.read(length + 2)[:-2].decode("utf-8")
+    if kind == b"*":
+        length = int(value)
+        if length < 0:
+            return None
+        return [read_reply(stream) for _ in range(length)]
+    raise ValueError("Invalid reply from the server: {!r}".format(line))
+
+
+def raise_errors(replies):
+    """Raise the first error found in replies, nested lists included."""
+    for reply in replies:
+        if isinstance(reply, list):
+            raise_errors(reply)
+        elif isinstance(reply, ValueError):
+            raise reply
@@ -0,0 +1,215 @@
+"""
+Tracing of the calls of a :class:`~deezer.client.Client` with
+`OpenTelemetry <https://opentelemetry.io>`_.
+
+A client given a tracer opens a span for each high-level call, named like
+``deezer.get_album``, ``deezer.iter_tracks`` or ``deezer.search``, and a
+child ``HTTP GET`` span for each request sent, with the url template, the
+``index`` of the page, the size of the response and the time spent
+decoding it:
+
+    >>> from deezer.tracing import get_tracer
+    >>> client = deezer.Client(tracer=get_tracer())
+
+Any tracer implementing the OpenTelemetry ``Tracer`` API can be used.
+OpenTelemetry is only imported once tracing is used. When
+``opentelemetry-api`` isn't installed, :func:`get_tracer` returns a
+:class:`NoopTracer` and tracing costs next to nothing.
+"""
+from contextlib import contextmanager
+from functools import lru_cache
+
+REQUEST_SPAN = "HTTP GET"
+
+
+class NoopSpan:
+    """A span recording nothing, with the API of an OpenTelemetry span."""
+
+    def set_attribute(self, key, value):
+        pass
+
+    def set_attributes(self, attributes):
+        pass
+
+    def record_exception(self, exception, attributes=None):
+        pass
+
+    def set_status(self, status, description=None):
+        pass
+
+    def is_recording(self):
+        return False
+
+    def end(self, end_time=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.end()
+
+
+class NoopTracer:
+    """A tracer creating :class:`NoopSpan`, with the API of an OpenTelemetry tracer."""
+
+    def start_span(self, name, context=None, attributes=None, **kwargs):
+        return NoopSpan()
+
+    @contextmanager
+    def start_as_current_span(self, name, context=None, attributes=None, **kwargs):
+        yield NoopSpan()
+
+
+@lru_cache(maxsize=None)
+def _opentelemetry():
+    """
+    Import OpenTelemetry on first use.
+
+    :returns: its ``context`` and ``trace`` modules, ``None`` if it isn't
+              installed.
+    """
+    try:
+        from opentelemetry import context, trace
+    except ImportError:
+        return None
+    return context, trace
+
+
+def get_tracer(name="deezer"):
+    """
+    :returns: an OpenTelemetry tracer from the global tracer provider, or a
+              :class:`NoopTracer` if ``opentelemetry-api`` isn't installed.
+    """
+    opentelemetry = _opentelemetry()
+    if opentelemetry is None:
+        return NoopTracer()
+    from deezer import __version__
+
+    return opentelemetry[1].get_tracer(name, __version__)
+
+
+def span_name(object_t):
+    """:returns: the name of the span of a call requesting ``object_t``."""
+    if object_t == "search":
+        return "deezer.search"
+    return "deezer.get_{}".format(object_t)
+
+
+def url_template(object_t, object_id=None, relation=None):
+    """:returns: the path of an url with the id replaced by a placeholder."""
+    parts = [object_t]
+    if object_id is not None:
+        parts.append("{id}")
+    if relation is not None:
+        parts.append(relation)
+    return "/" + "/".join(parts)
+
+
+def _attributes(values):
+    """Drop the ``None`` values, which aren't valid attributes."""
+    return {key: value for key, value in values.items() if value is not None}
+
+
+def call_attributes(info):
+    """:returns: the attributes of the span of a high-level call."""
+    object_id = info["object_id"]
+    return _attributes(
+        {
+            "deezer.object_type": info["object_t"],
+            "deezer.object_id": None if object_id is None else str(object_id),
+            "deezer.relation": info["relation"],
+        }
+    )
+
+
+def request_attributes(info):
+    """:returns: the attributes of the span of an HTTP request."""
+    return _attributes(
+        {
+            "http.method": "GET",
+            "http.url": info["url"],
+            "url.template": url_template(
+                info["object_t"], info["object_id"], info["relation"]
+            ),
+            "deezer.index": info.get("index"),
+            "http.status_code": info.get("status_code"),
+            "http.response_content_length": info.get("size"),
+            "deezer.parse_time": info.get("parse_time"),
+        }
+    )
+
+
+def use_span(span):
+    """
+    Make a span the current one within a ``with`` block, without ending it.
+
+    Spans started in the block become its children.
+    """
+    opentelemetry = None if isinstance(span, NoopSpan) else _opentelemetry()
+    if opentelemetry is None:
+        return _noop_context(span)
+    return opentelemetry[1].use_span(span, end_on_exit=False)
+
+
+@contextmanager
+def _noop_context(span):
+    yield span
+
+
+def span_context(span):
+    """
+    :returns: a context to pass to ``start_span`` to start a child of
+              ``span``, when it isn't the current span.
+    """
+    opentelemetry = None if isinstance(span, NoopSpan) else _opentelemetry()
+    if opentelemetry is None:
+        return None
+    return opentelemetry[1].set_span_in_context(span)
+
+
+def bind_context(function):
+    """
+    Wrap a function to run in the current tracing context, for instance
+    in the thread of an executor, so its spans have the right parent.
+    """
+    opentelemetry = _opentelemetry()
+    if opentelemetry is None:
+        return function
+    context = opentelemetry[0]
+    current = context.get_current()
+
+    def run(*args, **kwargs):
+        token = context.attach(current)
+        try:
+            return function(*args, **kwargs)
+        finally:
+            context.detach(token)
+
+    return run
+
+
+def traced_iter(tracer, name, iterator, attributes=None):
+    """
+    Iterate in a span, current while the next item is computed.
+
+    The span ends when the iteration is exhausted, fails or is closed,
+    with the number of items yielded as ``deezer.items``.
+    """
+    span = tracer.start_span(name, attributes=attributes)
+    count = 0
+    try:
+        while True:
+            with use_span(span):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            count += 1
+            yield item
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            close()
+        span.set_attribute("deezer.items", count)
+        span.end()
@@ -0,0 +1,392 @@
+"""
+Transports sending the HTTP requests of a :class:`~deezer.client.Client`.
+
+The client only needs to send ``GET`` requests and read the json body of
+the response. A transport implements this on top of an HTTP library:
+
+* :class:`RequestsTransport` uses `requests <https://requests.readthedocs.io>`_,
+  the default.
+* :class:`ThreadSafeRequestsTransport` uses a ``requests`` session per
+  thread, for clients shared between threads.
+* :class:`Urllib3Transport` uses `urllib3 <https://urllib3.readthedocs.io>`_
+  directly, skipping the overhead of requests.
+* :class:`HttpxTransport` uses `httpx <https://www.python-httpx.org>`_,
+  which can multiplex requests over HTTP/2.
+* :class:`ReplayTransport` doesn't touch the network and serves responses
+  from memory, for instance recorded in ``vcr.py`` cassettes.
+
+The optional libraries are only imported when their transport is created.
+"""
+import json
+import threading
+import time
+import weakref
+
+
+class Response:
+    """
+    The response to a request, as returned by a transport.
+
+    :param status_code: the HTTP status code.
+    :param content: the body of the response, decoded from any
+                    ``Content-Encoding``.
+    :param headers: the headers of the response.
+    :param elapsed: the time in seconds to receive the response headers,
+                    if known.
+    """
+
+    __slots__ = ("status_code", "content", "headers", "elapsed")
+
+    def __init__(self, status_code, content, headers=None, elapsed=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.elapsed = elapsed
+
+    def json(self):
+        """
+        :returns: the body of the response decoded from json.
+        """
+        return json.loads(self.content.decode("utf-8"))
+
+
+class Transport:
+    """
+    Base class for transports.
+
+    Subclasses implement :meth:`get` and may release their connections
+    in :meth:`close` and :meth:`reset`.
+    """
+
+    #: Whether :meth:`get` may be called from several threads at once
+    thread_safe = False
+
+    def get(self, url, headers=None):
+        """
+        Send a ``GET`` request.
+
+        :param url: the full url to request.
+        :param headers: a dictionary of extra headers to send.
+        :returns: a :class:`Response`.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Release the resources held by the transport."""
+
+    def reset(self):
+        """
+        Drop the open connections, keeping the transport usable.
+
+        Called in child processes after a ``fork``, so they don't share the
+        sockets of their parent.
+        """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class RequestsTransport(Transport):
+    """
+    Transport using a ``requests.Session``.
+
+    :param session: the session to use, a new one is created on first use
+                    if ``None``.
+    """
+
+    def __init__(self, session=None):
+        self._session = session
+
+    @property
+    def session(self):
+        """The ``requests.Session`` sending the requests."""
+        if self._session is None:
+            import requests
+
+            self._session = requests.Session()
+        return self._session
+
+    @session.setter
+    def session(self, session):
+        self._session = session
+
+    def get(self, url, headers=None):
+        response = self.session.get(url, headers=headers)
+        return Response(
+            response.status_code,
+            response.content,
+            response.headers,
+            response.elapsed.total_seconds(),
+        )
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+
+    def reset(self):
+        # the adapters of a closed session open new connections when needed
+        self.close()
+
+
+class ThreadSafeRequestsTransport(RequestsTransport):
+    """
+    Transport using a ``requests.Session`` per thread, for a client shared
+    between threads.
+
+    ``requests.Session`` isn't documented as thread-safe, so each thread
+    gets its own. They all mount the same ``HTTPAdapter``, whose connection
+    pool is thread-safe, so connections are reused across threads.
+
+    :param pool_maxsize: the number of connections kept open per host,
+                         set it to the number of threads.
+    :param adapter_kwargs: extra arguments for the ``requests.adapters.HTTPAdapter``.
+    """
+
+    thread_safe = True
+
+    def __init__(self, pool_maxsize=32, **adapter_kwargs):
+        self.pool_maxsize = pool_maxsize
+        self.adapter_kwargs = adapter_kwargs
+        self._adapter = None
+        self._sessions = weakref.WeakSet()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @property
+    def adapter(self):
+        """The ``HTTPAdapter`` shared by the sessions."""
+        with self._lock:
+            if self._adapter is None:
+                from requests.adapters import HTTPAdapter
+
+                self._adapter = HTTPAdapter(
+                    pool_maxsize=self.pool_maxsize, **self.adapter_kwargs
+                )
+            return self._adapter
+
+    @property
+    def session(self):
+        """The ``requests.Session`` of the current thread."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self.session = self._new_session()
+        return session
+
+    @session.setter
+    def session(self, session):
+        self._local.session = session
+        with self._lock:
+            self._sessions.add(session)
+
+    def _new_session(self):
+        import requests
+
+        session = requests.Session()
+        adapter = self.adapter
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def close(self):
+        with self._lock:
+            sessions, self._sessions = list(self._sessions), weakref.WeakSet()
+            adapter, self._adapter = self._adapter, None
+        for session in sessions:
+            session.close()
+        if adapter is not None:
+            adapter.close()
+        self._local = threading.local()
+
+    def reset(self):
+        self._lock = threading.Lock()
+        self.close()
+
+
+class Urllib3Transport(Transport):
+    """
+    Transport using a ``urllib3.PoolManager``, which is safe to share
+    between threads.
+
+    :param pool_manager: the pool manager to use, a new one is created
+                         if ``None``.
+    :param kwargs: extra arguments for a new ``urllib3.PoolManager``.
+    """
+
+    thread_safe = True
+
+    def __init__(self, pool_manager=None, **kwargs):
+        if pool_manager is None:
+            import urllib3
+
+            pool_manager = urllib3.PoolManager(**kwargs)
+        self.pool_manager = pool_manager
+
+    def get(self, url, headers=None):
+        start = time.perf_counter()
+        response = self.pool_manager.request(
+            "GET", url, headers=headers, preload_content=False
+        )
+        elapsed = time.perf_counter() - start
+        try:
+            content = response.read()
+        finally:
+            response.release_conn()
+        return Response(response.status, content, dict(response.headers), elapsed)
+
+    def close(self):
+        self.pool_manager.clear()
+
+    def reset(self):
+        self.close()
+
+
+class HttpxTransport(Transport):
+    """
+    Transport using a ``httpx.Client``.
+
+    :param client: the httpx client to use, a new one is created if ``None``.
+    :param http2: whether a new client should use HTTP/2, which requires
+                  ``httpx[http2]``.
+    :param kwargs: extra arguments for a new ``httpx.Client``.
+    """
+
+    thread_safe = True
+
+    def __init__(self, client=None, http2=False, **kwargs):
+        self._options = None
+        if client is None:
+            self._options = dict(kwargs, http2=http2)
+            client = self._new_client()
+        self.client = client
+
+    def _new_client(self):
+        import httpx
+
+        return httpx.Client(**self._options)
+
+    def get(self, url, headers=None):
+        response = self.client.get(url, headers=headers)
+        return Response(
+            response.status_code,
+            response.content,
+            response.headers,
+            response.elapsed.total_seconds(),
+        )
+
+    def close(self):
+        self.client.close()
+
+    def reset(self):
+        """
+        Replace the httpx client by a new one, unless it was given to the
+        transport. A closed httpx client can't be used again.
+        """
+        if self._options is not None:
+            self.client = self._new_client()
+
+
+class ReplayTransport(Transport):
+    """
+    Transport serving recorded responses from memory, without any latency.
+
+    Responses are looked up by url. When several responses are recorded
+    for the same url, they are served in turn, starting over after the
+    last one.
+
+        >>> transport = ReplayTransport.from_cassettes("tests/cassettes/*.yaml")
+        >>> client = deezer.Client(transport=transport)
+
+    :param responses: a dictionary of url to a list of :class:`Response`.
+    """
+
+    thread_safe = True
+
+    def __init__(self, responses=None):
+        self.responses = {}
+        self._next = {}
+        self._lock = threading.Lock()
+        for url, url_responses in (responses or {}).items():
+            for response in url_responses:
+                self.add(url, response)
+
+    def add(self, url, response):
+        """
+        Record a response for an url.
+
+        :param response: a :class:`Response`, or a json payload to serve.
+        """
+        if not isinstance(response, Response):
+            content = json.dumps(response).encode("utf-8")
+            response = Response(200, content, {"Content-Type": "application/json"})
+        self.responses.setdefault(url, []).append(response)
+
+    def get(self, url, headers=None):
+        try:
+            responses = self.responses[url]
+        except KeyError:
+            raise LookupError("No response recorded for {}".format(url))
+        with self._lock:
+            index = self._next.get(url, 0)
+            self._next[url] = (index + 1) % len(responses)
+        return responses[index]
+
+    @classmethod
+    def from_cassettes(cls, *patterns):
+        """
+        Load the ``GET`` requests recorded in ``vcr.py`` cassettes.
+
+        Requires `PyYAML <https://pyyaml.org>`_ to be installed.
+
+        :param patterns: paths or glob patterns of the cassette files.
+        :returns: a :class:`ReplayTransport`.
+        """
+        import glob
+
+        import yaml
+
+        class CassetteLoader(yaml.SafeLoader):
+            """Safe loader also reading the tuples recorded by tornado."""
+
+        CassetteLoader.add_constructor(
+            "tag:yaml.org,2002:python/tuple",
+            lambda loader, node: tuple(loader.construct_sequence(node)),
+        )
+        transport = cls()
+        for pattern in patterns:
+            for path in sorted(glob.glob(pattern)):
+                with open(path, "rb") as cassette:
+                    data = yaml.load(cassette, Loader=CassetteLoader)  # nosec
+                for interaction in data.get("interactions", []):
+                    request = interaction["request"]
+                    if request["method"].upper() != "GET":
+                        continue
+                    transport.add(
+                        request["uri"], _recorded_response(interaction["response"])
+                    )
+        return transport
+
+
+def _recorded_response(recorded):
+    """Build a :class:`Response` from a response recorded by ``vcr.py``."""
+    import gzip
+    import zlib
+
+    headers = recorded.get("headers", {})
+    if isinstance(headers, dict):
+        headers = headers.items()
+    headers = {
+        name: values[0] if isinstance(values, list) else values
+        for name, values in headers
+    }
+    content = recorded["body"]["string"]
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    encoding = headers.pop("Content-Encoding", "").lower()
+    if encoding == "gzip":
+        content = gzip.decompress(content)
+    elif encoding == "deflate":
+        content = zlib.decompress(content)
+    return Response(recorded["status"]["code"], content, headers)
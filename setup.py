@@ -27,7 +27,14 @@ setup(
     license="MIT",
     packages=["deezer"],
     install_requires=["requests"],
-    extras_require={"tornado": ["tornado"]},
+    extras_require={
+        "tornado": ["tornado"],
+        "urllib3": ["urllib3"],
+        "httpx": ["httpx"],
+        "http2": ["httpx[http2]"],
+        "replay": ["pyyaml"],
+        "tracing": ["opentelemetry-api"],
+    },
     tests_require=["requests-mock"],
     python_requires=">=3.5",
     classifiers=[
@@ -1,3 +1,7 @@
+import json
+from datetime import timedelta
+from urllib.parse import parse_qs, urlparse
+
 import vcr_unittest
 
 import deezer
@@ -10,3 +14,39 @@ class BaseTestCaseWithVcr(vcr_unittest.VCRTestCase):
         self.unsec_client = deezer.Client(use_ssl=False)
         self.client_fr = deezer.Client(headers={"Accept-Language": "fr"})  # French
         self.client_ja = deezer.Client(headers={"Accept-Language": "ja"})  # Japanese
+
+
+class FakeResponse:
+    """Minimal stand-in for a ``requests`` response returning a json payload."""
+
+    status_code = 200
+    headers = {}
+    elapsed = timedelta(0)
+
+    def __init__(self, payload):
+        self.payload = payload
+        self.content = json.dumps(payload).encode("utf-8")
+
+    def json(self):
+        return self.payload
+
+
+def paginated_api(items):
+    """
+    Build a fake ``session.get`` serving ``items`` as paginated results.
+
+    Records the ``index`` of each requested page in the ``calls`` attribute
+    and the requested urls in the ``urls`` attribute.
+    """
+
+    def get(url, **kwargs):
+        get.urls.append(url)
+        query = parse_qs(urlparse(url).query)
+        index = int(query.get("index", ["0"])[0])
+        limit = int(query.get("limit", ["25"])[0])
+        get.calls.append(index)
+        return FakeResponse({"data": items[index:][:limit], "total": len(items)})
+
+    get.calls = []
+    get.urls = []
+    return get
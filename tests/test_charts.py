@@ -0,0 +1,56 @@
+from unittest import TestCase, mock
+
+import deezer
+from deezer.charts import ChartSnapshot, ChartWatcher
+
+from .base import FakeResponse
+
+
+def chart_page(ids):
+    return {
+        "data": [{"id": i, "type": "track", "title": "T{}".format(i)} for i in ids],
+        "total": len(ids),
+    }
+
+
+class TestChartSnapshot(TestCase):
+    def test_diff(self):
+        """Test entries, exits and moves between two snapshots."""
+        previous = ChartSnapshot.from_items("tracks", chart_page([1, 2, 3])["data"])
+        current = ChartSnapshot.from_items("tracks", chart_page([2, 1, 4])["data"])
+        diff = current.diff(previous)
+        self.assertEqual(diff.entries, [("tracks", 4, 3)])
+        self.assertEqual(diff.exits, [("tracks", 3, 3)])
+        self.assertEqual(diff.moves, [("tracks", 2, 2, 1), ("tracks", 1, 1, 2)])
+        self.assertFalse(previous.diff(previous))
+
+    def test_from_chart(self):
+        """Test snapshots of raw json and resources are the same."""
+        json = {"tracks": chart_page([1, 2]), "albums": {"data": [], "total": 0}}
+        client = deezer.Client()
+        chart = client._process_json(json, parent="chart")
+        self.assertEqual(
+            ChartSnapshot.from_chart(json), ChartSnapshot.from_chart(chart)
+        )
+        self.assertEqual(
+            ChartSnapshot.from_chart(json).sections, {"tracks": (1, 2), "albums": ()}
+        )
+
+
+class TestChartWatcher(TestCase):
+    def test_poll(self):
+        """Test that unchanged charts are skipped."""
+        client = deezer.Client()
+        pages = [chart_page([1, 2]), chart_page([1, 2]), chart_page([2, 1])]
+        responses = [FakeResponse(page) for page in pages]
+        watcher = ChartWatcher(client, "tracks")
+        with mock.patch.object(client.session, "get", side_effect=responses) as get:
+            first = watcher.poll()
+            second = watcher.poll()
+            third = watcher.poll()
+        self.assertEqual(get.call_args[0][0], "https://api.deezer.com/chart/0/tracks")
+        self.assertEqual(len(first.entries), 2)
+        self.assertIsInstance(first.chart[0], deezer.resources.Track)
+        self.assertIsNone(second)
+        self.assertEqual(third.asdict()["moves"][0]["previous_position"], 2)
+        self.assertEqual(third.entries, [])
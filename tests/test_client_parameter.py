@@ -65,6 +65,52 @@ class TestClient(BaseTestCaseWithVcr):
         )
         self.assertRaises(TypeError, self.client.object_url, "foo")
 
+    def test_object_url_memoized(self):
+        """Test that memoized urls follow changes of the client parameters"""
+        kwargs = {"index": 25, "q": "Daft Punk"}
+        url = self.client.object_url("album", 12, "tracks", **kwargs)
+        self.assertEqual(kwargs, {"index": 25, "q": "Daft Punk"})
+        self.assertIs(self.client.object_url("album", 12, "tracks", **kwargs), url)
+        self.assertEqual(
+            self.client.object_url("album", "12", "tracks", index="25", q="Daft Punk"),
+            url,
+        )
+        self.client.access_token = "token"
+        self.assertEqual(
+            self.client.object_url("album", 12, "tracks", **kwargs),
+            "https://api.deezer.com/album/12/tracks?"
+            "access_token=token&index=25&q=Daft+Punk",
+        )
+        self.client.host = "localhost:8000"
+        self.client.use_ssl = False
+        self.assertEqual(
+            self.client.object_url("album", 12),
+            "http://localhost:8000/album/12?access_token=token",
+        )
+        self.assertEqual(
+            self.client.object_url("search", q=["unhashable"]),
+            "http://localhost:8000/search?access_token=token&q=%5B%27unhashable%27%5D",
+        )
+
+    def test_object_url_changed_during_build(self):
+        """Test that a url built while the parameters change isn't memoized"""
+        template = self.client._template
+
+        def change_token(*args):
+            self.client.access_token = "token"
+            return template(*args)
+
+        self.client._template = change_token
+        self.assertEqual(
+            self.client.object_url("album", 12),
+            "https://api.deezer.com/album/12",
+        )
+        del self.client._template
+        self.assertEqual(
+            self.client.object_url("album", 12),
+            "https://api.deezer.com/album/12?access_token=token",
+        )
+
     def test_get_album(self):
         """Test method to retrieve an album"""
         album = self.client.get_album(302127)
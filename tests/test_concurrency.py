@@ -0,0 +1,108 @@
+import threading
+import time
+from unittest import TestCase, mock
+
+import deezer
+from deezer.concurrency import AdaptiveConcurrencyLimiter
+
+from .base import FakeResponse
+
+
+def request(limiter, elapsed=0.05, status_code=200):
+    """Run the hooks of a successful request."""
+    info = {"object_t": "album", "relation": None}
+    limiter.before_request(info)
+    info.update(elapsed=elapsed, status_code=status_code)
+    limiter.after_response(info)
+    return info
+
+
+class TestAdaptiveConcurrencyLimiter(TestCase):
+    def test_additive_increase(self):
+        """Test that the limit grows by one every limit responses."""
+        metrics = deezer.MetricsCollector()
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, metrics=metrics)
+        for _ in range(2):
+            request(limiter)
+        self.assertEqual(limiter.limit, 3)
+        for _ in range(3):
+            request(limiter)
+        self.assertEqual(limiter.limit, 4)
+        self.assertEqual(metrics.value("concurrency_limit"), 4)
+        self.assertEqual(limiter.in_flight, 0)
+
+    def test_max_limit(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=3)
+        for _ in range(20):
+            request(limiter)
+        self.assertEqual(limiter.limit, 3)
+
+    def test_backoff_on_errors(self):
+        """Test that quota and server errors cut the limit once per latency."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=16)
+        info = request(limiter, elapsed=0.01)
+        info.update(error=ValueError(), api_error={"code": 4})
+        limiter.on_error(info)
+        self.assertEqual(limiter.limit, 8)
+        # errors of requests sent along with the first one are ignored
+        request(limiter, elapsed=0.01, status_code=503)
+        self.assertEqual(limiter.limit, 8)
+        time.sleep(0.02)
+        request(limiter, elapsed=0.01, status_code=503)
+        self.assertEqual(limiter.limit, 4)
+        # other API errors don't back off
+        info = request(limiter, elapsed=0.01)
+        info.update(error=ValueError(), api_error={"code": 800})
+        limiter.on_error(info)
+        self.assertEqual(limiter.limit, 4)
+
+    def test_backoff_on_failure(self):
+        """Test that a failed request releases its slot."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, min_limit=2)
+        info = {"object_t": "album", "relation": None}
+        limiter.before_request(info)
+        info.update(elapsed=1, error=OSError())
+        limiter.on_error(info)
+        self.assertEqual(limiter.in_flight, 0)
+        self.assertEqual(limiter.limit, 2)
+
+    def test_backoff_on_latency_spike(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=8)
+        for _ in range(10):
+            request(limiter, elapsed=0.001)
+        limit = limiter.limit
+        for _ in range(3):
+            request(limiter, elapsed=0.1)
+        self.assertLess(limiter.limit, limit)
+
+    def test_waits_for_slot(self):
+        """Test that requests above the limit wait for a response."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1)
+        client = deezer.Client()
+        limiter.install(client)
+        limiter.before_request({})
+        thread = threading.Thread(target=client.get_album, args=(1,))
+        response = FakeResponse({"id": 1, "type": "album", "title": "A"})
+        with mock.patch.object(client.session, "get", return_value=response) as get:
+            thread.start()
+            time.sleep(0.05)
+            self.assertFalse(get.called)
+            request_info = {"elapsed": 0.01, "status_code": 200}
+            limiter.after_response(request_info)
+            thread.join()
+        self.assertTrue(get.called)
+        self.assertEqual(limiter.in_flight, 0)
+        limiter.uninstall(client)
+        self.assertEqual(client._hooks, {})
+
+    def test_client_quota_error(self):
+        """Test that quota errors of the API reach the limiter."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=8)
+        client = deezer.Client()
+        limiter.install(client)
+        response = FakeResponse({"error": {"code": 4, "message": "Quota"}})
+        with mock.patch.object(client.session, "get", return_value=response):
+            with self.assertRaises(ValueError):
+                client.get_album(1)
+        self.assertEqual(limiter.limit, 4)
+        self.assertEqual(limiter.in_flight, 0)
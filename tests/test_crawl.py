@@ -0,0 +1,192 @@
+import io
+import json
+import multiprocessing
+import re
+import threading
+import time
+import warnings
+from unittest import TestCase, mock, skipUnless
+
+import deezer
+from deezer.crawl import ArtistGraphCrawler, CrawlScheduler, Job, JsonLinesSink
+from deezer.idset import BitmapIdSet
+from deezer.mockserver import MockDeezerAPI, MockDeezerServer
+from deezer.ratelimit import SharedRateLimiter
+
+from .base import FakeResponse
+
+HAS_FORK = "fork" in multiprocessing.get_all_start_methods()
+
+# artist id -> related artist ids
+GRAPH = {1: [2, 3], 2: [1, 4], 3: [4], 4: [5], 5: []}
+
+
+def fake_get(url, **kwargs):
+    artist_id, relation = re.search(r"/artist/(-?\d+)/(\w+)", url).groups()
+    artist_id = int(artist_id)
+    if artist_id not in GRAPH:
+        return FakeResponse({"error": {"code": 800}})
+    if relation == "related":
+        ids = GRAPH[artist_id]
+        data = [{"id": i, "type": "artist", "name": str(i)} for i in ids]
+    else:
+        data = [{"id": artist_id * 100, "type": "album", "title": "Album"}]
+    return FakeResponse({"data": data, "total": len(data)})
+
+
+class TestArtistGraphCrawler(TestCase):
+    def setUp(self):
+        self.client = deezer.Client()
+        patcher = mock.patch.object(self.client.session, "get", fake_get)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_crawl_depth(self):
+        """Test that artists are expanded up to the maximum depth."""
+        crawler = ArtistGraphCrawler(self.client, max_depth=1, workers=2)
+        edges = {(e.source, e.target.id, e.depth) for e in crawler.crawl([1])}
+        self.assertEqual(edges, {(1, 2, 1), (1, 3, 1), (2, 1, 2), (2, 4, 2), (3, 4, 2)})
+        self.assertEqual(crawler.visited, {1, 2, 3})
+
+    def test_crawl_whole_graph(self):
+        """Test that each artist is only visited once."""
+        crawler = ArtistGraphCrawler(self.client, max_depth=10)
+        edges = list(crawler.crawl([1, 2]))
+        self.assertEqual(len(edges), sum(len(ids) for ids in GRAPH.values()))
+        self.assertEqual(crawler.visited, set(GRAPH))
+
+    def test_crawl_compact_visited_set(self):
+        """Test crawling with a bitmap as visited set."""
+        visited = BitmapIdSet()
+        crawler = ArtistGraphCrawler(self.client, max_depth=10, visited=visited)
+        self.assertEqual(len(list(crawler.crawl([1]))), 6)
+        self.assertEqual(list(visited), [1, 2, 3, 4, 5])
+
+    def test_crawl_max_nodes_and_relations(self):
+        """Test node budget and extra relations."""
+        crawler = ArtistGraphCrawler(
+            self.client, relations=("related", "albums"), max_depth=5, max_nodes=2
+        )
+        edges = list(crawler.crawl([1]))
+        self.assertEqual(len(crawler.visited), 2)
+        albums = [e for e in edges if e.relation == "albums"]
+        self.assertEqual(len(albums), 2)
+        self.assertIsInstance(albums[0].target, deezer.resources.Album)
+
+    def test_crawl_skips_errors(self):
+        """Test that failed requests are counted and skipped."""
+        crawler = ArtistGraphCrawler(self.client)
+        self.assertEqual(list(crawler.crawl([-1])), [])
+        self.assertEqual(crawler.errors, 1)
+        self.assertEqual(crawler.failures[0][:2], (-1, "related"))
+
+    def test_crawl_skips_transport_errors(self):
+        """Test that a connection error only skips its own request."""
+
+        def flaky_get(url, **kwargs):
+            if "/artist/3/" in url:
+                raise ConnectionError("Connection reset by peer")
+            return fake_get(url, **kwargs)
+
+        crawler = ArtistGraphCrawler(self.client, max_depth=10)
+        with mock.patch.object(self.client.session, "get", flaky_get):
+            edges = {(e.source, e.target.id) for e in crawler.crawl([1])}
+        self.assertEqual(edges, {(1, 2), (1, 3), (2, 1), (2, 4), (4, 5)})
+        self.assertEqual(crawler.errors, 1)
+        source, relation, error = crawler.failures[0]
+        self.assertEqual((source, relation), (3, "related"))
+        self.assertIsInstance(error, ConnectionError)
+
+    def test_crawl_not_thread_safe(self):
+        """Test that a transport which isn't thread safe is used from the calling thread."""
+        threads = set()
+
+        def recording_get(url, **kwargs):
+            threads.add(threading.get_ident())
+            return fake_get(url, **kwargs)
+
+        crawler = ArtistGraphCrawler(self.client, max_depth=10, workers=4)
+        with mock.patch.object(self.client.session, "get", recording_get):
+            with self.assertWarns(RuntimeWarning):
+                edges = list(crawler.crawl([1]))
+        self.assertEqual(len(edges), 6)
+        self.assertEqual(threads, {threading.get_ident()})
+
+    def test_crawl_default_workers(self):
+        """Test that the default workers don't warn on a default client."""
+        crawler = ArtistGraphCrawler(self.client, max_depth=10)
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", RuntimeWarning)
+            self.assertEqual(len(list(crawler.crawl([1]))), 6)
+
+
+def track_ids(tracks):
+    return [track.id for track in tracks]
+
+
+class TestCrawlScheduler(TestCase):
+    def setUp(self):
+        self.api = MockDeezerAPI.synthetic(artists=6, albums=1, tracks=10)
+        self.server = MockDeezerServer(self.api).start()
+        self.addCleanup(self.server.stop)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            self.client = deezer.Client(host=self.server.host, use_ssl=False)
+
+    def test_run_under_quota(self):
+        """Test that the workers share the budget and all results arrive."""
+        self.api.quota, self.api.period = 8, 0.5
+        jobs = [Job("artist", i) for i in range(1, 7)]
+        jobs += [
+            Job("album", i * 1000 + 1, "tracks", {"limit": 3}, iterate=True)
+            for i in range(1, 4)
+        ]
+        limiter = SharedRateLimiter(max_requests=8, period=0.6)
+        scheduler = CrawlScheduler(self.client, processes=3, rate_limiter=limiter)
+        start = time.monotonic()
+        results = list(scheduler.run(iter(jobs)))
+        # 6 artists and 4 pages of tracks for each album
+        self.assertGreaterEqual(time.monotonic() - start, 1.2)
+        self.assertEqual(scheduler.errors, 0)
+        self.assertCountEqual([result.job for result in results], jobs)
+        for job, result, _ in results:
+            if job.iterate:
+                expected = [job.object_id * 100 + i for i in range(1, 11)]
+                self.assertEqual(track_ids(result), expected)
+            else:
+                self.assertEqual(result.id, job.object_id)
+                self.assertIs(result.client, self.client)
+
+    @skipUnless(HAS_FORK, "the patched transport is inherited by forking")
+    def test_run_transport_error(self):
+        """Test that a transport error only fails its own job."""
+
+        def flaky_get(url, **kwargs):
+            if "/artist/3" in url:
+                raise ConnectionError("Connection reset by peer")
+            return get(url, **kwargs)
+
+        get = self.client.session.get
+        jobs = [Job("artist", i) for i in range(1, 5)]
+        scheduler = CrawlScheduler(
+            self.client, processes=2, context=multiprocessing.get_context("fork")
+        )
+        with mock.patch.object(self.client.session, "get", flaky_get):
+            results = {result.job.object_id: result for result in scheduler.run(jobs)}
+        self.assertEqual(sorted(results), [1, 2, 3, 4])
+        self.assertIsNone(results[3].result)
+        self.assertIsInstance(results[3].error, ConnectionError)
+        self.assertEqual(results[4].result.id, 4)
+        self.assertEqual(scheduler.errors, 1)
+
+    def test_drain_to_sink(self):
+        """Test that results are transformed in the workers and written."""
+        stream = io.StringIO()
+        scheduler = CrawlScheduler(self.client, processes=2, transform=track_ids)
+        jobs = [Job("album", 1001, "tracks"), Job("album", 1, "tracks")]
+        self.assertEqual(scheduler.drain(jobs, JsonLinesSink(stream)), 2)
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+        lines.sort(key=lambda line: line["id"])
+        self.assertIn("error", lines[0])
+        self.assertEqual(lines[1]["data"], list(range(100101, 100111)))
+        self.assertEqual(scheduler.errors, 1)
@@ -0,0 +1,57 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from deezer.idset import BitmapIdSet, BloomFilter
+
+
+class TestBitmapIdSet(TestCase):
+    def test_add_contains(self):
+        """Test membership, growth and length."""
+        ids = BitmapIdSet(capacity=8)
+        for item_id in (3, 3, 1000003, 0):
+            ids.add(item_id)
+        self.assertEqual(len(ids), 3)
+        self.assertIn(1000003, ids)
+        self.assertNotIn(4, ids)
+        self.assertNotIn(-1, ids)
+        self.assertNotIn(10**12, ids)
+        self.assertEqual(list(ids), [0, 3, 1000003])
+        with self.assertRaises(ValueError):
+            ids.add(-1)
+
+    def test_persistence(self):
+        """Test that the set is saved and reloaded from its file."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "visited.bin")
+            with BitmapIdSet(path, capacity=8) as ids:
+                ids.add(5)
+                ids.add(70000)
+            with BitmapIdSet(path) as ids:
+                self.assertEqual(len(ids), 2)
+                self.assertIn(70000, ids)
+                self.assertNotIn(6, ids)
+            with self.assertRaises(ValueError):
+                BloomFilter(10, path=path)
+
+
+class TestBloomFilter(TestCase):
+    def test_false_positive_rate(self):
+        """Test no false negatives and a bounded false positive rate."""
+        bloom = BloomFilter(capacity=10000, error_rate=0.01)
+        for item_id in range(0, 20000, 2):
+            bloom.add(item_id)
+        self.assertTrue(all(i in bloom for i in range(0, 20000, 2)))
+        false_positives = sum(i in bloom for i in range(1, 20000, 2))
+        self.assertLess(false_positives, 200)
+        self.assertLess(bloom.nbytes, 13000)
+
+    def test_persistence(self):
+        """Test that the filter and its parameters are reloaded."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "visited.bloom")
+            with BloomFilter(1000, path=path) as bloom:
+                bloom.add(42)
+            with BloomFilter(10, error_rate=0.5, path=path) as bloom:
+                self.assertIn(42, bloom)
+                self.assertEqual(len(bloom), 1)
@@ -0,0 +1,45 @@
+import json
+import os
+import subprocess
+import sys
+from unittest import TestCase
+
+HEAVY_MODULES = ["requests", "urllib3", "tornado", "opentelemetry", "yaml"]
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def loaded_modules(code):
+    """Run code in a new interpreter and return the heavy modules it loaded."""
+    script = (
+        "{}\nimport json, sys\nprint(json.dumps([m for m in {!r} if m in sys.modules]))"
+    )
+    output = subprocess.check_output(
+        [sys.executable, "-c", script.format(code, HEAVY_MODULES)], cwd=ROOT
+    )
+    return json.loads(output.decode("utf-8").splitlines()[-1])
+
+
+class TestLazyImports(TestCase):
+    def test_import_package(self):
+        """Test that importing the package doesn't load the HTTP stack."""
+        self.assertEqual(loaded_modules("import deezer"), [])
+
+    def test_resources_only(self):
+        code = "import deezer\ndeezer.Album(None, {'id': 1, 'title': 'A'})"
+        self.assertEqual(loaded_modules(code), [])
+
+    def test_client_created(self):
+        """Test that requests is only imported for the first request."""
+        self.assertEqual(loaded_modules("import deezer\ndeezer.Client()"), [])
+        code = "import deezer\ndeezer.Client().session"
+        self.assertIn("requests", loaded_modules(code))
+
+    def test_lazy_attributes(self):
+        import deezer
+
+        self.assertIn("Client", dir(deezer))
+        for name in deezer.__all__:
+            self.assertIsNotNone(getattr(deezer, name))
+        self.assertIs(deezer.resources.Album, deezer.Album)
+        with self.assertRaises(AttributeError):
+            deezer.Missing
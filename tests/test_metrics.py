@@ -0,0 +1,142 @@
+from unittest import TestCase, mock
+
+import deezer
+from deezer.metrics import MetricsCollector
+
+from .base import FakeResponse
+
+
+class TestHooks(TestCase):
+    def setUp(self):
+        self.client = deezer.Client()
+        self.events = []
+
+    def record(self, event):
+        return lambda info: self.events.append((event, dict(info)))
+
+    def test_hooks_called_in_order(self):
+        """Test that the hooks describe the request and its response."""
+        for event in ("before_request", "after_response", "on_error"):
+            self.client.add_hook(event, self.record(event))
+        response = FakeResponse({"id": 1, "type": "album", "title": "A"})
+        with mock.patch.object(self.client.session, "get", return_value=response):
+            self.client.get_album(1)
+        self.assertEqual(
+            [event for event, _ in self.events], ["before_request", "after_response"]
+        )
+        info = self.events[1][1]
+        self.assertEqual(info["object_t"], "album")
+        self.assertEqual(info["object_id"], 1)
+        self.assertEqual(info["url"], "https://api.deezer.com/album/1")
+        self.assertEqual(info["status_code"], 200)
+        self.assertEqual(info["size"], len(response.content))
+        self.assertGreaterEqual(info["elapsed"], 0)
+
+    def test_on_error_api_error(self):
+        """Test that API errors are reported with the exception raised."""
+        self.client.add_hook("on_error", self.record("on_error"))
+        response = FakeResponse({"error": {"code": 800}})
+        with mock.patch.object(self.client.session, "get", return_value=response):
+            with self.assertRaises(ValueError):
+                self.client.get_album(1)
+        self.assertIsInstance(self.events[0][1]["error"], ValueError)
+
+    def test_on_error_transport_error(self):
+        """Test that failed requests are reported and the error re-raised."""
+        self.client.add_hook("on_error", self.record("on_error"))
+        with mock.patch.object(self.client.session, "get", side_effect=OSError):
+            with self.assertRaises(OSError):
+                self.client.get_album(1)
+        self.assertIsInstance(self.events[0][1]["error"], OSError)
+
+    def test_on_cache_hit(self):
+        """Test that searches served from the cache are reported."""
+        client = deezer.Client(search_cache=deezer.SearchCache())
+        client.add_hook("on_cache_hit", self.record("on_cache_hit"))
+        response = FakeResponse({"data": [], "total": 0})
+        with mock.patch.object(client.session, "get", return_value=response):
+            client.search("Daft Punk")
+            client.search("daft punk")
+        self.assertEqual(len(self.events), 1)
+        self.assertEqual(self.events[0][1]["cache"], "search")
+
+    def test_unknown_event(self):
+        with self.assertRaises(ValueError):
+            self.client.add_hook("on_retry", print)
+
+    def test_remove_hook(self):
+        callback = self.record("before_request")
+        self.client.add_hook("before_request", callback)
+        self.client.remove_hook("before_request", callback)
+        self.assertEqual(self.client._hooks, {})
+        with self.assertRaises(ValueError):
+            self.client.remove_hook("before_request", callback)
+
+
+class TestMetricsCollector(TestCase):
+    def setUp(self):
+        self.client = deezer.Client()
+        self.metrics = MetricsCollector(buckets=(0.1, 1)).install(self.client)
+
+    def test_counters(self):
+        """Test that requests are counted per object type and relation."""
+        responses = [
+            FakeResponse({"id": 1, "type": "album", "title": "A"}),
+            FakeResponse({"data": []}),
+            FakeResponse({"error": {"code": 800}}),
+        ]
+        with mock.patch.object(self.client.session, "get", side_effect=responses):
+            self.client.get_album(1)
+            self.client.get_object("album", 1, "tracks")
+            with self.assertRaises(ValueError):
+                self.client.get_album(2)
+        album = {"object_type": "album", "relation": ""}
+        self.assertEqual(self.metrics.value("requests_total", **album), 2)
+        self.assertEqual(
+            self.metrics.value(
+                "requests_total", object_type="album", relation="tracks"
+            ),
+            1,
+        )
+        self.assertEqual(
+            self.metrics.value("errors_total", error="ValueError", **album), 1
+        )
+        self.assertEqual(self.metrics.value("requests_in_flight", **album), 0)
+        self.assertEqual(self.metrics.value("request_duration_seconds", **album), 2)
+
+    def test_uninstall(self):
+        self.metrics.uninstall(self.client)
+        self.assertEqual(self.client._hooks, {})
+
+    def test_prometheus_export(self):
+        """Test the text exposition format of each kind of metric."""
+        self.metrics.increment("requests_total", object_type="album", relation="")
+        self.metrics.set_gauge("limit", 4)
+        for latency in (0.05, 0.5, 2):
+            self.metrics.observe(
+                "request_duration_seconds", latency, object_type="album", relation=""
+            )
+        text = self.metrics.to_prometheus()
+        self.assertIn("# TYPE deezer_limit gauge\ndeezer_limit 4\n", text)
+        self.assertIn("# TYPE deezer_requests_total counter\n", text)
+        self.assertIn('deezer_requests_total{object_type="album",relation=""} 1', text)
+        labels = 'object_type="album",relation=""'
+        for bound, count in (("0.1", 1), ("1", 2), ("+Inf", 3)):
+            self.assertIn(
+                'deezer_request_duration_seconds_bucket{{{},le="{}"}} {}'.format(
+                    labels, bound, count
+                ),
+                text,
+            )
+        self.assertIn(
+            "deezer_request_duration_seconds_sum{{{}}} 2.55".format(labels), text
+        )
+        self.assertIn(
+            "deezer_request_duration_seconds_count{{{}}} 3".format(labels), text
+        )
+
+    def test_label_escaping(self):
+        self.metrics.increment("custom", query='say "hi"\\')
+        self.assertIn(
+            'deezer_custom{query="say \\"hi\\"\\\\"} 1', self.metrics.to_prometheus()
+        )
@@ -0,0 +1,71 @@
+import os
+import warnings
+from unittest import TestCase
+
+import deezer
+from deezer.mockserver import MockDeezerAPI, MockDeezerServer
+from deezer.transports import Urllib3Transport
+
+CASSETTES = os.path.join(os.path.dirname(__file__), "cassettes")
+
+
+class TestMockDeezerAPI(TestCase):
+    def setUp(self):
+        self.api = MockDeezerAPI.synthetic(artists=5, albums=2, tracks=30)
+
+    def test_pagination(self):
+        """Test that list payloads are paginated with index and limit."""
+        page = self.api.handle("/album/1001/tracks", {"index": ["20"], "limit": ["5"]})
+        self.assertEqual(page["total"], 30)
+        self.assertEqual([t["id"] for t in page["data"]], list(range(100121, 100126)))
+        self.assertEqual(page["next"], "/album/1001/tracks?index=25&limit=5")
+        last_page = self.api.handle("/album/1001/tracks", {"index": ["25"]})
+        self.assertNotIn("next", last_page)
+
+    def test_errors(self):
+        """Test error payloads for missing data and quota."""
+        self.assertEqual(self.api.handle("/album/-1", {})["error"]["code"], 800)
+        self.api.add_error("/track/100101")
+        self.assertIn("error", self.api.handle("/track/100101", {}))
+        self.api.quota = 1
+        self.assertNotIn("error", self.api.handle("/artist/1", {}))
+        self.assertEqual(self.api.handle("/artist/1", {})["error"]["code"], 4)
+
+    def test_search(self):
+        """Test searching the synthetic catalogue."""
+        page = self.api.handle("/search/album", {"q": ["album 200"]})
+        self.assertEqual([a["id"] for a in page["data"]], [2001, 2002])
+
+    def test_from_cassettes(self):
+        """Test fixtures loaded from recorded cassettes."""
+        api = MockDeezerAPI.from_cassettes(os.path.join(CASSETTES, "*.yaml"))
+        self.assertEqual(api.handle("/album/302127", {})["title"], "Discovery")
+        page = api.handle("/search", {"q": ["Soliloquy"]})
+        self.assertEqual(page["data"][0]["title"], "Too much")
+
+
+class TestMockDeezerServer(TestCase):
+    def setUp(self):
+        self.server = MockDeezerServer(MockDeezerAPI.synthetic(artists=5)).start()
+        self.addCleanup(self.server.stop)
+
+    def make_client(self, **kwargs):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            return deezer.Client(host=self.server.host, use_ssl=False, **kwargs)
+
+    def test_client_requests(self):
+        """Test the client against the server through requests."""
+        client = self.make_client()
+        artist = client.get_artist(1)
+        self.assertEqual(artist.name, "Artist 1")
+        self.assertEqual(len(list(artist.iter_albums(limit=3))), 4)
+        with self.assertRaises(ValueError):
+            client.get_track(-1)
+
+    def test_client_urllib3(self):
+        """Test the client against the server through urllib3."""
+        client = self.make_client(transport=Urllib3Transport())
+        tracks = client.search("track 10010", relation="track")
+        self.assertEqual([t.id for t in tracks], list(range(100101, 100110)))
+        self.assertIsInstance(client.get_chart(), deezer.resources.Chart)
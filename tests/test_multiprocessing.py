@@ -0,0 +1,121 @@
+import copy
+import multiprocessing
+import pickle
+import warnings
+from unittest import TestCase, skipUnless
+
+import deezer
+from deezer import client as client_module
+from deezer.mockserver import MockDeezerAPI, MockDeezerServer
+
+HAS_FORK = "fork" in multiprocessing.get_all_start_methods()
+
+
+class TestPickle(TestCase):
+    def setUp(self):
+        self.client = deezer.Client(access_token="token", headers={"X-Test": "1"})
+        self.album = self.client._process_json(
+            {"id": 1, "type": "album", "title": "Album"}
+        )
+        self.tracks = self.client._process_json(
+            {"data": [{"id": i, "type": "track", "title": "T"} for i in range(3)]},
+            parent=self.album,
+        )
+
+    def test_round_trip(self):
+        """Test that resources are reattached to their client when loaded."""
+        tracks = pickle.loads(pickle.dumps(self.tracks))
+        self.assertEqual(
+            [t.asdict() for t in tracks], [t.asdict() for t in self.tracks]
+        )
+        self.assertIs(tracks[0].client, self.client)
+        self.assertIs(tracks[0].album, tracks[1].album)
+        self.assertIsInstance(tracks[0].album, deezer.Album)
+
+    def test_copy(self):
+        """Test that a copy of the client is a separate client."""
+        self.client.add_hook("before_request", print)
+        for copy_function in (copy.copy, copy.deepcopy):
+            client = copy_function(self.client)
+            self.assertIsNot(client, self.client)
+            self.assertIsNot(client._key, self.client._key)
+            self.assertEqual(client.access_token, "token")
+            self.assertEqual(client.headers, {"X-Test": "1"})
+            self.assertIs(client.transport, self.client.transport)
+            client.headers["X-Test"] = "2"
+            client.remove_hook("before_request", print)
+            self.assertEqual(self.client.headers, {"X-Test": "1"})
+            self.assertEqual(self.client._hooks, {"before_request": [print]})
+
+    def test_deepcopy_resources(self):
+        """Test that deep copied resources share the copy of their client."""
+        tracks = copy.deepcopy(self.tracks)
+        self.assertIsNot(tracks[0].client, self.client)
+        self.assertIs(tracks[1].client, tracks[0].client)
+
+    def test_compact(self):
+        """Test that the connection state of the client isn't pickled."""
+        data = pickle.dumps(self.album)
+        self.assertNotIn(b"requests", data)
+        self.assertNotIn(b"Session", data)
+        self.assertLess(len(data), 500)
+
+    def test_other_process(self):
+        """Test that a client is rebuilt where the original doesn't exist."""
+        data = pickle.dumps(self.tracks)
+        del client_module._clients[self.client._key]
+        tracks = pickle.loads(data)
+        client = tracks[0].client
+        self.assertIsNot(client, self.client)
+        self.assertIsNone(client.access_token)
+        self.assertEqual(client.headers, {"X-Test": "1"})
+        self.assertIs(tracks[1].client, client)
+        self.assertIs(pickle.loads(data)[0].client, client)
+
+    def test_credentials_not_pickled(self):
+        """Test that the secrets are left out of the pickles by default."""
+        self.client.app_secret = "secret"  # nosec
+        data = pickle.dumps(self.album)
+        self.assertNotIn(b"token", data)
+        self.assertNotIn(b"secret", data)
+
+    def test_pickle_credentials(self):
+        """Test that the secrets are pickled when opted in."""
+        self.client.pickle_credentials = True
+        data = pickle.dumps(self.tracks)
+        del client_module._clients[self.client._key]
+        client = pickle.loads(data)[0].client
+        self.assertIsNot(client, self.client)
+        self.assertEqual(client.access_token, "token")
+
+
+def _get_in_child(client):
+    adapter = client.session.get_adapter("http://")
+    inherited = len(adapter.poolmanager.pools)
+    return inherited, client.get_album(1001)
+
+
+@skipUnless(HAS_FORK, "fork isn't available")
+class TestFork(TestCase):
+    def setUp(self):
+        self.server = MockDeezerServer(MockDeezerAPI.synthetic(artists=2)).start()
+        self.addCleanup(self.server.stop)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            self.client = deezer.Client(host=self.server.host, use_ssl=False)
+
+    def test_child_drops_connections(self):
+        """Test that forked children open their own connections."""
+        self.client.get_artist(1)
+        adapter = self.client.session.get_adapter("http://")
+        self.assertEqual(len(adapter.poolmanager.pools), 1)
+        context = multiprocessing.get_context("fork")
+        with context.Pool(2, maxtasksperchild=1) as pool:
+            results = pool.map(_get_in_child, [self.client] * 4)
+        for inherited, album in results:
+            self.assertEqual(inherited, 0)
+            self.assertEqual(album.title, "Album 1001")
+            self.assertIs(album.client, self.client)
+        # the parent keeps its connection
+        self.assertEqual(self.client.get_artist(2).id, 2)
+        self.assertEqual(len(adapter.poolmanager.pools), 1)
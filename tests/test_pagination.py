@@ -0,0 +1,114 @@
+from unittest import TestCase, mock
+
+import deezer
+
+from .base import paginated_api
+
+
+class TestCursor(TestCase):
+    def setUp(self):
+        self.client = deezer.Client()
+        self.user = deezer.User(self.client, {"id": 5, "type": "user"})
+        self.items = [
+            {"id": i, "type": "track", "title": "Track {}".format(i)} for i in range(7)
+        ]
+
+    def test_cursor_follows_iteration(self):
+        """Test that the cursor points after the last yielded item."""
+        cursor = deezer.Cursor.from_resource(self.user, "tracks", limit=3)
+        get = paginated_api(self.items)
+        with mock.patch.object(self.client.session, "get", get):
+            tracks = self.user.iter_tracks(cursor=cursor)
+            self.assertEqual([next(tracks).id for _ in range(4)], [0, 1, 2, 3])
+        self.assertEqual(cursor.index, 4)
+        self.assertFalse(cursor.exhausted)
+        self.assertIn("limit=3", get.urls[0])
+
+    def test_resume_from_saved_cursor(self):
+        """Test that resuming costs one page request per remaining page."""
+        cursor = deezer.Cursor("user", 5, "tracks", index=4, kwargs={"limit": 3})
+        saved = deezer.Cursor.from_json(cursor.to_json())
+        self.assertEqual(saved, cursor)
+        get = paginated_api(self.items)
+        with mock.patch.object(self.client.session, "get", get):
+            tracks = list(self.client.resume(saved))
+        self.assertEqual([t.id for t in tracks], [4, 5, 6])
+        self.assertEqual(get.calls, [4, 7])
+        self.assertTrue(get.urls[0].startswith("https://api.deezer.com/user/5/tracks"))
+        self.assertEqual(tracks[0].user.id, 5)
+        self.assertEqual(saved.index, 7)
+        self.assertTrue(saved.exhausted)
+
+    def test_cursor_relation_mismatch(self):
+        """Test that a cursor can't be used on another relation."""
+        cursor = deezer.Cursor.from_resource(self.user, "albums")
+        with self.assertRaises(ValueError):
+            next(self.user.iter_tracks(cursor=cursor))
+
+    def test_resume_invalid_type(self):
+        """Test that resuming a cursor with an unknown type fails."""
+        with self.assertRaises(TypeError):
+            self.client.resume(deezer.Cursor("foo", 1, "tracks"))
+
+
+class TestIncrementalSync(TestCase):
+    def setUp(self):
+        self.client = deezer.Client()
+        self.user = deezer.User(self.client, {"id": 5, "type": "user"})
+
+    def favorites(self, ids):
+        return [
+            {"id": i, "type": "track", "title": "Track {}".format(i), "time_add": i}
+            for i in sorted(ids, reverse=True)
+        ]
+
+    def test_first_sync_gets_everything(self):
+        """Test that syncing without a mark iterates the whole relation."""
+        get = paginated_api(self.favorites(range(5)))
+        with mock.patch.object(self.client.session, "get", get):
+            tracks, mark = self.user.sync_tracks(limit=2)
+        self.assertEqual([t.id for t in tracks], [4, 3, 2, 1, 0])
+        self.assertEqual(mark.ids[0], 4)
+        self.assertEqual(mark.time_add, 4)
+
+    def test_sync_stops_at_known_items(self):
+        """Test that only the new items are fetched and returned."""
+        mark = deezer.HighWaterMark.from_dict({"ids": [49], "time_add": 49})
+        get = paginated_api(self.favorites(range(52)))
+        with mock.patch.object(self.client.session, "get", get):
+            tracks, new_mark = self.user.sync_tracks(mark, limit=2)
+        self.assertEqual([t.id for t in tracks], [51, 50])
+        self.assertEqual(get.calls, [0, 2])
+        self.assertEqual(new_mark.ids[:3], (51, 50, 49))
+        self.assertEqual(new_mark.time_add, 51)
+
+    def test_sync_readded_item(self):
+        """Test that an item added again doesn't hide the ones added before it."""
+        items = [
+            {"id": i, "type": "track", "title": "T", "time_add": time_add}
+            for i, time_add in [(3, 30), (2, 20), (1, 10)]
+        ]
+        get = paginated_api(items)
+        with mock.patch.object(self.client.session, "get", get):
+            _, mark = self.user.sync_tracks()
+        # track 4 is added, then track 2 is added again
+        items[1:2] = []
+        items[:0] = [
+            {"id": 2, "type": "track", "title": "T", "time_add": 50},
+            {"id": 4, "type": "track", "title": "T", "time_add": 40},
+        ]
+        get = paginated_api(items)
+        with mock.patch.object(self.client.session, "get", get):
+            tracks, new_mark = self.user.sync_tracks(mark)
+        self.assertEqual([t.id for t in tracks], [2, 4])
+        self.assertEqual(new_mark.time_add, 50)
+
+    def test_sync_without_time_add(self):
+        """Test that ids are enough when a known item was removed."""
+        mark = deezer.HighWaterMark(ids=[3, 2])
+        items = [{"id": i, "type": "album", "title": "A"} for i in (5, 4, 2, 1)]
+        get = paginated_api(items)
+        with mock.patch.object(self.client.session, "get", get):
+            albums, new_mark = self.user.sync_albums(mark)
+        self.assertEqual([a.id for a in albums], [5, 4])
+        self.assertEqual(new_mark, deezer.HighWaterMark(ids=[5, 4, 3, 2]))
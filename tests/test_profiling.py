@@ -0,0 +1,66 @@
+import io
+from unittest import TestCase, mock
+
+import deezer
+from deezer.profiling import PHASES
+
+from .base import FakeResponse
+
+ALBUM = {
+    "id": 1,
+    "type": "album",
+    "title": "Album",
+    "artist": {"id": 2, "type": "artist", "name": "Artist"},
+    "tracks": {"data": [{"id": i, "type": "track", "title": "T"} for i in range(3)]},
+}
+
+
+class TestProfile(TestCase):
+    def setUp(self):
+        self.client = deezer.Client()
+
+    def test_profile_counts(self):
+        """Test that requests, bytes and resources are accounted."""
+        responses = [FakeResponse(ALBUM), FakeResponse(ALBUM["tracks"])]
+        with mock.patch.object(self.client.session, "get", side_effect=responses):
+            with self.client.profile() as profile:
+                album = self.client.get_album(1)
+                album.get_tracks()
+        self.assertIsInstance(album, deezer.Album)
+        values = profile.asdict()
+        self.assertEqual(values["requests"], 2)
+        self.assertEqual(
+            values["bytes"], sum(len(response.content) for response in responses)
+        )
+        # album, artist and 3 tracks built by the first call, 3 tracks by the second
+        self.assertEqual(values["resources"], 8)
+        self.assertEqual(set(values["times"]), set(PHASES))
+        self.assertGreater(values["times"]["build"], 0)
+        self.assertGreater(values["wall_time"], 0)
+
+    def test_profile_restores_client(self):
+        """Test that the client is left as it was, even on errors."""
+        with self.assertRaises(OSError):
+            with mock.patch.object(self.client.session, "get", side_effect=OSError):
+                with self.client.profile():
+                    self.client.get_album(1)
+        self.assertNotIn("_process_json", vars(self.client))
+        self.assertNotIn("objects_types", vars(self.client))
+        self.assertEqual(self.client._hooks, {})
+
+    def test_profile_nested(self):
+        with self.client.profile():
+            with self.assertRaises(ValueError):
+                with self.client.profile():
+                    pass
+
+    def test_report(self):
+        stream = io.StringIO()
+        response = FakeResponse(ALBUM)
+        with mock.patch.object(self.client.session, "get", return_value=response):
+            with self.client.profile(stream):
+                self.client.get_album(1)
+        report = stream.getvalue()
+        self.assertTrue(report.startswith("1 requests"))
+        for phase in PHASES:
+            self.assertIn(phase, report)
@@ -0,0 +1,95 @@
+import threading
+import time
+import warnings
+from unittest import TestCase, mock
+
+import deezer
+from deezer.mockserver import MockDeezerAPI, MockDeezerServer
+from deezer.quota import DistributedRateLimiter, RedisQuotaBackend
+from deezer.quotaserver import QuotaServer
+
+
+class TestRedisQuotaBackend(TestCase):
+    def setUp(self):
+        self.server = QuotaServer().start()
+        self.addCleanup(self.server.stop)
+        self.backend = RedisQuotaBackend(*self.server.address, db=1, password="pw")
+        self.addCleanup(self.backend.close)
+
+    def test_execute(self):
+        replies = self.backend.execute(
+            ("ZADD", "key", 2, "b", 1, "a"),
+            ("ZRANGE", "key", 0, -1, "WITHSCORES"),
+            ("ZCARD", "missing"),
+        )
+        self.assertEqual(replies, [2, ["a", "1", "b", "2"], 0])
+        with self.assertRaises(ValueError):
+            self.backend.execute(("UNKNOWN",))
+        # the connection is still usable after an error
+        self.assertEqual(self.backend.execute(("PING",)), ["PONG"])
+
+    def test_execute_invalid_reply(self):
+        """Test that the connection is closed after an unreadable reply."""
+        with mock.patch(
+            "deezer.quota.read_reply", side_effect=ValueError("Invalid reply")
+        ):
+            with self.assertRaises(ValueError):
+                self.backend.execute(("ZADD", "key", 1, "a"))
+        self.assertIsNone(self.backend._socket)
+        # the reply left unread isn't taken for the reply of the next command
+        self.assertEqual(self.backend.execute(("PING",)), ["PONG"])
+
+    def test_try_acquire(self):
+        """Test that the window is limited and slides over time."""
+        limiter = DistributedRateLimiter(self.backend, max_requests=2, period=0.1)
+        self.assertIsNone(limiter.try_acquire())
+        self.assertIsNone(limiter.try_acquire())
+        wait = limiter.try_acquire()
+        self.assertGreater(wait, 0)
+        self.assertLessEqual(wait, 0.1)
+        # the rejected request isn't counted
+        self.assertEqual(len(self.server.store.sorted_sets["deezer:quota"]), 2)
+        time.sleep(wait)
+        self.assertIsNone(limiter.try_acquire())
+
+    def test_nodes_share_window(self):
+        """Test that concurrent nodes never exceed the limit together."""
+        times = []
+
+        def node():
+            backend = RedisQuotaBackend(*self.server.address)
+            limiter = DistributedRateLimiter(backend, max_requests=4, period=0.2)
+            for _ in range(4):
+                limiter.acquire()
+                times.append(time.time())
+            backend.close()
+
+        threads = [threading.Thread(target=node) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        times.sort()
+        self.assertEqual(len(times), 12)
+        for first, fifth in zip(times, times[4:]):
+            self.assertGreaterEqual(fifth - first, 0.19)
+
+    def test_clients_under_quota(self):
+        """Test that clients sharing a window don't get quota errors."""
+        api = MockDeezerAPI.synthetic(artists=4, quota=5, period=0.4)
+        with MockDeezerServer(api) as deezer_server:
+            clients = []
+            for _ in range(2):
+                backend = RedisQuotaBackend(*self.server.address)
+                self.addCleanup(backend.close)
+                limiter = DistributedRateLimiter(backend, max_requests=5, period=0.5)
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore")
+                    clients.append(
+                        deezer.Client(
+                            host=deezer_server.host, use_ssl=False, rate_limiter=limiter
+                        )
+                    )
+            for number in range(12):
+                artist = clients[number % 2].get_artist(number % 4 + 1)
+                self.assertEqual(artist.id, number % 4 + 1)
@@ -0,0 +1,158 @@
+import multiprocessing
+import threading
+import time
+from unittest import TestCase, mock
+
+import deezer
+from deezer.ratelimit import (
+    BACKGROUND,
+    INTERACTIVE,
+    PriorityRateLimiter,
+    RateLimiter,
+    SharedRateLimiter,
+)
+
+from .base import FakeResponse
+
+
+class TestRateLimiter(TestCase):
+    def test_try_acquire(self):
+        """Test that the window is limited and slides over time."""
+        limiter = deezer.RateLimiter(max_requests=2, period=0.05)
+        self.assertIsNone(limiter.try_acquire())
+        self.assertIsNone(limiter.try_acquire())
+        wait = limiter.try_acquire()
+        self.assertGreater(wait, 0)
+        self.assertLessEqual(wait, 0.05)
+        time.sleep(wait)
+        self.assertIsNone(limiter.try_acquire())
+
+    def test_client_waits_for_limiter(self):
+        """Test that the client paces its requests."""
+        limiter = deezer.RateLimiter(max_requests=2, period=0.1)
+        client = deezer.Client(rate_limiter=limiter)
+        response = FakeResponse({"id": 1, "type": "track", "title": "T"})
+        with mock.patch.object(client.session, "get", return_value=response):
+            start = time.monotonic()
+            for _ in range(3):
+                client.get_track(1)
+            self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+
+# the limiter of the worker processes
+_worker_limiter = []
+
+
+def _init_worker(limiter):
+    _worker_limiter.append(limiter)
+
+
+def _acquire_times(count):
+    times = []
+    for _ in range(count):
+        _worker_limiter[0].acquire()
+        times.append(time.monotonic())
+    return times
+
+
+class TestSharedRateLimiter(TestCase):
+    def test_try_acquire(self):
+        limiter = SharedRateLimiter(max_requests=2, period=0.05)
+        self.assertIsNone(limiter.try_acquire())
+        self.assertIsNone(limiter.try_acquire())
+        wait = limiter.try_acquire()
+        self.assertGreater(wait, 0)
+        self.assertLessEqual(wait, 0.05)
+        time.sleep(wait)
+        self.assertIsNone(limiter.try_acquire())
+
+    def test_shared_between_processes(self):
+        """Test that processes draw from the same window."""
+        limiter = SharedRateLimiter(max_requests=3, period=0.2)
+        with multiprocessing.Pool(
+            2, initializer=_init_worker, initargs=(limiter,)
+        ) as pool:
+            times = sorted(sum(pool.map(_acquire_times, [3, 3]), []))
+        # no more than 3 requests in any window
+        for first, fourth in zip(times, times[3:]):
+            self.assertGreaterEqual(fourth - first, 0.2)
+
+
+class TestPriorityRateLimiter(TestCase):
+    def grants(self, limiter, lanes, count):
+        """Acquire in a loop from threads of each lane, return the lanes served."""
+        served = []
+        lock = threading.Lock()
+        barrier = threading.Barrier(len(lanes))
+
+        def run(lane):
+            barrier.wait()
+            while True:
+                limiter.acquire(lane)
+                with lock:
+                    if len(served) >= count:
+                        return
+                    served.append(lane)
+
+        threads = [threading.Thread(target=run, args=(lane,)) for lane in lanes]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return served
+
+    def test_weighted_share(self):
+        """Test that waiting lanes share the slots by weight."""
+        limiter = PriorityRateLimiter(RateLimiter(max_requests=20, period=0.1))
+        lanes = [INTERACTIVE] * 3 + [BACKGROUND] * 3
+        # the first 20 slots are free, and go to whoever comes first
+        served = self.grants(limiter, lanes, 120)[20:]
+        interactive = served.count(INTERACTIVE)
+        self.assertGreaterEqual(interactive, 80)
+        self.assertGreaterEqual(len(served) - interactive, 5)
+
+    def test_idle_lane(self):
+        """Test that a lane alone gets the whole budget."""
+        limiter = PriorityRateLimiter(RateLimiter(max_requests=20, period=10))
+        start = time.monotonic()
+        served = self.grants(limiter, [BACKGROUND] * 2, 18)
+        self.assertEqual(len(served), 18)
+        self.assertLess(time.monotonic() - start, 1)
+
+    def test_try_acquire(self):
+        limiter = PriorityRateLimiter(RateLimiter(max_requests=1, period=0.05))
+        lane = limiter.lane(BACKGROUND)
+        self.assertIsNone(lane.try_acquire())
+        self.assertGreater(lane.try_acquire(), 0)
+        with self.assertRaises(ValueError):
+            limiter.lane("unknown")
+        with self.assertRaises(ValueError):
+            PriorityRateLimiter(weights={INTERACTIVE: 0})
+
+    def test_try_acquire_not_weighted(self):
+        """Test that try_acquire is first come first served, after acquire."""
+        limiter = PriorityRateLimiter(RateLimiter(max_requests=1, period=0.05))
+        self.assertIsNone(limiter.try_acquire(INTERACTIVE))
+        wait = limiter.try_acquire(BACKGROUND)
+        self.assertGreater(wait, 0)
+        time.sleep(wait)
+        # the interactive lane has the larger weight, but comes second
+        self.assertIsNone(limiter.try_acquire(BACKGROUND))
+        self.assertGreater(limiter.try_acquire(INTERACTIVE), 0)
+        # a request waiting in acquire goes first, whatever its lane
+        thread = threading.Thread(target=limiter.acquire, args=(BACKGROUND,))
+        thread.start()
+        while not limiter._waiting:
+            time.sleep(0.001)
+        self.assertGreater(limiter.try_acquire(INTERACTIVE), 0)
+        thread.join()
+
+    def test_client_lane(self):
+        limiter = PriorityRateLimiter(RateLimiter(max_requests=2, period=0.1))
+        client = deezer.Client(rate_limiter=limiter.lane(BACKGROUND))
+        response = FakeResponse({"id": 1, "type": "track", "title": "T"})
+        with mock.patch.object(client.session, "get", return_value=response):
+            start = time.monotonic()
+            for _ in range(3):
+                client.get_track(1)
+            self.assertGreaterEqual(time.monotonic() - start, 0.09)
@@ -0,0 +1,323 @@
+import threading
+import time
+from unittest import TestCase, mock
+
+import deezer
+from deezer.cache import ObjectCache
+from deezer.ratelimit import RateLimiter
+from deezer.resilience import CLOSED, OPEN, CircuitBreaker, CircuitOpenError, Hedging
+
+from .base import FakeResponse
+
+ALBUM = {"id": 1, "type": "album", "title": "Album"}
+QUOTA = {"error": {"type": "Exception", "message": "Quota", "code": 4}}
+
+
+class TestObjectCache(TestCase):
+    def setUp(self):
+        self.cache = ObjectCache(ttl=0.05, max_stale=10)
+        self.client = deezer.Client(object_cache=self.cache)
+
+    def test_fresh_hit(self):
+        """Test that cached payloads are served without request."""
+        hits = []
+        self.client.add_hook("on_cache_hit", hits.append)
+        response = FakeResponse(ALBUM)
+        with mock.patch.object(
+            self.client.session, "get", return_value=response
+        ) as get:
+            first = self.client.get_album(1)
+            second = self.client.get_album(1)
+        self.assertEqual(get.call_count, 1)
+        self.assertIsNot(first, second)
+        self.assertEqual(second.title, "Album")
+        self.assertEqual(hits[0]["cache"], "object")
+
+    def test_len(self):
+        """Test that stale payloads are counted until they expire."""
+        with mock.patch("deezer.cache.time.monotonic") as monotonic:
+            monotonic.return_value = 100.0
+            self.cache.set("url", ALBUM)
+            monotonic.return_value = 105.0
+            self.assertEqual(len(self.cache), 1)
+            monotonic.return_value = 111.0
+            self.assertEqual(len(self.cache), 0)
+
+    def test_stale_refreshed(self):
+        response = FakeResponse(ALBUM)
+        with mock.patch.object(
+            self.client.session, "get", return_value=response
+        ) as get:
+            self.client.get_album(1)
+            time.sleep(0.06)
+            self.assertTrue(self.cache.lookup(self.client.object_url("album", 1)).stale)
+            self.client.get_album(1)
+        self.assertEqual(get.call_count, 2)
+
+    def test_stale_on_failure(self):
+        """Test that a stale payload is served when the API fails."""
+        with mock.patch.object(
+            self.client.session, "get", return_value=FakeResponse(ALBUM)
+        ):
+            self.client.get_album(1)
+        time.sleep(0.06)
+        for side_effect in (OSError, [FakeResponse(QUOTA)]):
+            with mock.patch.object(self.client.session, "get", side_effect=side_effect):
+                self.assertEqual(self.client.get_album(1).title, "Album")
+        with mock.patch.object(self.client.session, "get", side_effect=OSError):
+            with self.assertRaises(OSError):
+                self.client.get_album(2)
+
+    def test_errors_not_cached(self):
+        error = FakeResponse({"error": {"code": 800}})
+        with mock.patch.object(self.client.session, "get", return_value=error):
+            with self.assertRaises(ValueError):
+                self.client.get_album(1)
+        self.assertEqual(len(self.cache), 0)
+
+
+class TestCircuitBreaker(TestCase):
+    def setUp(self):
+        self.breaker = CircuitBreaker(failure_threshold=2, recovery_time=0.05)
+        self.client = deezer.Client(circuit_breaker=self.breaker)
+
+    def test_open_and_recover(self):
+        """Test that the circuit fails fast once open, and closes again."""
+        responses = [FakeResponse(QUOTA), OSError()]
+        with mock.patch.object(self.client.session, "get", side_effect=responses):
+            with self.assertRaises(ValueError):
+                self.client.get_album(1)
+            with self.assertRaises(OSError):
+                self.client.get_album(1)
+        self.assertEqual(self.breaker.state, OPEN)
+        with mock.patch.object(self.client.session, "get") as get:
+            with self.assertRaises(CircuitOpenError):
+                self.client.get_album(1)
+        self.assertFalse(get.called)
+        time.sleep(0.06)
+        response = FakeResponse(ALBUM)
+        with mock.patch.object(self.client.session, "get", return_value=response):
+            self.assertEqual(self.client.get_album(1).id, 1)
+            self.client.get_album(1)
+        self.assertEqual(self.breaker.failures, 0)
+
+    def test_failed_trial(self):
+        for _ in range(2):
+            self.breaker.record_failure()
+        time.sleep(0.06)
+        self.breaker.before_request()
+        # a single trial request at a time
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_request()
+        self.breaker.record_failure()
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_request()
+
+    def test_rate_limiter_error_during_trial(self):
+        """Test that a failing rate limiter doesn't leave the circuit half open."""
+        for _ in range(2):
+            self.breaker.record_failure()
+        time.sleep(0.06)
+        self.client.rate_limiter = mock.Mock()
+        self.client.rate_limiter.acquire.side_effect = RuntimeError("timed out")
+        with self.assertRaises(RuntimeError):
+            self.client.get_album(1)
+        self.assertEqual(self.breaker.state, OPEN)
+        self.client.rate_limiter = None
+        response = FakeResponse(ALBUM)
+        with mock.patch.object(self.client.session, "get", return_value=response):
+            self.assertEqual(self.client.get_album(1).id, 1)
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_serves_stale_while_open(self):
+        cache = ObjectCache(ttl=0, max_stale=10)
+        self.client.object_cache = cache
+        cache.set(self.client.object_url("album", 1), ALBUM)
+        for _ in range(2):
+            self.breaker.record_failure()
+        with mock.patch.object(self.client.session, "get") as get:
+            self.assertEqual(self.client.get_album(1).title, "Album")
+        self.assertFalse(get.called)
+
+
+class TestHedging(TestCase):
+    def setUp(self):
+        self.client = deezer.Client(thread_safe=True, hedging=Hedging(delay=0.05))
+        self.addCleanup(self.client.hedging.shutdown)
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def slow_first(self, url, **kwargs):
+        with self.lock:
+            self.calls += 1
+            number = self.calls
+        if number == 1:
+            time.sleep(0.5)
+        return FakeResponse(dict(ALBUM, title="Album {}".format(number)))
+
+    def test_hedged(self):
+        """Test that a duplicate answers for a slow request."""
+        with mock.patch.object(self.client.transport, "get", self.slow_first):
+            start = time.monotonic()
+            album = self.client.get_album(1)
+            self.assertLess(time.monotonic() - start, 0.4)
+        self.assertEqual(album.title, "Album 2")
+        self.assertEqual(self.client.hedging.hedged, 1)
+
+    def test_duplicate_hooks(self):
+        """Test that the duplicate goes through the hooks."""
+        before, after = [], []
+        self.client.add_hook("before_request", before.append)
+        self.client.add_hook("after_response", after.append)
+        with mock.patch.object(self.client.transport, "get", self.slow_first):
+            self.client.get_album(1)
+            self.assertEqual(len(before), 2)
+            self.assertEqual([info.get("hedge") for info in before], [None, True])
+            # the slow request completes later
+            deadline = time.monotonic() + 2
+            while len(after) < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+        self.assertEqual(len(after), 2)
+
+    def test_not_thread_safe(self):
+        """Test that requests over a transport which isn't thread safe aren't hedged."""
+        threads = set()
+        client = deezer.Client(hedging=self.client.hedging)
+
+        def get(url, **kwargs):
+            threads.add(threading.current_thread())
+            return self.slow_first(url, **kwargs)
+
+        with mock.patch.object(client.transport, "get", get):
+            with self.assertWarns(RuntimeWarning):
+                album = client.get_album(1)
+        self.assertEqual(album.title, "Album 1")
+        self.assertEqual(threads, {threading.current_thread()})
+        self.assertEqual(client.hedging.hedged, 0)
+
+    def test_busy_pool_not_hedged(self):
+        """Test that requests aren't hedged for waiting for a thread."""
+        hedging = Hedging(delay=0.05, max_workers=1)
+        self.addCleanup(hedging.shutdown)
+        self.client.hedging = hedging
+        release = threading.Event()
+        busy = threading.Thread(target=hedging.send, args=(release.wait,))
+        busy.start()
+        self.addCleanup(busy.join)
+        self.addCleanup(release.set)
+        time.sleep(0.1)
+
+        def get(url, **kwargs):
+            with self.lock:
+                self.calls += 1
+            time.sleep(0.1)
+            return FakeResponse(ALBUM)
+
+        with mock.patch.object(self.client.transport, "get", get):
+            self.assertEqual(self.client.get_album(1).id, 1)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(hedging.hedged, 0)
+
+    def test_no_hedge_without_budget(self):
+        limiter = RateLimiter(max_requests=1, period=10)
+        self.client.rate_limiter = limiter
+        with mock.patch.object(self.client.transport, "get", self.slow_first):
+            album = self.client.get_album(1)
+        self.assertEqual(album.title, "Album 1")
+        self.assertEqual(self.client.hedging.hedged, 0)
+
+    def test_failed_duplicate(self):
+        """Test that the response is used if the duplicate fails."""
+
+        def get(url, **kwargs):
+            with self.lock:
+                self.calls += 1
+                number = self.calls
+            if number == 2:
+                raise OSError
+            time.sleep(0.1)
+            return FakeResponse(ALBUM)
+
+        with mock.patch.object(self.client.transport, "get", get):
+            self.assertEqual(self.client.get_album(1).title, "Album")
+        self.assertEqual(self.calls, 2)
+
+    def test_quantile_delay(self):
+        hedging = Hedging(min_samples=10)
+        self.assertIsNone(hedging.current_delay())
+        for latency in range(20):
+            hedging._latencies.append(latency / 100)
+        self.assertEqual(hedging.current_delay(), 0.19)
+
+
+class TestStaleWhileRevalidate(TestCase):
+    def setUp(self):
+        self.cache = ObjectCache(ttl=0.05, revalidate=10, max_refreshes=2)
+        self.addCleanup(self.cache.shutdown)
+        self.client = deezer.Client(thread_safe=True, object_cache=self.cache)
+        self.url = self.client.object_url("album", 1)
+        self.cache.set(self.url, ALBUM)
+        time.sleep(0.06)
+        self.release = threading.Event()
+        self.calls = []
+
+    def wait_refreshed(self):
+        deadline = time.monotonic() + 5
+        while self.cache._refreshing and time.monotonic() < deadline:
+            time.sleep(0.001)
+
+    def slow_get(self, url, **kwargs):
+        self.calls.append(url)
+        self.release.wait(5)
+        return FakeResponse(dict(ALBUM, title="New"))
+
+    def test_served_while_refreshed(self):
+        """Test that stale payloads are served right away and refreshed once."""
+        hits = []
+        self.client.add_hook("on_cache_hit", hits.append)
+        with mock.patch.object(self.client.transport, "get", self.slow_get):
+            for _ in range(3):
+                self.assertEqual(self.client.get_album(1).title, "Album")
+            self.release.set()
+            self.wait_refreshed()
+        self.assertEqual(len(self.calls), 1)
+        self.assertTrue(hits[0]["stale"])
+        cached = self.cache.lookup(self.url)
+        self.assertEqual(cached.value["title"], "New")
+        self.assertLess(cached.age, 0.05)
+
+    def test_not_thread_safe(self):
+        """Test that stale payloads are waited for over a transport which isn't thread safe."""
+        client = deezer.Client(object_cache=self.cache)
+        self.release.set()
+        with mock.patch.object(client.transport, "get", self.slow_get):
+            with self.assertWarns(RuntimeWarning):
+                self.assertEqual(client.get_album(1).title, "New")
+        self.assertFalse(self.cache._refreshing)
+        self.assertEqual(len(self.calls), 1)
+
+    def test_max_refreshes(self):
+        for album_id in (2, 3):
+            self.cache.set(self.client.object_url("album", album_id), ALBUM)
+        time.sleep(0.06)
+        with mock.patch.object(self.client.transport, "get", self.slow_get):
+            for album_id in (1, 2, 3):
+                self.client.get_album(album_id)
+            time.sleep(0.05)
+            self.release.set()
+            self.wait_refreshed()
+        self.assertEqual(len(self.calls), 2)
+
+    def test_too_stale(self):
+        """Test that payloads stale for longer than revalidate are waited for."""
+        self.cache.revalidate = 0
+        self.release.set()
+        with mock.patch.object(self.client.transport, "get", self.slow_get):
+            self.assertEqual(self.client.get_album(1).title, "New")
+
+    def test_failed_refresh(self):
+        error = FakeResponse({"error": {"code": 800}})
+        with mock.patch.object(self.client.transport, "get", return_value=error):
+            self.client.get_album(1)
+            self.wait_refreshed()
+        self.assertEqual(self.cache.lookup(self.url).value, ALBUM)
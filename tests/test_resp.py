@@ -0,0 +1,38 @@
+import io
+from unittest import TestCase
+
+from deezer.resp import (
+    SimpleString,
+    encode_command,
+    encode_reply,
+    raise_errors,
+    read_reply,
+)
+
+
+class TestProtocol(TestCase):
+    def test_round_trip(self):
+        """Test that the replies read are the replies encoded."""
+        replies = [SimpleString("OK"), 3, "é", None, [1, ["a", "1.5"]], []]
+        stream = io.BytesIO(b"".join(map(encode_reply, replies)))
+        self.assertEqual([read_reply(stream) for _ in replies], replies)
+        self.assertIsInstance(read_reply(io.BytesIO(b"+OK\r\n")), SimpleString)
+
+    def test_command(self):
+        """Test that commands are read as lists of strings."""
+        stream = io.BytesIO(encode_command(("ZADD", "key", 1.5, b"member")))
+        self.assertEqual(read_reply(stream), ["ZADD", "key", "1.5", "member"])
+
+    def test_errors(self):
+        """Test that error replies are returned, and raised on demand."""
+        reply = read_reply(io.BytesIO(encode_reply(ValueError("ERR wrong"))))
+        self.assertIsInstance(reply, ValueError)
+        with self.assertRaisesRegex(ValueError, "ERR wrong"):
+            raise_errors([1, [2, reply]])
+        raise_errors([1, [2, None]])
+
+    def test_invalid(self):
+        with self.assertRaises(ConnectionError):
+            read_reply(io.BytesIO(b":1"))
+        with self.assertRaises(ValueError):
+            read_reply(io.BytesIO(b"?1\r\n"))
@@ -0,0 +1,164 @@
+import threading
+import warnings
+from unittest import TestCase, mock
+
+import deezer
+
+from .base import paginated_api
+
+
+def track(track_id):
+    return {"id": track_id, "type": "track", "title": "Track {}".format(track_id)}
+
+
+class TestIterSearch(TestCase):
+    def setUp(self):
+        self.client = deezer.Client()
+
+    def test_iter_search_all_pages(self):
+        """Test that all pages are fetched, up to the total."""
+        get = paginated_api([track(i) for i in range(10)])
+        with mock.patch.object(self.client.session, "get", get):
+            result = list(self.client.iter_search("Daft Punk", limit=3))
+        self.assertEqual([t.id for t in result], list(range(10)))
+        self.assertIsInstance(result[0], deezer.resources.Track)
+        self.assertEqual(sorted(get.calls), [0, 3, 6, 9])
+
+    def test_iter_search_deduplicates(self):
+        """Test that items repeated across page boundaries are dropped."""
+        items = [track(i) for i in [1, 2, 3, 3, 4, 5, 5, 6]]
+        get = paginated_api(items)
+        with mock.patch.object(self.client.session, "get", get):
+            result = list(self.client.iter_search("Daft Punk", limit=3))
+        self.assertEqual([t.id for t in result], [1, 2, 3, 4, 5, 6])
+
+    def test_iter_search_max_items(self):
+        """Test that iteration stops once the budget is reached."""
+        get = paginated_api([track(i) for i in range(100)])
+        with mock.patch.object(self.client.session, "get", get):
+            result = list(
+                self.client.iter_search("Daft Punk", limit=10, max_items=15, workers=2)
+            )
+        self.assertEqual([t.id for t in result], list(range(15)))
+        self.assertLessEqual(len(get.calls), 4)
+
+    def test_iter_search_not_thread_safe(self):
+        """Test that pages are fetched from the calling thread by a transport which isn't thread safe."""
+        get = paginated_api([track(i) for i in range(10)])
+        threads = set()
+
+        def recording_get(url, **kwargs):
+            threads.add(threading.get_ident())
+            return get(url, **kwargs)
+
+        with mock.patch.object(self.client.session, "get", recording_get):
+            with self.assertWarns(RuntimeWarning):
+                result = list(self.client.iter_search("Daft Punk", limit=3, workers=4))
+        self.assertEqual([t.id for t in result], list(range(10)))
+        self.assertEqual(threads, {threading.get_ident()})
+
+    def test_iter_search_default_workers(self):
+        """Test that the default workers don't warn on a default client."""
+        get = paginated_api([track(i) for i in range(10)])
+        with mock.patch.object(self.client.session, "get", get):
+            with warnings.catch_warnings():
+                warnings.simplefilter("error", RuntimeWarning)
+                result = list(self.client.iter_search("Daft Punk", limit=3))
+        self.assertEqual(len(result), 10)
+
+    def test_iter_search_thread_safe(self):
+        """Test that a thread safe transport fetches pages without warning."""
+        client = deezer.Client(thread_safe=True)
+        get = paginated_api([track(i) for i in range(10)])
+        with mock.patch.object(client.transport, "get", get):
+            with warnings.catch_warnings():
+                warnings.simplefilter("error", RuntimeWarning)
+                result = list(client.iter_search("Daft Punk", limit=3, workers=4))
+        self.assertEqual([t.id for t in result], list(range(10)))
+
+    def test_iter_advanced_search(self):
+        """Test advanced search iteration builds the sorted query."""
+        get = paginated_api([track(i) for i in range(4)])
+        with mock.patch.object(self.client.session, "get", get):
+            result = list(
+                self.client.iter_advanced_search(
+                    {"artist": "Daft Punk", "album": "Homework"}, limit=2
+                )
+            )
+        self.assertEqual(len(result), 4)
+        self.assertIn("q=album%3A%22Homework%22+artist%3A%22Daft+Punk%22", get.urls[0])
+        with self.assertRaises(TypeError):
+            self.client.iter_advanced_search("Daft Punk")
+
+
+class TestSearchCache(TestCase):
+    def setUp(self):
+        self.client = deezer.Client(search_cache=deezer.SearchCache())
+
+    def test_normalized_queries_share_entry(self):
+        """Test that case, whitespace and term order are ignored."""
+        get = paginated_api([track(1), track(2)])
+        with mock.patch.object(self.client.session, "get", get):
+            first = self.client.search("Daft Punk")
+            second = self.client.search("  punk   DAFT ")
+        self.assertEqual(len(get.calls), 1)
+        self.assertEqual([t.id for t in first], [t.id for t in second])
+
+    def test_prefix_served_from_broader_results(self):
+        """Test that narrower queries filter a complete cached result set."""
+        items = [
+            {"id": 1, "type": "track", "title": "Da Funk"},
+            {"id": 2, "type": "track", "title": "Daft Punk"},
+            {"id": 3, "type": "track", "title": "Daftendirekt"},
+        ]
+        get = paginated_api(items)
+        with mock.patch.object(self.client.session, "get", get):
+            self.client.search("daf")
+            daft = self.client.search("daft")
+            daft_p = self.client.search("daft p")
+        self.assertEqual(len(get.calls), 1)
+        self.assertEqual([t.id for t in daft], [2, 3])
+        self.assertEqual([t.id for t in daft_p], [2])
+
+    def test_iterated_results_narrowed(self):
+        """Test that a complete iteration fills the cache for narrower queries."""
+        items = [
+            {"id": i, "type": "track", "title": "Daft {}".format(i)} for i in range(4)
+        ] + [{"id": 4, "type": "track", "title": "Da Funk"}]
+        get = paginated_api(items)
+        with mock.patch.object(self.client.session, "get", get):
+            self.assertEqual(len(list(self.client.iter_search("da", limit=2))), 5)
+            daft = self.client.search("daft")
+            advanced = list(
+                self.client.iter_advanced_search({"artist": "Daft"}, limit=2)
+            )
+        self.assertEqual(len(get.calls), 6)
+        self.assertEqual([t.id for t in daft], [0, 1, 2, 3])
+        self.assertEqual(len(advanced), 5)
+
+    def test_incomplete_results_not_narrowed(self):
+        """Test that a partial result set is not used for narrower queries."""
+        get = paginated_api([track(i) for i in range(5)])
+        with mock.patch.object(self.client.session, "get", get):
+            self.client.search("track", limit=2)
+            self.client.search("track 1", limit=2)
+            self.client.search("track", index=2, limit=2)
+        self.assertEqual(get.calls, [0, 0, 2])
+
+    def test_advanced_search_cached(self):
+        """Test that advanced search terms are normalized."""
+        get = paginated_api([track(1)])
+        with mock.patch.object(self.client.session, "get", get):
+            self.client.advanced_search({"artist": "Daft Punk"})
+            self.client.advanced_search({"artist": "daft  punk"})
+        self.assertEqual(len(get.calls), 1)
+
+    def test_len_drops_expired(self):
+        """Test that expired queries aren't counted."""
+        cache = deezer.SearchCache(ttl=10)
+        with mock.patch("deezer.cache.time.monotonic") as monotonic:
+            monotonic.return_value = 100.0
+            cache.set(("daft",), None, 0, [], 0)
+            self.assertEqual(len(cache), 1)
+            monotonic.return_value = 110.0
+            self.assertEqual(len(cache), 0)
@@ -0,0 +1,57 @@
+import threading
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+import deezer
+from deezer.mockserver import MockDeezerAPI, MockDeezerServer
+from deezer.transports import ThreadSafeRequestsTransport
+
+WORKERS = 32
+CALLS = 1000
+
+
+class TestThreadSafeClient(TestCase):
+    def setUp(self):
+        self.api = MockDeezerAPI.synthetic(artists=20, albums=2, tracks=12)
+        self.server = MockDeezerServer(self.api).start()
+        self.addCleanup(self.server.stop)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            self.client = deezer.Client(
+                host=self.server.host, use_ssl=False, thread_safe=True
+            )
+        self.addCleanup(self.client.transport.close)
+
+    def test_sessions_per_thread(self):
+        """Test that threads get their own session over a shared adapter."""
+        transport = self.client.transport
+        self.assertIsInstance(transport, ThreadSafeRequestsTransport)
+        sessions = []
+        thread = threading.Thread(target=lambda: sessions.append(self.client.session))
+        thread.start()
+        thread.join()
+        self.assertIsNot(sessions[0], self.client.session)
+        self.assertIs(sessions[0].get_adapter("http://"), transport.adapter)
+        self.assertIs(self.client.session.get_adapter("http://"), transport.adapter)
+
+    def test_fan_out_stress(self):
+        """Test many concurrent calls of one client get the right results."""
+
+        def call(number):
+            artist_id = number % 20 + 1
+            album_id = artist_id * 1000 + number % 2 + 1
+            if number % 3 == 0:
+                return artist_id, self.client.get_artist(artist_id).id
+            index = number % 4 * 3
+            tracks = self.client.get_object(
+                "album", album_id, "tracks", index=index, limit=3
+            )
+            expected = [album_id * 100 + index + i for i in range(1, 4)]
+            return expected, [track.id for track in tracks]
+
+        with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+            results = list(executor.map(call, range(CALLS)))
+        for expected, actual in results:
+            self.assertEqual(actual, expected)
+        self.assertEqual(self.api.requests, CALLS)
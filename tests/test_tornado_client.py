@@ -1,9 +1,16 @@
+from unittest import mock
+
 import tornado.gen
 import tornado.ioloop
 import vcr_unittest
 
-from deezer import Album
+from deezer import Album, SearchCache
+from deezer.cache import ObjectCache
+from deezer.concurrency import AdaptiveConcurrencyLimiter
 from deezer.contrib.tornado import AsyncClient
+from deezer.quota import DistributedRateLimiter, RedisQuotaBackend
+from deezer.ratelimit import BACKGROUND, PriorityRateLimiter
+from deezer.resilience import CircuitBreaker, Hedging
 
 
 class TestAsyncClient(vcr_unittest.VCRTestCase):
@@ -20,3 +27,48 @@ class TestAsyncClient(vcr_unittest.VCRTestCase):
             self.assertTrue(tracks[0].album is album)
 
         tornado.ioloop.IOLoop.instance().run_sync(callback)
+
+    def test_unsupported_options(self):
+        """Test that options blocking the IOLoop are refused."""
+        for options in (
+            {"search_cache": SearchCache()},
+            {"object_cache": ObjectCache()},
+            {"circuit_breaker": CircuitBreaker()},
+            {"hedging": Hedging()},
+        ):
+            with self.assertRaises(TypeError):
+                AsyncClient(**options)
+
+    def test_blocking_rate_limiter_refused(self):
+        """Test that rate limiters waiting for a quota server are refused."""
+        limiter = DistributedRateLimiter(RedisQuotaBackend())
+        for rate_limiter in (
+            limiter,
+            PriorityRateLimiter(limiter),
+            PriorityRateLimiter(limiter).lane(BACKGROUND),
+        ):
+            with self.assertRaises(TypeError):
+                AsyncClient(rate_limiter=rate_limiter)
+        AsyncClient(rate_limiter=PriorityRateLimiter().lane(BACKGROUND))
+
+    def test_concurrency_limiter_refused(self):
+        """Test that the blocking concurrency limiter can't be installed."""
+        with self.assertRaises(TypeError):
+            AdaptiveConcurrencyLimiter().install(self.client)
+
+    def test_headers_sent(self):
+        """Test that the headers of the client are sent."""
+        client = AsyncClient(headers={"Accept-Language": "fr"})
+        calls = []
+
+        @tornado.gen.coroutine
+        def fetch(url, **kwargs):
+            calls.append(kwargs)
+            return mock.Mock(body=b'{"id": 1, "type": "album"}', code=200)
+
+        with mock.patch.object(client._async_client, "fetch", fetch):
+            album = tornado.ioloop.IOLoop.current().run_sync(
+                lambda: client.get_album(1)
+            )
+        self.assertIsInstance(album, Album)
+        self.assertEqual(calls, [{"headers": {"Accept-Language": "fr"}}])
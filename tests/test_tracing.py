@@ -0,0 +1,152 @@
+import json
+from contextlib import contextmanager
+from unittest import TestCase, mock
+
+import tornado.ioloop
+from tornado.concurrent import Future
+
+import deezer
+from deezer import tracing
+from deezer.contrib.tornado import AsyncClient
+
+from .base import FakeResponse, paginated_api
+
+
+class RecordingSpan(tracing.NoopSpan):
+    def __init__(self, name, attributes=None):
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.ended = False
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes):
+        self.attributes.update(attributes)
+
+    def end(self, end_time=None):
+        self.ended = True
+
+
+class RecordingTracer:
+    """Tracer keeping the spans started, in order."""
+
+    def __init__(self):
+        self.spans = []
+
+    def start_span(self, name, context=None, attributes=None, **kwargs):
+        span = RecordingSpan(name, attributes)
+        self.spans.append(span)
+        return span
+
+    @contextmanager
+    def start_as_current_span(self, name, context=None, attributes=None, **kwargs):
+        span = self.start_span(name, attributes=attributes)
+        try:
+            yield span
+        finally:
+            span.end()
+
+    def names(self):
+        return [span.name for span in self.spans]
+
+
+def album(album_id):
+    return {"id": album_id, "type": "album", "title": "Album {}".format(album_id)}
+
+
+class TestTracing(TestCase):
+    def setUp(self):
+        self.tracer = RecordingTracer()
+        self.client = deezer.Client(tracer=self.tracer)
+
+    def test_get_object_spans(self):
+        """Test the span of a call and of its request."""
+        response = FakeResponse(album(302127))
+        with mock.patch.object(self.client.session, "get", return_value=response):
+            self.client.get_album(302127)
+        call, request = self.tracer.spans
+        self.assertEqual(call.name, "deezer.get_album")
+        self.assertEqual(call.attributes["deezer.object_id"], "302127")
+        self.assertIn("deezer.build_time", call.attributes)
+        self.assertEqual(request.name, "HTTP GET")
+        self.assertEqual(request.attributes["url.template"], "/album/{id}")
+        self.assertEqual(
+            request.attributes["http.response_content_length"], len(response.content)
+        )
+        self.assertIn("deezer.parse_time", request.attributes)
+        self.assertTrue(call.ended and request.ended)
+
+    def test_access_token_not_traced(self):
+        """Test that the access token isn't exported in spans or hooks."""
+        self.client.access_token = "secret-token"  # nosec
+        infos = []
+        self.client.add_hook("after_response", infos.append)
+        sent = []
+
+        def get(url, **kwargs):
+            sent.append(url)
+            return FakeResponse(album(302127))
+
+        with mock.patch.object(self.client.session, "get", get):
+            self.client.get_album(302127, index=0)
+        self.assertIn("access_token=secret-token", sent[0])
+        request = self.tracer.spans[1]
+        self.assertEqual(
+            request.attributes["http.url"],
+            "https://api.deezer.com/album/302127?index=0",
+        )
+        for span in self.tracer.spans:
+            for value in span.attributes.values():
+                self.assertNotIn("secret-token", str(value))
+        self.assertNotIn("secret-token", infos[0]["url"])
+
+    def test_iter_relation_spans(self):
+        """Test that a relation iterated has a span ended with the item count."""
+        parent = deezer.Artist(self.client, {"id": 27, "type": "artist"})
+        get = paginated_api([album(i) for i in range(5)])
+        with mock.patch.object(self.client.session, "get", get):
+            items = list(parent.iter_albums(limit=2))
+        self.assertEqual(len(items), 5)
+        iteration = self.tracer.spans[0]
+        self.assertEqual(iteration.name, "deezer.iter_albums")
+        self.assertEqual(iteration.attributes["deezer.items"], 5)
+        self.assertTrue(iteration.ended)
+        requests = [s for s in self.tracer.spans if s.name == "HTTP GET"]
+        self.assertEqual(
+            [s.attributes.get("deezer.index") for s in requests], [0, 2, 4, 5]
+        )
+        self.assertEqual(requests[0].attributes["url.template"], "/artist/{id}/albums")
+
+    def test_iter_search_span(self):
+        get = paginated_api([album(i) for i in range(5)])
+        with mock.patch.object(self.client.session, "get", get):
+            items = list(self.client.iter_search("Daft", relation="album", limit=2))
+        self.assertEqual(len(items), 5)
+        self.assertEqual(self.tracer.spans[0].name, "deezer.iter_search")
+        self.assertEqual(self.tracer.names().count("HTTP GET"), 3)
+
+    def test_search_span(self):
+        get = paginated_api([album(1)])
+        with mock.patch.object(self.client.session, "get", get):
+            self.client.search("Daft", relation="album")
+        self.assertEqual(self.tracer.names(), ["deezer.search", "HTTP GET"])
+
+    def test_noop_tracer(self):
+        """Test that the no-op tracer can stand in for a real one."""
+        client = deezer.Client(tracer=tracing.NoopTracer())
+        with mock.patch.object(client.session, "get", paginated_api([album(1)])):
+            self.assertEqual(len(list(client.iter_search("Daft", limit=1))), 1)
+
+    def test_async_client_spans(self):
+        client = AsyncClient(tracer=self.tracer)
+        future = Future()
+        future.set_result(
+            mock.Mock(code=200, body=json.dumps(album(302127)).encode("utf-8"))
+        )
+        with mock.patch.object(client._async_client, "fetch", return_value=future):
+            tornado.ioloop.IOLoop.current().run_sync(lambda: client.get_album(302127))
+        call, request = self.tracer.spans
+        self.assertEqual(call.name, "deezer.get_album")
+        self.assertEqual(request.attributes["http.status_code"], 200)
+        self.assertTrue(call.ended and request.ended)
@@ -0,0 +1,127 @@
+import importlib.util
+import os
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase, skipUnless
+
+import deezer
+from deezer.mockserver import MockDeezerAPI, MockDeezerServer
+from deezer.transports import (
+    HttpxTransport,
+    ReplayTransport,
+    Response,
+    Urllib3Transport,
+)
+
+CASSETTES = os.path.join(os.path.dirname(__file__), "cassettes")
+
+
+class TestReplayTransport(TestCase):
+    def setUp(self):
+        self.transport = ReplayTransport.from_cassettes(
+            os.path.join(CASSETTES, "TestClient.test_get_album.yaml"),
+            os.path.join(CASSETTES, "TestClient.test_with_language_header_*.yaml"),
+        )
+        self.client = deezer.Client(transport=self.transport)
+
+    def test_replay_cassette(self):
+        """Test that recorded responses are served without network."""
+        album = self.client.get_album(302127)
+        self.assertIsInstance(album, deezer.resources.Album)
+        self.assertEqual(album.title, "Discovery")
+
+    def test_replay_gzip_cassette(self):
+        """Test that compressed recorded bodies are decoded."""
+        genre = self.client.get_genre(52)
+        self.assertIn(genre.name, ["Chanson française", "フレンチ・シャンソン"])
+
+    def test_unknown_url(self):
+        """Test that urls without a recorded response fail."""
+        with self.assertRaises(LookupError):
+            self.client.get_album(1)
+
+    def test_add_rotates_responses(self):
+        """Test that json payloads can be added and are served in turn."""
+        transport = ReplayTransport()
+        url = "https://api.deezer.com/track/1"
+        transport.add(url, {"id": 1, "type": "track", "title": "First"})
+        transport.add(
+            url, Response(200, b'{"id": 1, "type": "track", "title": "Second"}')
+        )
+        client = deezer.Client(transport=transport)
+        titles = [client.get_track(1).title for _ in range(3)]
+        self.assertEqual(titles, ["First", "Second", "First"])
+        self.assertIsNone(client.session)
+
+    def test_concurrent_rotation(self):
+        """Test that concurrent replays serve each response in turn."""
+        transport = ReplayTransport()
+        url = "https://api.deezer.com/track/1"
+        for number in range(100):
+            transport.add(url, {"id": number})
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            responses = list(executor.map(lambda _: transport.get(url), range(100)))
+        ids = sorted(response.json()["id"] for response in responses)
+        self.assertEqual(ids, list(range(100)))
+
+
+def installed(name):
+    return importlib.util.find_spec(name) is not None
+
+
+class NetworkTransportTests:
+    """Tests of a transport against a local mock server."""
+
+    def make_transport(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.server = MockDeezerServer(MockDeezerAPI.synthetic(artists=2)).start()
+        self.addCleanup(self.server.stop)
+        self.transport = self.make_transport()
+        self.addCleanup(self.transport.close)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            self.client = deezer.Client(
+                host=self.server.host, use_ssl=False, transport=self.transport
+            )
+
+    def test_get(self):
+        """Test that the response is returned with its metadata."""
+        response = self.transport.get(
+            self.client.object_url("artist", 1), headers={"Accept-Language": "fr"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["id"], 1)
+        self.assertIn("application/json", response.headers["Content-Type"])
+        self.assertGreaterEqual(response.elapsed, 0)
+
+    def test_client(self):
+        """Test that a client gets resources through the transport."""
+        self.assertEqual(self.client.get_album(1001).title, "Album 1001")
+        self.assertIsNone(self.client.session)
+
+    def test_reset(self):
+        """Test that the transport is usable after dropping its connections."""
+        self.client.get_artist(1)
+        self.transport.reset()
+        self.assertEqual(self.client.get_artist(2).id, 2)
+
+    def test_threads(self):
+        """Test that the transport can be shared between threads."""
+        self.assertTrue(self.client.thread_safe)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            artists = list(executor.map(self.client.get_artist, [1, 2] * 10))
+        self.assertEqual([artist.id for artist in artists], [1, 2] * 10)
+
+
+@skipUnless(installed("urllib3"), "urllib3 isn't installed")
+class TestUrllib3Transport(NetworkTransportTests, TestCase):
+    def make_transport(self):
+        return Urllib3Transport()
+
+
+@skipUnless(installed("httpx"), "httpx isn't installed")
+class TestHttpxTransport(NetworkTransportTests, TestCase):
+    def make_transport(self):
+        return HttpxTransport()